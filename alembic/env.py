@@ -30,6 +30,11 @@ target_metadata = Base.metadata
 # Remplacer l'URL de la base de données par celle de la configuration
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Ignore l'index plein texte (table virtuelle FTS5 et ses tables internes)."""
+    return not (type_ == "table" and name.startswith("book_fts"))
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
@@ -38,6 +43,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -53,7 +59,8 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
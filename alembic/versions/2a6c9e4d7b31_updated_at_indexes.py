@@ -0,0 +1,30 @@
+"""Book and loan (updated_at, id) indexes for exports
+
+Revision ID: 2a6c9e4d7b31
+Revises: 8d3f6a2b9e14
+Create Date: 2026-10-18 21:32:46.207153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a6c9e4d7b31'
+down_revision: Union[str, None] = '8d3f6a2b9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_book_updated_at_id', 'book', ['updated_at', 'id'], unique=False)
+    op.create_index('idx_loan_updated_at_id', 'loan', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_loan_updated_at_id', table_name='loan')
+    op.drop_index('idx_book_updated_at_id', table_name='book')
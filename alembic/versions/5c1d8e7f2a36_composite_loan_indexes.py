@@ -0,0 +1,34 @@
+"""Composite loan indexes for eligibility checks
+
+Revision ID: 5c1d8e7f2a36
+Revises: b7e2c4a91f05
+Create Date: 2026-10-18 14:03:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d8e7f2a36'
+down_revision: Union[str, None] = 'b7e2c4a91f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_loan_user_return_date', 'loan', ['user_id', 'return_date'], unique=False)
+    op.create_index('idx_loan_book_user_return_date', 'loan', ['book_id', 'user_id', 'return_date'], unique=False)
+    op.drop_index('idx_loan_user_id', table_name='loan')
+    op.drop_index('idx_loan_book_id', table_name='loan')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_loan_book_id', 'loan', ['book_id'], unique=False)
+    op.create_index('idx_loan_user_id', 'loan', ['user_id'], unique=False)
+    op.drop_index('idx_loan_book_user_return_date', table_name='loan')
+    op.drop_index('idx_loan_user_return_date', table_name='loan')
@@ -0,0 +1,85 @@
+"""Catalog change log for incremental search index updates
+
+Revision ID: 6b8e1f4c2d70
+Revises: 2a6c9e4d7b31
+Create Date: 2026-10-18 22:14:09.551862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b8e1f4c2d70'
+down_revision: Union[str, None] = '2a6c9e4d7b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = ("title", "author", "description", "publisher")
+COLUMNS = ", ".join(FIELDS)
+NEW = ", ".join(f"new.{name}" for name in FIELDS)
+OLD = ", ".join(f"old.{name}" for name in FIELDS)
+CHANGE_NEW = ", ".join(f"new_{name}" for name in FIELDS)
+CHANGE_OLD = ", ".join(f"old_{name}" for name in FIELDS)
+CHANGED = " OR ".join(f"old.{name} IS NOT new.{name}" for name in FIELDS)
+RETENTION = 10000
+
+TRIGGERS = {
+    "book_catalog_insert": (
+        "AFTER INSERT ON book BEGIN "
+        f"INSERT INTO catalog_change(operation, book_id, {CHANGE_NEW}) VALUES ('insert', new.id, {NEW}); END"
+    ),
+    "book_catalog_update": (
+        f"AFTER UPDATE OF {COLUMNS} ON book WHEN {CHANGED} BEGIN "
+        f"INSERT INTO catalog_change(operation, book_id, {CHANGE_OLD}, {CHANGE_NEW}) "
+        f"VALUES ('update', new.id, {OLD}, {NEW}); END"
+    ),
+    "book_catalog_delete": (
+        "AFTER DELETE ON book BEGIN "
+        f"INSERT INTO catalog_change(operation, book_id, {CHANGE_OLD}) VALUES ('delete', old.id, {OLD}); END"
+    ),
+    "book_category_catalog_insert": (
+        "AFTER INSERT ON book_category BEGIN "
+        "INSERT INTO catalog_change(operation, book_id, category_id) "
+        "VALUES ('add_category', new.book_id, new.category_id); END"
+    ),
+    "book_category_catalog_delete": (
+        "AFTER DELETE ON book_category BEGIN "
+        "INSERT INTO catalog_change(operation, book_id, category_id) "
+        "VALUES ('remove_category', old.book_id, old.category_id); END"
+    ),
+    "catalog_change_prune": (
+        "AFTER INSERT ON catalog_change BEGIN "
+        f"DELETE FROM catalog_change WHERE generation <= new.generation - {RETENTION}; END"
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'catalog_change',
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=20), nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        *[sa.Column(f'old_{name}', sa.Text(), nullable=True) for name in FIELDS],
+        *[sa.Column(f'new_{name}', sa.Text(), nullable=True) for name in FIELDS],
+        sa.PrimaryKeyConstraint('generation'),
+        sqlite_autoincrement=True
+    )
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for name, body in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for name in reversed(list(TRIGGERS)):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('catalog_change')
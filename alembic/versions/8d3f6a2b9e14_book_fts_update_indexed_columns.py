@@ -0,0 +1,48 @@
+"""Reindex book full-text rows only on indexed column updates
+
+Revision ID: 8d3f6a2b9e14
+Revises: e4a9b1c37d52
+Create Date: 2026-10-18 21:05:17.834290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a2b9e14'
+down_revision: Union[str, None] = 'e4a9b1c37d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "title, author, description, publisher"
+NEW = "new.title, new.author, new.description, new.publisher"
+OLD = "old.title, old.author, old.description, old.publisher"
+
+
+def _create_update_trigger(columns: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS book_fts_update")
+    op.execute(
+        f"CREATE TRIGGER book_fts_update AFTER UPDATE{columns} ON book BEGIN "
+        f"INSERT INTO book_fts(book_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); "
+        f"INSERT INTO book_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    # Les mises à jour du stock (emprunts, retours) ne réindexent plus le livre
+    _create_update_trigger(f" OF {COLUMNS}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _create_update_trigger("")
@@ -0,0 +1,59 @@
+"""Add book full-text index (SQLite FTS5)
+
+Revision ID: b7e2c4a91f05
+Revises: 9129c858811d
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4a91f05'
+down_revision: Union[str, None] = '9129c858811d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "title, author, description, publisher"
+NEW = "new.title, new.author, new.description, new.publisher"
+OLD = "old.title, old.author, old.description, old.publisher"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5({COLUMNS}, "
+        "content='book', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS book_fts_insert AFTER INSERT ON book BEGIN "
+        f"INSERT INTO book_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS book_fts_delete AFTER DELETE ON book BEGIN "
+        f"INSERT INTO book_fts(book_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS book_fts_update AFTER UPDATE OF {COLUMNS} ON book BEGIN "
+        f"INSERT INTO book_fts(book_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD}); "
+        f"INSERT INTO book_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW}); END"
+    )
+    # Indexer les livres existants
+    op.execute("INSERT INTO book_fts(book_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS book_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS book_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS book_fts_insert")
+    op.execute("DROP TABLE IF EXISTS book_fts")
@@ -0,0 +1,47 @@
+"""Loan overdue flag with partial index
+
+Revision ID: e4a9b1c37d52
+Revises: 5c1d8e7f2a36
+Create Date: 2026-10-18 19:12:40.502871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9b1c37d52'
+down_revision: Union[str, None] = '5c1d8e7f2a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('loan', sa.Column('is_overdue', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('idx_loan_overdue', 'loan', ['id'], unique=False, sqlite_where=sa.text('is_overdue = 1'))
+    # Marquer les emprunts déjà en retard (SQLite stocke les dates en texte, avec microsecondes)
+    if op.get_bind().dialect.name == "sqlite":
+        now = sa.func.strftime('%Y-%m-%d %H:%M:%f', 'now')
+    else:
+        now = sa.func.now()
+    loan = sa.table(
+        'loan',
+        sa.column('is_overdue', sa.Boolean()),
+        sa.column('return_date', sa.DateTime()),
+        sa.column('due_date', sa.DateTime())
+    )
+    op.execute(
+        loan.update()
+        .where(loan.c.return_date.is_(None), loan.c.due_date < now)
+        .values(is_overdue=sa.true())
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_loan_overdue', table_name='loan')
+    # ALTER TABLE ... DROP COLUMN (SQLite >= 3.35) : conserve les contraintes de la table
+    op.drop_column('loan', 'is_overdue')
@@ -0,0 +1,53 @@
+import sys
+import os
+import timeit
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.cache import cache, cache_key
+
+N = 200_000
+
+
+class Repository:
+    def get_by_isbn(self, *, isbn: str) -> str:
+        return isbn
+
+    @cache(expiry=3600)
+    def get_by_isbn_default_key(self, *, isbn: str) -> str:
+        return isbn
+
+    @cache(expiry=3600, key=("isbn",))
+    def get_by_isbn_declared_key(self, *, isbn: str) -> str:
+        return isbn
+
+
+def legacy_key(*args, **kwargs) -> str:
+    # Ancienne construction de clé : json.dumps + md5 à chaque appel
+    return f"module.get_by_isbn:{cache_key(*args, **kwargs)}"
+
+
+def bench(label: str, stmt, baseline: float = None) -> float:
+    per_call = min(timeit.repeat(stmt, number=N, repeat=5)) / N * 1e9
+    overhead = f" (+{per_call - baseline:.0f} ns)" if baseline is not None else ""
+    print(f"{label:<40} {per_call:>8.0f} ns/appel{overhead}")
+    return per_call
+
+
+def main():
+    repository = Repository()
+    isbn = "9780451524935"
+
+    # Remplir le cache
+    repository.get_by_isbn_default_key(isbn=isbn)
+    repository.get_by_isbn_declared_key(isbn=isbn)
+
+    baseline = bench("appel direct", lambda: repository.get_by_isbn(isbn=isbn))
+    bench("clé json + md5 (ancienne)", lambda: legacy_key(isbn=isbn), baseline)
+    bench("@cache, clé par défaut (succès)", lambda: repository.get_by_isbn_default_key(isbn=isbn), baseline)
+    bench("@cache, clé déclarée (succès)", lambda: repository.get_by_isbn_declared_key(isbn=isbn), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import random
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.models.base import Base
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.loans import LoanRepository
+
+
+def populate(session, users: int, books: int, loans: int, rng: random.Random) -> None:
+    session.execute(insert(User), [
+        {"email": f"user{i}@example.com", "hashed_password": "x", "full_name": f"User {i}"}
+        for i in range(users)
+    ])
+    session.execute(insert(Book), [
+        {"title": f"Book {i}", "author": "Author", "isbn": f"{9700000000000 + i}", "publication_year": 2000, "quantity": 10}
+        for i in range(books)
+    ])
+    now = datetime.utcnow()
+    session.execute(insert(Loan), [
+        {
+            "user_id": rng.randint(1, users),
+            "book_id": rng.randint(1, books),
+            "loan_date": now,
+            "due_date": now + timedelta(days=14),
+            "extended": False
+        }
+        for _ in range(loans)
+    ])
+    session.commit()
+
+
+def old_check(repository: LoanRepository, user_id: int, book_id: int) -> bool:
+    # Ancienne implémentation : chargement de tous les emprunts actifs
+    active_loans = repository.get_active_loans()
+    duplicate = any(loan.user_id == user_id and loan.book_id == book_id for loan in active_loans)
+    return duplicate or len([loan for loan in active_loans if loan.user_id == user_id]) >= 5
+
+
+def new_check(repository: LoanRepository, user_id: int, book_id: int) -> bool:
+    return (
+        repository.has_active_loan(user_id=user_id, book_id=book_id)
+        or repository.count_active_loans_by_user(user_id=user_id) >= 5
+    )
+
+
+def measure(check, repository: LoanRepository, checks: int, users: int, books: int, rng: random.Random) -> float:
+    start = time.perf_counter()
+    for _ in range(checks):
+        check(repository, rng.randint(1, users), rng.randint(1, books))
+        repository.db.expunge_all()
+    return (time.perf_counter() - start) * 1000 / checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût des vérifications d'éligibilité à l'emprunt")
+    parser.add_argument("--loans", type=int, nargs="+", default=[10_000, 200_000])
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--checks", type=int, default=20)
+    args = parser.parse_args()
+
+    for loans in args.loans:
+        rng = random.Random(42)
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{directory}/bench.db")
+            Base.metadata.create_all(bind=engine)
+            session = sessionmaker(bind=engine)()
+            populate(session, args.users, args.books, loans, rng)
+            repository = LoanRepository(Loan, session)
+
+            old = measure(old_check, repository, args.checks, args.users, args.books, rng)
+            new = measure(new_check, repository, args.checks * 100, args.users, args.books, rng)
+            print(f"{loans} emprunts actifs : avant {old:.2f} ms, après {new:.3f} ms par vérification")
+
+            session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
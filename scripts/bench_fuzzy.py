@@ -0,0 +1,76 @@
+import argparse
+import random
+import sys
+import os
+import time
+from collections import defaultdict
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.search.trigram import TrigramIndex
+
+SYLLABLES = ["ka", "to", "ri", "mel", "son", "dar", "vi", "lo", "ne", "gar", "tin", "bor", "el", "wen", "ash"]
+TYPOS = ["swap", "drop", "double"]
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(TYPOS)
+    if kind == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i] + word[i:]
+
+
+def build(size: int, vocabulary: list, rng: random.Random) -> TrigramIndex:
+    # Titre et auteur : 5 mots tirés d'un vocabulaire commun
+    postings = defaultdict(list)
+    for book_id in range(1, size + 1):
+        for word in set(rng.choices(vocabulary, k=5)):
+            postings[word].append(book_id)
+    index = TrigramIndex()
+    index.load(postings)
+    return index
+
+
+def percentile(values: list, ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence de la recherche approchée (trigrammes)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = list({make_word(rng) for _ in range(args.vocabulary)})
+
+    for size in args.sizes:
+        start = time.perf_counter()
+        index = build(size, vocabulary, rng)
+        build_time = time.perf_counter() - start
+
+        for words in (1, 2):
+            latencies = []
+            for _ in range(args.queries):
+                query = [misspell(rng.choice(vocabulary), rng) for _ in range(words)]
+                start = time.perf_counter()
+                index.search(query, limit=100)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{size:>9} livres, {words} mot(s) : construction {build_time:6.1f} s, "
+                f"p50 {percentile(latencies, 0.5):6.2f} ms, p99 {percentile(latencies, 0.99):6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
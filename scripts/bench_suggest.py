@@ -0,0 +1,54 @@
+import argparse
+import random
+import sys
+import os
+import time
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.search.prefix import PrefixIndex
+
+SYLLABLES = ["ka", "to", "ri", "mel", "son", "dar", "vi", "lo", "ne", "gar", "tin", "bor", "el", "wen", "ash"]
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        for _ in range(words)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence de l'autocomplétion (index de préfixes)")
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    entries = []
+    for _ in range(args.books):
+        entries.append(("title", make_text(rng, 3)))
+        entries.append(("author", make_text(rng, 2)))
+
+    start = time.perf_counter()
+    index = PrefixIndex()
+    index.load(entries)
+    print(f"{args.books} livres : {len(index)} clés, construction {time.perf_counter() - start:.1f} s")
+
+    latencies = []
+    for _ in range(args.queries):
+        field, text = rng.choice(entries)
+        prefix = text[:rng.randint(1, 6)]
+        start = time.perf_counter()
+        index.complete(prefix, limit=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"complétion (10 résultats) : p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, or_
 from typing import List, Any, Optional
-from ...utils.pagination import PaginationParams, paginate, Page
+from datetime import datetime
+from ...utils.pagination import PaginationParams, paginate, paginate_ids, Page
+from ...utils.http_cache import make_etag, cache_headers, is_not_modified, not_modified
+from ...utils.projection import parse_fields, projection_options, projected_response
+from ...utils.export import export_response
 from ...db.session import get_db
+from ...config import settings
 from ...models.books import Book as BookModel
 from ...models.categories import Category, book_category
-from ..schemas.books import Book, BookCreate, BookUpdate
-from ...repositories.books import BookRepository
+from ..schemas.books import Book, BookCreate, BookUpdate, BookSuggestion
+from ...repositories.books import BookRepository, BOOKS_LIST_TAG, is_isbn
+from ...search.catalog import catalog_index, use_catalog_index
 from ...services.books import BookService
 from ..dependencies import get_current_active_user, get_current_admin_user
 
@@ -31,21 +37,100 @@ router = APIRouter()
 
 @router.get("/", response_model=Page[Book])
 def read_books(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
     sort_desc: bool = Query(False),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None),
+    with_total: str = Query("exact", pattern="^(exact|cached|estimated|none)$"),
+    fields: Optional[str] = Query(None, description="Champs à retourner (ex: id,title,author)"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Récupère la liste des livres avec pagination.
+
+    En mode `cursor`, la page suivante est désignée par le `next_cursor` de la page courante.
+    `with_total` permet d'éviter le COUNT(*) : total mis en cache, estimé ou omis.
+    `fields` limite les colonnes chargées et sérialisées (ex: `fields=title,author`).
+
+    Répond 304 Not Modified si le catalogue n'a pas changé depuis la version du client.
+    """
+    repository = BookRepository(BookModel, db)
+
+    try:
+        projection = parse_fields(fields, Book)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    # Validation HTTP : une seule requête d'agrégat, sans charger ni sérialiser les livres.
+    # Validation par ETag seulement : une suppression ne fait pas avancer la date de dernière
+    # modification, mais change le nombre de livres inclus dans l'ETag.
+    last_modified, count = repository.get_version()
+    etag = make_etag("books", last_modified, count, skip, limit, sort_by, sort_desc, pagination, cursor, with_total, projection)
+    if is_not_modified(request, etag, None):
+        return not_modified(etag, None)
+    response.headers.update(cache_headers(etag, None))
+
+    query = db.query(BookModel).options(*projection_options(BookModel, projection))
+
+    params = PaginationParams(
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc,
+        mode=pagination, cursor=cursor, with_total=with_total
+    )
+    try:
+        page = paginate(query, params, BookModel, count_tags=[BOOKS_LIST_TAG])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if projection is not None:
+        return projected_response(page, Book, projection, headers=dict(response.headers))
+    return page
+
+
+@router.get("/export")
+def export_books(
+    db: Session = Depends(get_db),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Exporte tout le catalogue (ou les livres modifiés depuis `updated_since`) en NDJSON ou CSV.
+
+    Les livres sont lus par lots avec un curseur côté serveur et envoyés au fil de l'eau.
     """
     repository = BookRepository(BookModel, db)
-    query = db.query(BookModel)
+    books = repository.stream(
+        updated_since=updated_since,
+        options=[selectinload(BookModel.categories)]
+    )
+    return export_response(books, Book, format, "books", on_close=db.close)
+
 
-    params = PaginationParams(skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc)
-    return paginate(query, params, BookModel)
+@router.get("/suggest", response_model=List[BookSuggestion])
+def suggest_books(
+    db: Session = Depends(get_db),
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Propose des titres et auteurs commençant par `prefix` (autocomplétion).
+    """
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    suggestions = service.suggest(prefix=prefix, limit=limit)
+    return [BookSuggestion(field=field, text=text) for field, text in suggestions]
 
 
 @router.post("/", response_model=Book, status_code=status.HTTP_201_CREATED)
@@ -74,15 +159,33 @@ def create_book(
 @router.get("/{id}", response_model=Book)
 def read_book(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     id: int,
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Récupère un livre par son ID.
+
+    Répond 304 Not Modified si le livre n'a pas changé depuis la version du client.
     """
     repository = BookRepository(BookModel, db)
     service = BookService(repository)
+
+    version = repository.get_updated_at(id=id)
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Livre non trouvé"
+        )
+
+    last_modified = version.updated_at
+    etag = make_etag("book", id, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(cache_headers(etag, last_modified))
+
     book = service.get(id=id)
     if not book:
         raise HTTPException(
@@ -200,45 +303,145 @@ def search_book_by_isbn(
 def search_books(
     db: Session = Depends(get_db),
     query: Optional[str] = Query(None, min_length=1),
-    category_id: Optional[int] = Query(None),
+    category_id: Optional[List[int]] = Query(None, description="Catégorie(s), paramètre répétable"),
+    category_mode: str = Query("any", pattern="^(any|all)$", description="Au moins une (any) ou toutes (all) les catégories"),
     author: Optional[str] = Query(None),
     publication_year: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
     sort_desc: bool = Query(False),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None),
+    with_total: str = Query("exact", pattern="^(exact|cached|estimated|none)$"),
+    fields: Optional[str] = Query(None, description="Champs à retourner (ex: id,title,author)"),
+    fuzzy: bool = Query(False, description="Recherche approchée sur le titre et l'auteur (fautes de frappe tolérées)"),
+    facets: bool = Query(False, description="Inclure le nombre de résultats par catégorie, langue et décennie"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Recherche avancée de livres.
+
+    Une recherche par catégories, ou par mots sans classement par pertinence (tri par ID
+    ou pagination par curseur), sans autre filtre, est servie par l'index en mémoire du
+    catalogue : seule la page demandée est chargée depuis la base. Les recherches par
+    ISBN et celles classées par pertinence (BM25) passent par la base.
+    `category_id` est répétable ; `category_mode` choisit entre au moins une (any) et
+    toutes (all) les catégories.
+    Avec `fuzzy=true`, les résultats sont classés par similarité (trigrammes) ; les
+    autres filtres sont alors appliqués aux candidats en base. Cette recherche n'est
+    servie que par l'index en mémoire : tant qu'il n'est pas prêt (démarrage,
+    reconstruction) ou hors SQLite, la réponse est 503 avec un en-tête `Retry-After`.
+    Avec `facets=true`, la page contient aussi les comptes par facette de l'ensemble des résultats.
     """
     repository = BookRepository(BookModel, db)
 
+    try:
+        projection = parse_fields(fields, Book)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    params = PaginationParams(
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc,
+        mode=pagination, cursor=cursor, with_total=with_total
+    )
+    options = projection_options(BookModel, projection)
+
+    ids = None
+    isbn = bool(query) and is_isbn(query)
+    # L'index renvoie des IDs triés : il ne remplace pas le classement par pertinence de la base
+    relevance = bool(query) and sort_by is None and params.mode == "offset"
+    ranked = fuzzy and bool(query) and not isbn
+    if ranked:
+        if use_catalog_index(db):
+            ids = catalog_index.fuzzy_search(query, limit=settings.SEARCH_FUZZY_MAX_RESULTS)
+        if ids is None:
+            # La base n'a pas d'équivalent de la recherche par trigrammes : ne pas
+            # renvoyer silencieusement les résultats d'une recherche exacte
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="La recherche approchée est momentanément indisponible (index du catalogue non prêt)",
+                headers={"Retry-After": str(settings.SEARCH_INDEX_CHECK_INTERVAL)}
+            )
+        if ids and (category_id or author or publication_year):
+            candidates = _search_query(
+                db, repository, [], None, category_id, category_mode, author, publication_year
+            )
+            allowed = {id for (id,) in candidates.with_entities(BookModel.id).filter(BookModel.id.in_(ids))}
+            ids = [id for id in ids if id in allowed]
+    elif (
+        (query or category_id)
+        and not (author or publication_year or isbn or relevance)
+        and sort_by in (None, "id")
+        and use_catalog_index(db)
+    ):
+        ids = catalog_index.search(query, category_ids=category_id, category_mode=category_mode)
+
+    try:
+        if ids is not None:
+            page = paginate_ids(
+                ids,
+                params,
+                lambda page_ids: repository.get_by_ids(ids=page_ids, options=options),
+                ranked=ranked
+            )
+        else:
+            page = paginate(
+                _search_query(
+                    db, repository, options, query, category_id, category_mode, author, publication_year
+                ),
+                params,
+                BookModel,
+                count_tags=[BOOKS_LIST_TAG]
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if facets:
+        if ranked and ids is not None:
+            facet_query = db.query(BookModel).filter(BookModel.id.in_(ids))
+        else:
+            facet_query = _search_query(
+                db, repository, [], query, category_id, category_mode, author, publication_year
+            )
+        page.facets = repository.get_facets(query=facet_query)
+
+    if projection is not None:
+        return projected_response(page, Book, projection)
+    return page
+
+
+def _search_query(
+    db: Session,
+    repository: BookRepository,
+    options: List[Any],
+    query: Optional[str],
+    category_ids: Optional[List[int]],
+    category_mode: str,
+    author: Optional[str],
+    publication_year: Optional[int]
+):
     # Construire la requête de base
-    search_query = db.query(BookModel)
+    search_query = db.query(BookModel).options(*options)
 
     # Appliquer les filtres
     if query:
-        search_query = search_query.filter(
-            or_(
-                BookModel.title.ilike(f"%{query}%"),
-                BookModel.author.ilike(f"%{query}%"),
-                BookModel.isbn.ilike(f"%{query}%"),
-                BookModel.description.ilike(f"%{query}%")
-            )
-        )
+        # Recherche plein texte, triée par pertinence sauf si `sort_by` est fourni
+        search_query = repository.filter_text(search_query, query)
 
-    if category_id:
-        search_query = search_query.join(book_category).filter(
-            book_category.c.category_id == category_id
-        )
+    if category_ids:
+        search_query = repository.filter_categories(search_query, category_ids, category_mode)
 
     if author:
-        search_query = search_query.filter(BookModel.author.ilike(f"%{author}%"))
+        search_query = repository.filter_text(search_query, author, columns=("author",), rank=False)
 
     if publication_year:
         search_query = search_query.filter(BookModel.publication_year == publication_year)
 
-    # Paginer les résultats
-    params = PaginationParams(skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc)
-    return paginate(search_query, params, BookModel)
\ No newline at end of file
+    return search_query
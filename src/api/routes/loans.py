@@ -1,38 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 from ...db.session import get_db
 from ...models.loans import Loan as LoanModel
 from ...models.books import Book as BookModel
 from ...models.users import User as UserModel
-from ..schemas.loans import Loan, LoanCreate, LoanUpdate
-from ...repositories.loans import LoanRepository
+from ..schemas.loans import Loan, LoanBulkCreate, LoanBulkResult, LoanBulkReturn, LoanCreate, LoanUpdate, LoanWithRelations
+from ...repositories.loans import LOAN_RELATIONS, LOANS_LIST_TAG, LoanRepository
 from ...repositories.books import BookRepository
 from ...repositories.users import UserRepository
 from ...services.loans import LoanService
+from ...utils.pagination import Page, PaginationParams, paginate
+from ...utils.projection import parse_fields, projected_response, projection_options
+from ...utils.export import export_response
 from ..dependencies import get_current_active_user, get_current_admin_user
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Loan])
+def loan_fields(fields: Optional[str] = Query(None, description="Champs à retourner (ex: id,due_date)")) -> Optional[Tuple[str, ...]]:
+    """
+    Dépendance : valide le paramètre `fields` des listes d'emprunts.
+    """
+    try:
+        return parse_fields(fields, LoanWithRelations)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def loan_include(include: Optional[str] = Query(None, description="Relations à inclure (ex: user,book)")) -> Tuple[str, ...]:
+    """
+    Dépendance : valide le paramètre `include` des listes d'emprunts.
+    """
+    if not include:
+        return ()
+    names = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip()))
+    for name in names:
+        if name not in LOAN_RELATIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Relation inconnue : '{name}'"
+            )
+    return names
+
+
+def loan_pagination(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    sort_by: Optional[str] = Query(None),
+    sort_desc: bool = Query(False),
+    pagination: str = Query("cursor", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None),
+    with_total: str = Query("exact", pattern="^(exact|cached|estimated|none)$")
+) -> PaginationParams:
+    """
+    Dépendance : paramètres de pagination des listes d'emprunts (par clé par défaut).
+    """
+    return PaginationParams(
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc,
+        mode=pagination, cursor=cursor, with_total=with_total
+    )
+
+
+def loan_list_response(
+    repository: LoanRepository,
+    params: PaginationParams,
+    fields: Optional[Tuple[str, ...]],
+    include: Tuple[str, ...],
+    **filters: Any
+) -> Any:
+    """
+    Pagine les emprunts filtrés, en chargeant par jointure les relations incluses (ou
+    demandées dans `fields`), et retourne la page complète ou réduite aux champs demandés.
+    """
+    columns = fields
+    if fields is not None:
+        include = tuple(dict.fromkeys(include + tuple(name for name in fields if name in LOAN_RELATIONS)))
+        columns = tuple(name for name in fields if name not in LOAN_RELATIONS)
+
+    query = repository.query_loans(
+        options=projection_options(LoanModel, columns) + repository.details_options(include),
+        **filters
+    )
+    try:
+        page = paginate(query, params, LoanModel, count_tags=[LOANS_LIST_TAG])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if fields is None:
+        return page
+    return projected_response(page, LoanWithRelations, tuple(dict.fromkeys(fields + include)))
+
+
+@router.get("/", response_model=Page[LoanWithRelations])
 def read_loans(
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    params: PaginationParams = Depends(loan_pagination),
+    fields: Optional[Tuple[str, ...]] = Depends(loan_fields),
+    include: Tuple[str, ...] = Depends(loan_include),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère la liste des emprunts.
+    Récupère la liste paginée des emprunts.
+
+    `include=user,book` charge l'emprunteur et le livre par jointure ; `fields` limite les
+    colonnes chargées et sérialisées.
     """
     loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-    loans = service.get_multi(skip=skip, limit=limit)
-    return loans
+    return loan_list_response(loan_repository, params, fields, include)
+
+
+@router.get("/export")
+def export_loans(
+    db: Session = Depends(get_db),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Exporte tous les emprunts (ou ceux modifiés depuis `updated_since`) en NDJSON ou CSV.
+    """
+    loan_repository = LoanRepository(LoanModel, db)
+    loans = loan_repository.stream(updated_since=updated_since)
+    return export_response(loans, Loan, format, "loans", on_close=db.close)
 
 
 @router.post("/", response_model=Loan, status_code=status.HTTP_201_CREATED)
@@ -66,6 +164,52 @@ def create_loan(
         )
 
 
+@router.post("/bulk", response_model=List[LoanBulkResult])
+def create_loans_bulk(
+    *,
+    db: Session = Depends(get_db),
+    loans_in: LoanBulkCreate,
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Crée les emprunts d'un lot de livres (borne de prêt), avec un résultat par livre.
+    """
+    loan_repository = LoanRepository(LoanModel, db)
+    book_repository = BookRepository(BookModel, db)
+    user_repository = UserRepository(UserModel, db)
+    service = LoanService(loan_repository, book_repository, user_repository)
+
+    try:
+        return service.create_loans(
+            user_id=loans_in.user_id,
+            book_ids=loans_in.book_ids,
+            loan_period_days=loans_in.loan_period_days
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/bulk-return", response_model=List[LoanBulkResult])
+def return_loans_bulk(
+    *,
+    db: Session = Depends(get_db),
+    loans_in: LoanBulkReturn,
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Marque un lot d'emprunts comme retournés, avec un résultat par emprunt.
+    """
+    loan_repository = LoanRepository(LoanModel, db)
+    book_repository = BookRepository(BookModel, db)
+    user_repository = UserRepository(UserModel, db)
+    service = LoanService(loan_repository, book_repository, user_repository)
+
+    return service.return_loans(loan_ids=loans_in.loan_ids)
+
+
 @router.get("/{id}", response_model=Loan)
 def read_loan(
     *,
@@ -149,49 +293,48 @@ def extend_loan(
         )
 
 
-@router.get("/active/", response_model=List[Loan])
+@router.get("/active/", response_model=Page[LoanWithRelations])
 def read_active_loans(
     db: Session = Depends(get_db),
+    params: PaginationParams = Depends(loan_pagination),
+    fields: Optional[Tuple[str, ...]] = Depends(loan_fields),
+    include: Tuple[str, ...] = Depends(loan_include),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts actifs (non retournés).
+    Récupère les emprunts actifs (non retournés), paginés.
     """
     loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-
-    loans = service.get_active_loans()
-    return loans
+    return loan_list_response(loan_repository, params, fields, include, status="active")
 
 
-@router.get("/overdue/", response_model=List[Loan])
+@router.get("/overdue/", response_model=Page[LoanWithRelations])
 def read_overdue_loans(
     db: Session = Depends(get_db),
+    params: PaginationParams = Depends(loan_pagination),
+    fields: Optional[Tuple[str, ...]] = Depends(loan_fields),
+    include: Tuple[str, ...] = Depends(loan_include),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts en retard.
+    Récupère les emprunts en retard, paginés.
     """
     loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-
-    loans = service.get_overdue_loans()
-    return loans
+    return loan_list_response(loan_repository, params, fields, include, status="overdue")
 
 
-@router.get("/user/{user_id}", response_model=List[Loan])
+@router.get("/user/{user_id}", response_model=Page[LoanWithRelations])
 def read_user_loans(
     *,
     db: Session = Depends(get_db),
     user_id: int,
+    params: PaginationParams = Depends(loan_pagination),
+    fields: Optional[Tuple[str, ...]] = Depends(loan_fields),
+    include: Tuple[str, ...] = Depends(loan_include),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
-    Récupère les emprunts d'un utilisateur.
+    Récupère les emprunts d'un utilisateur, paginés.
     """
     # Vérifier que l'utilisateur est l'emprunteur ou un administrateur
     if not current_user.is_admin and current_user.id != user_id:
@@ -201,28 +344,21 @@ def read_user_loans(
         )
 
     loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
+    return loan_list_response(loan_repository, params, fields, include, user_id=user_id)
 
-    loans = service.get_loans_by_user(user_id=user_id)
-    return loans
 
-
-@router.get("/book/{book_id}", response_model=List[Loan])
+@router.get("/book/{book_id}", response_model=Page[LoanWithRelations])
 def read_book_loans(
     *,
     db: Session = Depends(get_db),
     book_id: int,
+    params: PaginationParams = Depends(loan_pagination),
+    fields: Optional[Tuple[str, ...]] = Depends(loan_fields),
+    include: Tuple[str, ...] = Depends(loan_include),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts d'un livre.
+    Récupère les emprunts d'un livre, paginés.
     """
     loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-
-    loans = service.get_loans_by_book(book_id=book_id)
-    return loans
\ No newline at end of file
+    return loan_list_response(loan_repository, params, fields, include, book_id=book_id)
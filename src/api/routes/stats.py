@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
+from datetime import datetime
 
+from ...config import settings
 from ...db.session import get_db
 from ...services.stats import StatsService
+from ...utils.cache import get_cache_stats, cache_metrics_text
 from ..dependencies import get_current_admin_user
 
 router = APIRouter()
 
 
+def set_snapshot_headers(response: Response, computed_at: datetime) -> None:
+    """
+    Indique au client la date de calcul de l'instantané renvoyé.
+    """
+    response.headers["X-Snapshot-Timestamp"] = computed_at.isoformat() + "Z"
+    response.headers["Age"] = str(max(0, int((datetime.utcnow() - computed_at).total_seconds())))
+
+
 @router.get("/general", response_model=Dict[str, Any])
 def get_general_stats(
+    response: Response,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -18,43 +31,74 @@ def get_general_stats(
     Récupère des statistiques générales sur la bibliothèque.
     """
     service = StatsService(db)
-    return service.get_general_stats()
+    result, computed_at = service.get_snapshot("get_general_stats")
+    set_snapshot_headers(response, computed_at)
+    return result
 
 
 @router.get("/most-borrowed-books", response_model=List[Dict[str, Any]])
 def get_most_borrowed_books(
+    response: Response,
     db: Session = Depends(get_db),
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=settings.STATS_MAX_LIMIT),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère les livres les plus empruntés.
     """
     service = StatsService(db)
-    return service.get_most_borrowed_books(limit=limit)
+    result, computed_at = service.get_snapshot("get_most_borrowed_books", limit=limit)
+    set_snapshot_headers(response, computed_at)
+    return result
 
 
 @router.get("/most-active-users", response_model=List[Dict[str, Any]])
 def get_most_active_users(
+    response: Response,
     db: Session = Depends(get_db),
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=settings.STATS_MAX_LIMIT),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère les utilisateurs les plus actifs.
     """
     service = StatsService(db)
-    return service.get_most_active_users(limit=limit)
+    result, computed_at = service.get_snapshot("get_most_active_users", limit=limit)
+    set_snapshot_headers(response, computed_at)
+    return result
 
 
 @router.get("/monthly-loans", response_model=List[Dict[str, Any]])
 def get_monthly_loans(
+    response: Response,
     db: Session = Depends(get_db),
-    months: int = 12,
+    months: int = Query(12, ge=1, le=settings.STATS_MAX_MONTHS),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère le nombre d'emprunts par mois pour les derniers mois.
     """
     service = StatsService(db)
-    return service.get_monthly_loans(months=months)
\ No newline at end of file
+    result, computed_at = service.get_snapshot("get_monthly_loans", months=months)
+    set_snapshot_headers(response, computed_at)
+    return result
+
+
+@router.get("/cache", response_model=Dict[str, Dict[str, Any]])
+def get_cache_statistics(
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Récupère les statistiques du cache par fonction (succès, échecs, évictions, mémoire...).
+    """
+    return get_cache_stats()
+
+
+@router.get("/cache/metrics", response_class=PlainTextResponse)
+def get_cache_metrics(
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Expose les statistiques du cache au format Prometheus.
+    """
+    return cache_metrics_text()
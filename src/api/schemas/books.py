@@ -68,4 +68,18 @@ class BookInDBBase(BookBase):
 
 
 class Book(BookInDBBase):
-    categories: List[Category] = []
\ No newline at end of file
+    categories: List[Category] = []
+
+
+class BookSnapshot(Book):
+    """
+    Instantané immuable d'un livre, détaché de la session, stocké dans le cache.
+    """
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
+class BookSuggestion(BaseModel):
+    field: str = Field(..., description="Champ complété (title ou author)")
+    text: str = Field(..., description="Texte proposé")
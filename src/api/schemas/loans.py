@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from .users import User
 from .books import Book
@@ -26,6 +26,7 @@ class LoanUpdate(BaseModel):
 
 class LoanInDBBase(LoanBase):
     id: int
+    is_overdue: bool = Field(False, description="Indique si l'échéance est dépassée")
     created_at: datetime
     updated_at: datetime
 
@@ -39,4 +40,28 @@ class Loan(LoanInDBBase):
 
 class LoanWithDetails(Loan):
     user: User
-    book: Book
\ No newline at end of file
+    book: Book
+
+
+class LoanWithRelations(Loan):
+    # Relations incluses à la demande (`include=user,book`), nulles sinon
+    user: Optional[User] = None
+    book: Optional[Book] = None
+
+
+class LoanBulkCreate(BaseModel):
+    user_id: int = Field(..., description="ID de l'utilisateur")
+    book_ids: List[int] = Field(..., min_length=1, max_length=50, description="IDs des livres à emprunter")
+    loan_period_days: int = Field(14, gt=0, description="Durée de l'emprunt en jours")
+
+
+class LoanBulkReturn(BaseModel):
+    loan_ids: List[int] = Field(..., min_length=1, max_length=50, description="IDs des emprunts à retourner")
+
+
+class LoanBulkResult(BaseModel):
+    book_id: Optional[int] = Field(None, description="ID du livre (emprunt)")
+    loan_id: Optional[int] = Field(None, description="ID de l'emprunt (retour)")
+    success: bool = Field(..., description="Indique si l'opération a réussi")
+    loan: Optional[Loan] = Field(None, description="Emprunt créé ou retourné")
+    error: Optional[str] = Field(None, description="Motif de l'échec")
@@ -40,4 +40,14 @@ class User(UserInDBBase):
 
 
 class UserWithPassword(UserInDBBase):
-    hashed_password: str
\ No newline at end of file
+    hashed_password: str
+
+
+class UserSnapshot(UserInDBBase):
+    """
+    Instantané immuable d'un utilisateur, détaché de la session, stocké dans le cache
+    (sans le hash du mot de passe, qui n'est jamais mis en cache).
+    """
+    class Config:
+        from_attributes = True
+        frozen = True
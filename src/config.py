@@ -16,6 +16,34 @@ class Settings(BaseSettings):
     # Base de données
     DATABASE_URL: str = "sqlite:///./library.db"
 
+    # Cache ("memory" : propre à chaque processus, "sqlite" : partagé entre les workers)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "./cache.db"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 Mo
+    CACHE_SWEEP_INTERVAL: int = 60  # secondes
+
+    # Pagination : durée de vie des totaux mis en cache et plafond des totaux estimés
+    PAGINATION_COUNT_EXPIRY: int = 30  # secondes
+    PAGINATION_ESTIMATED_TOTAL_CAP: int = 1000
+
+    # Construction de l'index de recherche en mémoire au démarrage
+    SEARCH_INDEX_ON_STARTUP: bool = True
+    # Nombre maximal de résultats d'une recherche approchée
+    SEARCH_FUZZY_MAX_RESULTS: int = 1000
+    # Intervalle minimal entre deux comparaisons de la version de l'index avec la base
+    SEARCH_INDEX_CHECK_INTERVAL: int = 30  # secondes
+
+    # Tâche de fond marquant les emprunts en retard (intervalle maximal entre deux passages)
+    OVERDUE_SWEEPER_ON_STARTUP: bool = True
+    OVERDUE_SWEEP_INTERVAL: int = 60  # secondes
+
+    # Âge (en secondes) au-delà duquel les instantanés de statistiques sont recalculés
+    STATS_SNAPSHOT_MAX_AGE: int = 30
+    # Bornes des paramètres des statistiques (taille des classements, nombre de mois)
+    STATS_MAX_LIMIT: int = 100
+    STATS_MAX_MONTHS: int = 60
+
     class Config:
         case_sensitive = True
         env_file = ".env"
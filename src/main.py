@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
 from .api.routes import api_router
+from .db.session import SessionLocal
 from .models import base, books, users, loans  # Importer les modèles pour Alembic
+from .search.catalog import build_catalog_index
+from .utils.overdue import run_overdue_sweeper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index de recherche construit en arrière-plan : en attendant, les recherches passent par la base
+    if settings.SEARCH_INDEX_ON_STARTUP:
+        threading.Thread(target=build_catalog_index, args=(SessionLocal,), daemon=True).start()
+    # Marquage des emprunts en retard : en attendant, les retards sont calculés sur les dates
+    sweeper = None
+    if settings.OVERDUE_SWEEPER_ON_STARTUP:
+        sweeper = asyncio.create_task(run_overdue_sweeper(SessionLocal, settings.OVERDUE_SWEEP_INTERVAL))
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configuration CORS
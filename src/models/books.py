@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Index, CheckConstraint
+from sqlalchemy import Column, Integer, String, Table, Text, Index, CheckConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -24,8 +24,95 @@ class Book(Base):
         CheckConstraint('pages > 0', name='check_pages'),
         # Index composite sur titre et auteur pour les recherches
         Index('idx_book_title_author', 'title', 'author'),
+        # Exports incrémentaux (ordre de modification) et version du catalogue (MAX sans parcours)
+        Index('idx_book_updated_at_id', 'updated_at', 'id'),
     )
 
     # Relations
     loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan")
-    categories = relationship("Category", secondary="book_category", back_populates="books")
\ No newline at end of file
+    categories = relationship("Category", secondary="book_category", back_populates="books")
+
+
+# Index plein texte (SQLite FTS5) sur les champs textuels des livres.
+# Table externe ("external content") : seul l'index est stocké, les triggers le
+# maintiennent synchronisé avec la table book.
+BOOK_FTS_TABLE = "book_fts"
+BOOK_FTS_COLUMNS = ("title", "author", "description", "publisher")
+
+_fts_columns = ", ".join(BOOK_FTS_COLUMNS)
+_fts_new = ", ".join(f"new.{name}" for name in BOOK_FTS_COLUMNS)
+_fts_old = ", ".join(f"old.{name}" for name in BOOK_FTS_COLUMNS)
+
+BOOK_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {BOOK_FTS_TABLE} USING fts5("
+    f"{_fts_columns}, content='book', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_insert AFTER INSERT ON book BEGIN "
+    f"INSERT INTO {BOOK_FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_delete AFTER DELETE ON book BEGIN "
+    f"INSERT INTO {BOOK_FTS_TABLE}({BOOK_FTS_TABLE}, rowid, {_fts_columns}) VALUES ('delete', old.id, {_fts_old}); END",
+    # Seules les modifications des champs indexés réindexent le livre (pas le stock)
+    f"CREATE TRIGGER IF NOT EXISTS book_fts_update AFTER UPDATE OF {_fts_columns} ON book BEGIN "
+    f"INSERT INTO {BOOK_FTS_TABLE}({BOOK_FTS_TABLE}, rowid, {_fts_columns}) VALUES ('delete', old.id, {_fts_old}); "
+    f"INSERT INTO {BOOK_FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new}); END",
+]
+
+for _statement in BOOK_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Book.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {BOOK_FTS_TABLE}").execute_if(dialect="sqlite")
+)
+
+
+# Journal des modifications du catalogue : champs indexés (mêmes champs que l'index
+# plein texte) et catégories des livres, mais pas le stock. Alimenté par des triggers
+# (SQLite), il permet à chaque processus de l'API de rattraper les écritures des autres
+# dans son index de recherche en mémoire (voir search/catalog.py). Seules les
+# CATALOG_CHANGE_RETENTION dernières entrées sont conservées.
+CATALOG_CHANGE_TABLE = "catalog_change"
+CATALOG_CHANGE_RETENTION = 10000
+
+catalog_change = Table(
+    CATALOG_CHANGE_TABLE,
+    Base.metadata,
+    # Numéro croissant, jamais réutilisé (AUTOINCREMENT) : la génération du catalogue
+    Column("generation", Integer, primary_key=True),
+    # "insert", "update", "delete", "add_category" ou "remove_category"
+    Column("operation", String(20), nullable=False),
+    Column("book_id", Integer, nullable=False),
+    Column("category_id", Integer, nullable=True),
+    *[Column(f"old_{name}", Text, nullable=True) for name in BOOK_FTS_COLUMNS],
+    *[Column(f"new_{name}", Text, nullable=True) for name in BOOK_FTS_COLUMNS],
+    sqlite_autoincrement=True,
+)
+
+_change_old = ", ".join(f"old_{name}" for name in BOOK_FTS_COLUMNS)
+_change_new = ", ".join(f"new_{name}" for name in BOOK_FTS_COLUMNS)
+_changed = " OR ".join(f"old.{name} IS NOT new.{name}" for name in BOOK_FTS_COLUMNS)
+
+CATALOG_CHANGE_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS book_catalog_insert AFTER INSERT ON book BEGIN "
+    f"INSERT INTO {CATALOG_CHANGE_TABLE}(operation, book_id, {_change_new}) "
+    f"VALUES ('insert', new.id, {_fts_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_catalog_update AFTER UPDATE OF {_fts_columns} ON book "
+    f"WHEN {_changed} BEGIN "
+    f"INSERT INTO {CATALOG_CHANGE_TABLE}(operation, book_id, {_change_old}, {_change_new}) "
+    f"VALUES ('update', new.id, {_fts_old}, {_fts_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_catalog_delete AFTER DELETE ON book BEGIN "
+    f"INSERT INTO {CATALOG_CHANGE_TABLE}(operation, book_id, {_change_old}) "
+    f"VALUES ('delete', old.id, {_fts_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_category_catalog_insert AFTER INSERT ON book_category BEGIN "
+    f"INSERT INTO {CATALOG_CHANGE_TABLE}(operation, book_id, category_id) "
+    f"VALUES ('add_category', new.book_id, new.category_id); END",
+    f"CREATE TRIGGER IF NOT EXISTS book_category_catalog_delete AFTER DELETE ON book_category BEGIN "
+    f"INSERT INTO {CATALOG_CHANGE_TABLE}(operation, book_id, category_id) "
+    f"VALUES ('remove_category', old.book_id, old.category_id); END",
+    # Purge au fil de l'eau : une recherche par clé primaire, sans parcours du journal
+    f"CREATE TRIGGER IF NOT EXISTS catalog_change_prune AFTER INSERT ON {CATALOG_CHANGE_TABLE} BEGIN "
+    f"DELETE FROM {CATALOG_CHANGE_TABLE} WHERE generation <= new.generation - {CATALOG_CHANGE_RETENTION}; END",
+]
+
+# Les triggers portent sur book et book_category : créés une fois toutes les tables créées
+for _statement in CATALOG_CHANGE_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, CheckConstraint, Index, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, CheckConstraint, Index, Boolean, false, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -12,15 +12,22 @@ class Loan(Base):
     return_date = Column(DateTime, nullable=True)
     due_date = Column(DateTime, nullable=False)
     extended = Column(Boolean, default=False, nullable=False)
+    # Marqué par la tâche de fond dès que l'échéance est dépassée (remis à faux au retour)
+    is_overdue = Column(Boolean, default=False, server_default=false(), nullable=False)
 
     # Contraintes
     __table_args__ = (
         CheckConstraint('due_date > loan_date', name='check_due_date_after_loan_date'),
         CheckConstraint('return_date IS NULL OR return_date >= loan_date', name='check_return_date_after_loan_date'),
-        # Index pour les recherches fréquentes
-        Index('idx_loan_user_id', 'user_id'),
-        Index('idx_loan_book_id', 'book_id'),
+        # Index pour les recherches fréquentes (les index composites servent aussi
+        # les recherches par user_id seul et par book_id seul)
+        Index('idx_loan_user_return_date', 'user_id', 'return_date'),
+        Index('idx_loan_book_user_return_date', 'book_id', 'user_id', 'return_date'),
         Index('idx_loan_return_date', 'return_date'),
+        # Index partiel : uniquement les emprunts en retard, dans l'ordre des IDs
+        Index('idx_loan_overdue', 'id', sqlite_where=text('is_overdue = 1')),
+        # Exports incrémentaux, dans l'ordre de modification
+        Index('idx_loan_updated_at_id', 'updated_at', 'id'),
     )
 
     # Relations
@@ -1,10 +1,13 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from datetime import datetime
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..models.base import Base
+from ..utils.projection import projection_options
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -26,12 +29,33 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return self.db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, *, skip: int = 0, limit: int = 100
+        self, *, skip: int = 0, limit: int = 100, fields: Optional[Tuple[str, ...]] = None
     ) -> List[ModelType]:
         """
         Récupère plusieurs objets avec pagination.
+
+        `fields` limite les colonnes chargées (projection).
+        """
+        return self.db.query(self.model).options(
+            *projection_options(self.model, fields)
+        ).offset(skip).limit(limit).all()
+
+    def stream(
+        self,
+        *,
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000,
+        options: Sequence[Any] = ()
+    ) -> Iterator[ModelType]:
+        """
+        Parcourt tous les objets (modifiés depuis `updated_since`) par lots de `batch_size`,
+        avec un curseur côté serveur : la mémoire utilisée ne dépend pas du nombre de lignes.
         """
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+        query = self.db.query(self.model).options(*options)
+        if updated_since is not None:
+            query = query.filter(self.model.updated_at >= updated_since)
+        query = query.order_by(self.model.updated_at, self.model.id)
+        yield from query.execution_options(stream_results=True).yield_per(batch_size)
 
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -1,32 +1,238 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy import String, cast, column, false, func, literal, literal_column, null, or_, select, table, union_all
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from datetime import datetime
+import re
 
 from .base import BaseRepository
-from ..models.books import Book
+from ..config import settings
+from ..models.books import Book, BOOK_FTS_TABLE
 from ..models.categories import Category, book_category
-from ..utils.cache import cache, invalidate_cache
+from ..api.schemas.books import BookSnapshot
+from ..utils.cache import cache, invalidate_tags
+from ..search.catalog import catalog_index
+
+# Tags de cache des livres
+BOOKS_LIST_TAG = "books:list"
+
+
+def book_tag(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+def isbn_tag(isbn: str) -> str:
+    return f"isbn:{isbn}"
+
+
+def _book_snapshot(book: Book) -> BookSnapshot:
+    return BookSnapshot.model_validate(book, from_attributes=True)
+
+
+# Index plein texte : colonne cachée portant le nom de la table (opérande de MATCH)
+book_fts = table(BOOK_FTS_TABLE, column("rowid"))
+_book_fts_column = literal_column(BOOK_FTS_TABLE)
+# Poids BM25 des colonnes (title, author, description, publisher)
+BOOK_FTS_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+_ISBN_PATTERN = re.compile(r"^[0-9]{9}[0-9Xx]([0-9]{3})?$")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def is_isbn(text: str) -> bool:
+    """
+    Indique si un texte est un ISBN-10 ou ISBN-13 (avec ou sans tirets).
+    """
+    return bool(_ISBN_PATTERN.match(text.strip().replace("-", "")))
+
+
+def fts_match(text: str, columns: Sequence[str] = ()) -> Optional[str]:
+    """
+    Construit une requête FTS5 à partir d'un texte libre : chaque mot est recherché
+    comme préfixe (ex: "pott" trouve "Potter"), éventuellement limité à des colonnes.
+
+    Retourne None si le texte ne contient aucun mot.
+    """
+    words = _WORD_PATTERN.findall(text)
+    if not words:
+        return None
+    prefix = f"{{{' '.join(columns)}}} : " if columns else ""
+    return " ".join(f'{prefix}"{word}"*' for word in words)
+
+
+def _isbn_cache_tags(book: Optional[BookSnapshot], *args, isbn: str, **kwargs) -> List[str]:
+    tags = [isbn_tag(isbn)]
+    if book is not None:
+        tags.append(book_tag(book.id))
+    return tags
+
+
+def _books_list_cache_tags(*args, **kwargs) -> List[str]:
+    return [BOOKS_LIST_TAG]
 
 
 class BookRepository(BaseRepository[Book, None, None]):
-    @cache(expiry=60)  # Cache pendant 1 minute
-    def get_by_isbn(self, *, isbn: str) -> Optional[Book]:
+    @cache(
+        expiry=60,  # Cache pendant 1 minute
+        negative_expiry=10,  # ISBN inconnu : 10 secondes
+        tags=_isbn_cache_tags,
+        early_refresh=1.0,
+        snapshot=_book_snapshot,
+        key=("isbn",)
+    )
+    def get_by_isbn(self, *, isbn: str) -> Optional[BookSnapshot]:
         """
-        Récupère un livre par son ISBN.
+        Récupère un livre par son ISBN, sous forme d'instantané détaché de la session.
         """
-        return self.db.query(Book).filter(Book.isbn == isbn).first()
+        return self.db.query(Book).options(joinedload(Book.categories)).filter(Book.isbn == isbn).first()
 
     def get_by_title(self, *, title: str) -> List[Book]:
         """
         Récupère des livres par leur titre (recherche partielle).
         """
-        return self.db.query(Book).filter(Book.title.ilike(f"%{title}%")).all()
+        return self.filter_text(self.db.query(Book), title, columns=("title",)).all()
 
     def get_by_author(self, *, author: str) -> List[Book]:
         """
         Récupère des livres par leur auteur (recherche partielle).
         """
-        return self.db.query(Book).filter(Book.author.ilike(f"%{author}%")).all()
+        return self.filter_text(self.db.query(Book), author, columns=("author",)).all()
+
+    def filter_categories(self, query: Query, category_ids: Sequence[int], mode: str = "any") -> Query:
+        """
+        Filtre une requête sur les livres appartenant à au moins une ("any") ou à toutes
+        ("all") les catégories, par sous-requête (sans jointure, donc sans doublons).
+        """
+        category_ids = list(dict.fromkeys(category_ids))
+        members = select(book_category.c.book_id).where(book_category.c.category_id.in_(category_ids))
+        if mode == "all":
+            members = members.group_by(book_category.c.book_id).having(
+                func.count(book_category.c.category_id) == len(category_ids)
+            )
+        return query.filter(Book.id.in_(members))
+
+    def filter_text(
+        self,
+        query: Query,
+        text: str,
+        columns: Sequence[str] = (),
+        rank: bool = True
+    ) -> Query:
+        """
+        Filtre une requête sur les livres par recherche plein texte, triée par pertinence (BM25).
+
+        Utilise l'index FTS5 sous SQLite (coût indépendant de la taille du catalogue) et
+        se replie sur LIKE pour les autres bases. Un ISBN (avec ou sans tirets) est
+        recherché sur l'index de la colonne isbn. Avec `rank=False`, le filtre n'impose
+        pas d'ordre et peut être combiné à une autre recherche plein texte.
+        """
+        if not columns and is_isbn(text):
+            return query.filter(Book.isbn == text.strip().replace("-", ""))
+
+        if self.db.get_bind().dialect.name != "sqlite":
+            fields = [getattr(Book, name) for name in columns] or [
+                Book.title, Book.author, Book.isbn, Book.description, Book.publisher
+            ]
+            return query.filter(or_(*[field.ilike(f"%{text}%") for field in fields]))
+
+        match = fts_match(text, columns)
+        if match is None:
+            return query.filter(false())
+        if not rank:
+            return query.filter(Book.id.in_(
+                select(book_fts.c.rowid).where(_book_fts_column.op("MATCH")(match))
+            ))
+        return query.join(book_fts, book_fts.c.rowid == Book.id).filter(
+            _book_fts_column.op("MATCH")(match)
+        ).order_by(func.bm25(_book_fts_column, *BOOK_FTS_WEIGHTS))
+
+    def get_by_ids(self, *, ids: Sequence[int], options: Sequence[Any] = ()) -> List[Book]:
+        """
+        Récupère des livres par leurs IDs, dans l'ordre des IDs donnés.
+        """
+        books = self.db.query(Book).options(*options).filter(Book.id.in_(ids)).all()
+        by_id = {book.id: book for book in books}
+        return [by_id[id] for id in ids if id in by_id]
+
+    def get_quantities(self, *, ids: Sequence[int]) -> Dict[int, int]:
+        """
+        Récupère le nombre d'exemplaires disponibles de plusieurs livres, par ID.
+        """
+        return dict(self.db.query(Book.id, Book.quantity).filter(Book.id.in_(ids)).all())
+
+    def get_suggestions(self, *, prefix: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Complétions (champ, texte) des titres et auteurs commençant par `prefix`, des plus
+        fréquentes aux moins fréquentes.
+        """
+        # Les jokers de LIKE saisis par l'utilisateur sont recherchés littéralement
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        suggestions = []
+        for field in (Book.title, Book.author):
+            count = func.count().label("count")
+            rows = self.db.query(field, count).filter(
+                field.ilike(pattern, escape="\\")
+            ).group_by(field).order_by(count.desc(), field).limit(limit)
+            suggestions.extend((field.key, value, n) for value, n in rows)
+        suggestions.sort(key=lambda suggestion: (-suggestion[2], suggestion[1].casefold(), suggestion[0]))
+        return [(field, value) for field, value, _ in suggestions[:limit]]
+
+    def get_facets(self, *, query: Query) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Compte les livres d'une requête par catégorie, langue et décennie de publication,
+        en une seule requête (agrégats groupés réunis par UNION ALL).
+        """
+        ids = query.with_entities(Book.id).order_by(None).cte("facet_ids")
+        in_results = Book.id.in_(select(ids.c.id))
+
+        by_category = select(
+            literal("category").label("facet"),
+            cast(Category.id, String).label("value"),
+            Category.name.label("label"),
+            func.count().label("count")
+        ).select_from(book_category).join(
+            Category, Category.id == book_category.c.category_id
+        ).where(
+            book_category.c.book_id.in_(select(ids.c.id))
+        ).group_by(Category.id, Category.name)
+
+        by_language = select(
+            literal("language"),
+            cast(Book.language, String),
+            null(),
+            func.count()
+        ).where(in_results).group_by(Book.language)
+
+        decade = (Book.publication_year // 10) * 10
+        by_decade = select(
+            literal("decade"),
+            cast(decade, String),
+            null(),
+            func.count()
+        ).where(in_results).group_by(decade)
+
+        facets: Dict[str, List[Dict[str, Any]]] = {"category": [], "language": [], "decade": []}
+        for facet, value, label, count in self.db.execute(union_all(by_category, by_language, by_decade)):
+            facets[facet].append({"value": value, "label": label, "count": count})
+        for counts in facets.values():
+            counts.sort(key=lambda item: (-item["count"], item["value"] or ""))
+        return facets
+
+    @cache(expiry=settings.PAGINATION_COUNT_EXPIRY, tags=_books_list_cache_tags)
+    def get_version(self) -> Tuple[Optional[datetime], int]:
+        """
+        Récupère la date de dernière modification et le nombre de livres (validation HTTP).
+
+        Mise en cache jusqu'à la prochaine écriture sur les livres (tag BOOKS_LIST_TAG, y
+        compris les changements de stock) : une requête conditionnelle ne lit pas la table.
+        """
+        last_modified, count = self.db.query(func.max(Book.updated_at), func.count(Book.id)).one()
+        return last_modified, count
+
+    def get_updated_at(self, *, id: int) -> Optional[Tuple[int, Optional[datetime]]]:
+        """
+        Récupère uniquement l'ID et la date de modification d'un livre (validation HTTP).
+        """
+        return self.db.query(Book.id, Book.updated_at).filter(Book.id == id).first()
 
     def get_with_categories(self, *, id: int) -> Optional[Book]:
         """
@@ -42,15 +248,9 @@ class BookRepository(BaseRepository[Book, None, None]):
 
     def search(self, *, query: str) -> List[Book]:
         """
-        Recherche des livres par titre, auteur ou ISBN.
+        Recherche des livres par titre, auteur, description, éditeur ou ISBN, par pertinence.
         """
-        return self.db.query(Book).filter(
-            or_(
-                Book.title.ilike(f"%{query}%"),
-                Book.author.ilike(f"%{query}%"),
-                Book.isbn.ilike(f"%{query}%")
-            )
-        ).all()
+        return self.filter_text(self.db.query(Book), query).all()
 
     def get_by_category(self, *, category_id: int, skip: int = 0, limit: int = 100) -> List[Book]:
         """
@@ -73,7 +273,11 @@ class BookRepository(BaseRepository[Book, None, None]):
             raise ValueError(f"Catégorie avec l'ID {category_id} non trouvée")
 
         book.categories.append(category)
+        # Les catégories font partie de la représentation du livre (ETag)
+        book.updated_at = datetime.utcnow()
         self.db.commit()
+        invalidate_tags(book_tag(book_id), BOOKS_LIST_TAG)
+        catalog_index.sync(self.db)
 
     def remove_category(self, *, book_id: int, category_id: int) -> None:
         """
@@ -88,7 +292,10 @@ class BookRepository(BaseRepository[Book, None, None]):
             raise ValueError(f"Catégorie avec l'ID {category_id} non trouvée")
 
         book.categories.remove(category)
+        book.updated_at = datetime.utcnow()
         self.db.commit()
+        invalidate_tags(book_tag(book_id), BOOKS_LIST_TAG)
+        catalog_index.sync(self.db)
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -106,24 +313,28 @@ class BookRepository(BaseRepository[Book, None, None]):
     
     def create(self, *, obj_in: Any) -> Book:
         """
-        Crée un nouveau livre et invalide le cache.
+        Crée un nouveau livre, invalide le cache et met à jour l'index de recherche.
         """
         book = super().create(obj_in=obj_in)
-        invalidate_cache("src.repositories.books")
+        invalidate_tags(isbn_tag(book.isbn), BOOKS_LIST_TAG)
+        catalog_index.sync(self.db)
         return book
 
     def update(self, *, db_obj: Book, obj_in: Any) -> Book:
         """
-        Met à jour un livre et invalide le cache.
+        Met à jour un livre, invalide le cache et met à jour l'index de recherche.
         """
+        old_isbn = db_obj.isbn
         book = super().update(db_obj=db_obj, obj_in=obj_in)
-        invalidate_cache("src.repositories.books")
+        invalidate_tags(book_tag(book.id), isbn_tag(old_isbn), isbn_tag(book.isbn), BOOKS_LIST_TAG)
+        catalog_index.sync(self.db)
         return book
 
     def remove(self, *, id: int) -> Book:
         """
-        Supprime un livre et invalide le cache.
+        Supprime un livre, invalide le cache et met à jour l'index de recherche.
         """
         book = super().remove(id=id)
-        invalidate_cache("src.repositories.books")
+        invalidate_tags(book_tag(book.id), isbn_tag(book.isbn), BOOKS_LIST_TAG)
+        catalog_index.sync(self.db)
         return book
\ No newline at end of file
@@ -1,12 +1,42 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Query, Session, joinedload, noload, selectinload
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple
+from collections import Counter
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, bindparam, insert, update
 
 from .base import BaseRepository
+from .books import BOOKS_LIST_TAG, book_tag, isbn_tag
 from ..models.loans import Loan
 from ..models.books import Book
 from ..models.users import User
+from ..utils.cache import invalidate_tags
+from ..utils.overdue import LOANS_LIST_TAG, overdue_sweeper
+
+# Relations d'un emprunt pouvant être incluses dans les réponses
+LOAN_RELATIONS = ("user", "book")
+
+
+def _invalidate_books(books: Iterable[Tuple[int, Optional[str]]]) -> None:
+    """
+    Invalide le cache des livres (id, isbn) dont le stock a changé et des listes d'emprunts.
+    Le stock n'est pas indexé : l'index de recherche n'est pas concerné.
+    """
+    tags = [BOOKS_LIST_TAG, LOANS_LIST_TAG]
+    for book_id, isbn in books:
+        tags.append(book_tag(book_id))
+        if isbn:
+            tags.append(isbn_tag(isbn))
+    invalidate_tags(*tags)
+
+
+def overdue_condition() -> Any:
+    """
+    Condition SQL « emprunt en retard » : lecture de l'indicateur `is_overdue` (index
+    partiel) une fois les échéances suivies par la tâche de fond, calcul sur les dates sinon.
+    """
+    if overdue_sweeper.ready:
+        return Loan.is_overdue == True
+    return and_(Loan.return_date == None, Loan.due_date < datetime.utcnow())
 
 
 class LoanRepository(BaseRepository[Loan, None, None]):
@@ -20,11 +50,199 @@ class LoanRepository(BaseRepository[Loan, None, None]):
         """
         Récupère les emprunts en retard.
         """
+        return self.db.query(Loan).filter(overdue_condition()).all()
+
+    def has_active_loan(self, *, user_id: int, book_id: int) -> bool:
+        """
+        Indique si l'utilisateur a un emprunt non retourné de ce livre
+        (index idx_loan_book_user_return_date).
+        """
+        return self.db.query(
+            self.db.query(Loan.id).filter(
+                Loan.book_id == book_id,
+                Loan.user_id == user_id,
+                Loan.return_date == None
+            ).exists()
+        ).scalar()
+
+    def count_active_loans_by_user(self, *, user_id: int) -> int:
+        """
+        Compte les emprunts non retournés d'un utilisateur (index idx_loan_user_return_date).
+        """
+        return self.db.query(func.count(Loan.id)).filter(
+            Loan.user_id == user_id,
+            Loan.return_date == None
+        ).scalar() or 0
+
+    def checkout(self, *, user_id: int, book_id: int, due_date: datetime) -> Optional[Loan]:
+        """
+        Crée un emprunt et retire un exemplaire du stock en une seule transaction.
+
+        Le stock est décrémenté par un UPDATE conditionnel (quantity > 0) : deux emprunts
+        simultanés du dernier exemplaire ne peuvent pas réussir tous les deux.
+        Retourne None si aucun exemplaire n'est disponible.
+        """
+        now = datetime.utcnow()
+        isbn = self.db.execute(
+            update(Book)
+            .where(Book.id == book_id, Book.quantity > 0)
+            .values(quantity=Book.quantity - 1, updated_at=now)
+            .returning(Book.isbn)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        if isbn is None:
+            return None
+
+        loan = Loan(user_id=user_id, book_id=book_id, loan_date=now, due_date=due_date, return_date=None)
+        self.db.add(loan)
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        _invalidate_books([(book_id, isbn)])
+        overdue_sweeper.schedule([(loan.id, due_date)])
+        self.db.refresh(loan)
+        return loan
+
+    def check_in(self, *, loan: Loan) -> Optional[Loan]:
+        """
+        Marque un emprunt comme retourné et remet l'exemplaire en stock en une seule transaction.
+
+        Retourne None si l'emprunt a déjà été retourné (y compris par une requête concurrente).
+        """
+        now = datetime.utcnow()
+        overdue = loan.is_overdue
+        returned = self.db.execute(
+            update(Loan)
+            .where(Loan.id == loan.id, Loan.return_date == None)
+            .values(return_date=now, is_overdue=False, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not returned:
+            return None
+
+        isbn = self.db.execute(
+            update(Book)
+            .where(Book.id == loan.book_id)
+            .values(quantity=Book.quantity + 1, updated_at=now)
+            .returning(Book.isbn)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        _invalidate_books([(loan.book_id, isbn)])
+        overdue_sweeper.returned(1 if overdue else 0)
+        self.db.refresh(loan)
+        return loan
+
+    def checkout_many(self, *, user_id: int, book_ids: Sequence[int], due_date: datetime) -> List[Loan]:
+        """
+        Crée les emprunts d'un lot de livres (distincts) en une seule transaction.
+
+        Le stock est décrémenté par un seul UPDATE conditionnel (quantity > 0) qui retourne
+        les livres effectivement réservés ; seuls ceux-ci donnent lieu à un emprunt.
+        """
+        now = datetime.utcnow()
+        reserved = dict(self.db.execute(
+            update(Book)
+            .where(Book.id.in_(book_ids), Book.quantity > 0)
+            .values(quantity=Book.quantity - 1, updated_at=now)
+            .returning(Book.id, Book.isbn)
+            .execution_options(synchronize_session=False)
+        ).all())
+        if not reserved:
+            return []
+
+        loan_ids = self.db.scalars(
+            insert(Loan).returning(Loan.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": user_id,
+                    "book_id": book_id,
+                    "loan_date": now,
+                    "due_date": due_date,
+                    "return_date": None,
+                    "extended": False,
+                    "is_overdue": False,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for book_id in book_ids if book_id in reserved
+            ]
+        ).all()
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        _invalidate_books(reserved.items())
+        overdue_sweeper.schedule([(loan_id, due_date) for loan_id in loan_ids])
+        return self.get_by_ids(ids=loan_ids)
+
+    def check_in_many(self, *, loan_ids: Sequence[int]) -> List[Loan]:
+        """
+        Marque un lot d'emprunts comme retournés et remet les exemplaires en stock, en une
+        seule transaction (un UPDATE conditionnel des emprunts, un executemany sur le stock).
+
+        Les emprunts déjà retournés (y compris par une requête concurrente) sont ignorés.
+        """
         now = datetime.utcnow()
-        return self.db.query(Loan).filter(
-            Loan.return_date == None,
-            Loan.due_date < now
+        overdue = 0
+        if overdue_sweeper.ready:
+            overdue = self.db.query(func.count(Loan.id)).filter(
+                Loan.id.in_(loan_ids),
+                Loan.is_overdue == True
+            ).scalar() or 0
+        returned = self.db.execute(
+            update(Loan)
+            .where(Loan.id.in_(loan_ids), Loan.return_date == None)
+            .values(return_date=now, is_overdue=False, updated_at=now)
+            .returning(Loan.id, Loan.book_id)
+            .execution_options(synchronize_session=False)
         ).all()
+        if not returned:
+            return []
+
+        copies = Counter(book_id for _, book_id in returned)
+        book_table = Book.__table__
+        self.db.execute(
+            update(book_table)
+            .where(book_table.c.id == bindparam("book_id"))
+            .values(quantity=book_table.c.quantity + bindparam("copies"), updated_at=now),
+            [{"book_id": book_id, "copies": count} for book_id, count in copies.items()]
+        )
+        books = self.db.query(Book.id, Book.isbn).filter(Book.id.in_(copies)).all()
+        try:
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        _invalidate_books(books)
+        overdue_sweeper.returned(overdue)
+        returned_ids = {loan_id for loan_id, _ in returned}
+        return self.get_by_ids(ids=[id for id in loan_ids if id in returned_ids])
+
+    def get_by_ids(self, *, ids: Sequence[int]) -> List[Loan]:
+        """
+        Récupère des emprunts par leurs IDs, dans l'ordre des IDs donnés.
+        """
+        loans = self.db.query(Loan).filter(Loan.id.in_(ids)).all()
+        by_id = {loan.id: loan for loan in loans}
+        return [by_id[id] for id in ids if id in by_id]
+
+    def get_active_book_ids_by_user(self, *, user_id: int) -> List[int]:
+        """
+        Récupère les IDs des livres empruntés et non rendus par un utilisateur
+        (index idx_loan_user_return_date).
+        """
+        return [book_id for (book_id,) in self.db.query(Loan.book_id).filter(
+            Loan.user_id == user_id,
+            Loan.return_date == None
+        )]
 
     def get_loans_by_user(self, *, user_id: int) -> List[Loan]:
         """
@@ -38,23 +256,56 @@ class LoanRepository(BaseRepository[Loan, None, None]):
         """
         return self.db.query(Loan).filter(Loan.book_id == book_id).all()
 
+    def details_options(self, include: Sequence[str] = LOAN_RELATIONS) -> List[Any]:
+        """
+        Options de chargement des relations : celles de `include` sont chargées par jointure
+        (avec les catégories du livre), les autres ne sont pas chargées du tout.
+        """
+        options = []
+        for name in LOAN_RELATIONS:
+            relation = getattr(Loan, name)
+            if name not in include:
+                options.append(noload(relation))
+            elif name == "book":
+                options.append(joinedload(relation).selectinload(Book.categories))
+            else:
+                options.append(joinedload(relation))
+        return options
+
+    def query_loans(
+        self,
+        *,
+        status: Optional[str] = None,
+        user_id: Optional[int] = None,
+        book_id: Optional[int] = None,
+        options: Sequence[Any] = ()
+    ) -> Query:
+        """
+        Requête (non exécutée) des emprunts, filtrés par statut ("active" ou "overdue"),
+        utilisateur ou livre, à paginer.
+        """
+        query = self.db.query(Loan).options(*options)
+        if status == "active":
+            query = query.filter(Loan.return_date == None)
+        elif status == "overdue":
+            query = query.filter(overdue_condition())
+        if user_id is not None:
+            query = query.filter(Loan.user_id == user_id)
+        if book_id is not None:
+            query = query.filter(Loan.book_id == book_id)
+        return query
+
     def get_with_details(self, *, id: int) -> Optional[Loan]:
         """
         Récupère un emprunt avec les détails du livre et de l'utilisateur.
         """
-        return self.db.query(Loan).options(
-            joinedload(Loan.user),
-            joinedload(Loan.book)
-        ).filter(Loan.id == id).first()
+        return self.db.query(Loan).options(*self.details_options()).filter(Loan.id == id).first()
 
     def get_multi_with_details(self, *, skip: int = 0, limit: int = 100) -> List[Loan]:
         """
         Récupère plusieurs emprunts avec les détails des livres et des utilisateurs.
         """
-        return self.db.query(Loan).options(
-            joinedload(Loan.user),
-            joinedload(Loan.book)
-        ).offset(skip).limit(limit).all()
+        return self.db.query(Loan).options(*self.details_options()).offset(skip).limit(limit).all()
 
     def get_loans_stats(self) -> Dict[str, Any]:
         """
@@ -63,10 +314,10 @@ class LoanRepository(BaseRepository[Loan, None, None]):
         now = datetime.utcnow()
         total_loans = self.db.query(func.count(Loan.id)).scalar() or 0
         active_loans = self.db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0
-        overdue_loans = self.db.query(func.count(Loan.id)).filter(
-            Loan.return_date == None,
-            Loan.due_date < now
-        ).scalar() or 0
+        if overdue_sweeper.ready:
+            overdue_loans = overdue_sweeper.overdue_count
+        else:
+            overdue_loans = self.db.query(func.count(Loan.id)).filter(overdue_condition()).scalar() or 0
 
         # Emprunts par mois (12 derniers mois)
         start_date = now - timedelta(days=365)
@@ -86,4 +337,34 @@ class LoanRepository(BaseRepository[Loan, None, None]):
             "active_loans": active_loans,
             "overdue_loans": overdue_loans,
             "loans_by_month": loans_by_month_dict
-        }
\ No newline at end of file
+        }
+
+    def create(self, *, obj_in: Any) -> Loan:
+        """
+        Crée un emprunt et suit son échéance.
+        """
+        loan = super().create(obj_in=obj_in)
+        invalidate_tags(LOANS_LIST_TAG)
+        overdue_sweeper.schedule([(loan.id, loan.due_date)])
+        return loan
+
+    def update(self, *, db_obj: Loan, obj_in: Any) -> Loan:
+        """
+        Met à jour un emprunt et suit sa nouvelle échéance (prolongation).
+        """
+        old_due_date = db_obj.due_date
+        loan = super().update(db_obj=db_obj, obj_in=obj_in)
+        invalidate_tags(LOANS_LIST_TAG)
+        if loan.return_date is None and loan.due_date != old_due_date:
+            overdue_sweeper.schedule([(loan.id, loan.due_date)])
+        return loan
+
+    def remove(self, *, id: int) -> Loan:
+        """
+        Supprime un emprunt et le décompte des retards s'il était en retard.
+        """
+        overdue = self.db.query(Loan.is_overdue).filter(Loan.id == id).scalar()
+        loan = super().remove(id=id)
+        invalidate_tags(LOANS_LIST_TAG)
+        overdue_sweeper.returned(1 if overdue else 0)
+        return loan
@@ -1,12 +1,72 @@
 from sqlalchemy.orm import Session
+from typing import Any, List, Optional
 
 from .base import BaseRepository
 from ..models.users import User
+from ..api.schemas.users import UserSnapshot
+from ..utils.cache import cache, invalidate_tags
+
+
+def user_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def email_tag(email: str) -> str:
+    return f"email:{email}"
+
+
+def _user_snapshot(user: User) -> UserSnapshot:
+    return UserSnapshot.model_validate(user, from_attributes=True)
+
+
+def _email_cache_tags(user: Optional[UserSnapshot], *args, email: str, **kwargs) -> List[str]:
+    tags = [email_tag(email)]
+    if user is not None:
+        tags.append(user_tag(user.id))
+    return tags
 
 
 class UserRepository(BaseRepository[User, None, None]):
-    def get_by_email(self, *, email: str) -> User:
+    @cache(
+        expiry=60,  # Cache pendant 1 minute
+        negative_expiry=10,  # Email inconnu : 10 secondes
+        tags=_email_cache_tags,
+        snapshot=_user_snapshot,
+        key=("email",)
+    )
+    def get_by_email(self, *, email: str) -> Optional[UserSnapshot]:
+        """
+        Récupère un utilisateur par son email, sous forme d'instantané détaché de la session.
+        """
+        return self.db.query(User).filter(User.email == email).first()
+
+    def get_hashed_password(self, *, id: int) -> Optional[str]:
+        """
+        Récupère le hash du mot de passe d'un utilisateur (lecture non mise en cache).
+        """
+        return self.db.query(User.hashed_password).filter(User.id == id).scalar()
+
+    def create(self, *, obj_in: Any) -> User:
+        """
+        Crée un nouvel utilisateur et invalide le cache.
+        """
+        user = super().create(obj_in=obj_in)
+        invalidate_tags(email_tag(user.email))
+        return user
+
+    def update(self, *, db_obj: User, obj_in: Any) -> User:
+        """
+        Met à jour un utilisateur et invalide le cache.
+        """
+        old_email = db_obj.email
+        user = super().update(db_obj=db_obj, obj_in=obj_in)
+        invalidate_tags(user_tag(user.id), email_tag(old_email), email_tag(user.email))
+        return user
+
+    def remove(self, *, id: int) -> User:
         """
-        Récupère un utilisateur par son email.
+        Supprime un utilisateur et invalide le cache.
         """
-        return self.db.query(User).filter(User.email == email).first()
\ No newline at end of file
+        user = super().remove(id=id)
+        invalidate_tags(user_tag(user.id), email_tag(user.email))
+        return user
@@ -0,0 +1,6 @@
+from .text import normalize, tokenize
+from .inverted_index import InvertedIndex
+from .trigram import TrigramIndex
+from .prefix import PrefixIndex
+from .bitmap import CategoryBitmaps
+from .catalog import CatalogIndex, catalog_index, build_catalog_index
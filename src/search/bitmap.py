@@ -0,0 +1,117 @@
+from array import array
+from typing import Dict, Iterable, Sequence
+import threading
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    """
+    Construit un bitmap (entier Python) dont le bit n° i est à 1 si l'ID i est présent.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for doc_id in ids:
+        buffer[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+# Positions des bits à 1 de chaque octet
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def bitmap_to_ids(bitmap: int) -> array:
+    """
+    IDs triés des bits à 1 d'un bitmap.
+    """
+    ids = array("I")
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+
+    if bitmap.bit_count() * 4 > len(data):
+        # Bitmap dense : parcours octet par octet
+        for index, byte in enumerate(data):
+            if byte:
+                base = index * 8
+                for bit in _BYTE_BITS[byte]:
+                    ids.append(base + bit)
+        return ids
+
+    # Bitmap creux : recherche des bits à 1 dans la représentation binaire
+    bits = bin(bitmap)[:1:-1]  # bit de poids faible en premier
+    position = bits.find("1")
+    while position != -1:
+        ids.append(position)
+        position = bits.find("1", position + 1)
+    return ids
+
+
+class CategoryBitmaps:
+    """
+    Appartenance des livres aux catégories : un bitmap d'IDs de livres par catégorie.
+
+    Les combinaisons de catégories se calculent par opérations bit à bit sur des
+    entiers Python (OU pour "au moins une", ET pour "toutes"), exécutées en C
+    mot machine par mot machine. Un bitmap occupe un bit par ID jusqu'au plus
+    grand ID de la catégorie (125 Ko pour un million de livres).
+    """
+    def __init__(self):
+        self._bitmaps: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bitmaps)
+
+    def load(self, members: Dict[int, Iterable[int]]) -> None:
+        """
+        Remplace le contenu à partir de {ID de catégorie: IDs des livres}.
+        """
+        bitmaps = {category_id: bitmap_from_ids(ids) for category_id, ids in members.items()}
+        with self._lock:
+            self._bitmaps = bitmaps
+
+    def clear(self) -> None:
+        """
+        Vide l'index.
+        """
+        self.load({})
+
+    def add(self, category_id: int, book_id: int) -> None:
+        """
+        Ajoute un livre à une catégorie.
+        """
+        with self._lock:
+            self._bitmaps[category_id] = self._bitmaps.get(category_id, 0) | (1 << book_id)
+
+    def remove(self, category_id: int, book_id: int) -> None:
+        """
+        Retire un livre d'une catégorie.
+        """
+        with self._lock:
+            if category_id in self._bitmaps:
+                self._bitmaps[category_id] &= ~(1 << book_id)
+
+    def remove_book(self, book_id: int) -> None:
+        """
+        Retire un livre de toutes les catégories (livre supprimé).
+        """
+        mask = ~(1 << book_id)
+        with self._lock:
+            for category_id, bitmap in self._bitmaps.items():
+                self._bitmaps[category_id] = bitmap & mask
+
+    def match(self, category_ids: Sequence[int], mode: str = "any") -> int:
+        """
+        Bitmap des livres appartenant à au moins une ("any") ou à toutes ("all") les catégories.
+        """
+        with self._lock:
+            bitmaps = [self._bitmaps.get(category_id, 0) for category_id in dict.fromkeys(category_ids)]
+        if not bitmaps:
+            return 0
+
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if mode == "all":
+                result &= bitmap
+            else:
+                result |= bitmap
+        return result
@@ -0,0 +1,317 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from array import array
+import logging
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db.session import SessionLocal
+from ..models.books import Book, BOOK_FTS_COLUMNS, catalog_change
+from ..models.categories import book_category
+from .bitmap import CategoryBitmaps, bitmap_to_ids
+from .inverted_index import intersect
+from .inverted_index import InvertedIndex
+from .trigram import TrigramIndex
+from .prefix import PrefixIndex
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Champs textuels indexés (mêmes champs que l'index FTS5 et que le journal catalog_change ;
+# les ISBN sont recherchés en base)
+BOOK_INDEX_FIELDS = BOOK_FTS_COLUMNS
+# Champs de la recherche approchée et de la complétion (sous-ensemble de BOOK_INDEX_FIELDS)
+BOOK_FUZZY_FIELDS = ("title", "author")
+BOOK_SUGGEST_FIELDS = ("title", "author")
+
+BookDocument = Tuple[Optional[str], ...]
+
+
+def catalog_generation_query() -> Any:
+    """
+    Sous-requête : génération courante du catalogue (dernière entrée du journal, 0 s'il est vide).
+    """
+    return select(func.coalesce(func.max(catalog_change.c.generation), 0)).scalar_subquery()
+
+
+def document_tokens(document: BookDocument) -> List[str]:
+    """
+    Mots d'un livre, tous champs confondus.
+    """
+    tokens = []
+    for value in document:
+        tokens.extend(tokenize(value))
+    return tokens
+
+
+def fuzzy_tokens(document: BookDocument) -> List[str]:
+    """
+    Mots du titre et de l'auteur d'un livre.
+    """
+    tokens = []
+    for name in BOOK_FUZZY_FIELDS:
+        tokens.extend(tokenize(document[BOOK_INDEX_FIELDS.index(name)]))
+    return tokens
+
+
+def suggest_entries(document: BookDocument) -> List[Tuple[str, Optional[str]]]:
+    """
+    Couples (champ, texte) proposés en complétion pour un livre.
+    """
+    return [(name, document[BOOK_INDEX_FIELDS.index(name)]) for name in BOOK_SUGGEST_FIELDS]
+
+
+class CatalogIndex:
+    """
+    Index de recherche du catalogue, en mémoire du processus de l'API.
+
+    Construit au démarrage à partir de la table book, puis tenu à jour à partir du journal
+    catalog_change, alimenté par des triggers à chaque modification des champs indexés ou
+    des catégories d'un livre (les changements de stock n'y figurent pas). L'index retient
+    la génération (dernière entrée du journal) qu'il reflète et rejoue les entrées suivantes :
+    BookRepository le fait après chacune de ses écritures, et `is_current` le fait au plus
+    toutes les SEARCH_INDEX_CHECK_INTERVAL secondes pour les écritures des autres processus.
+    Seul un retard supérieur à la rétention du journal impose une reconstruction complète.
+
+    Tant que l'index n'est pas prêt, `search` renvoie None et l'appelant se replie sur la
+    base de données.
+    """
+    def __init__(self):
+        self.words = InvertedIndex()
+        self.fuzzy = TrigramIndex()
+        self.prefixes = PrefixIndex()
+        self.categories = CategoryBitmaps()
+        self.generation: Optional[int] = None
+        self._state = "empty"  # "empty", "building" ou "ready"
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Un seul rattrapage du journal à la fois : chaque entrée est appliquée une fois
+        self._sync_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready"
+
+    def build(self, db: Session, batch_size: int = 5000) -> None:
+        """
+        Construit l'index à partir de la base de données, puis rattrape les modifications
+        journalisées pendant la construction.
+        """
+        with self._lock:
+            self._state = "building"
+            self.generation = None
+
+        start = time.perf_counter()
+        # Génération, livres et catégories lus par une seule requête, donc dans un même état
+        # de la base : le rattrapage repart exactement de cette génération
+        generation = db.query(catalog_generation_query()).scalar()
+        categories = select(func.group_concat(book_category.c.category_id)).where(
+            book_category.c.book_id == Book.id
+        ).scalar_subquery()
+        columns = [getattr(Book, name) for name in BOOK_INDEX_FIELDS]
+        rows = db.query(
+            catalog_generation_query().label("generation"),
+            categories.label("categories"),
+            Book.id,
+            *columns
+        ).order_by(Book.id)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        fuzzy_postings: Dict[str, List[int]] = defaultdict(list)
+        entries: List[Tuple[str, Optional[str]]] = []
+        members: Dict[int, List[int]] = defaultdict(list)
+        count = 0
+        # Lecture par ordre d'ID : les listes sont construites déjà triées
+        for row in rows.yield_per(batch_size):
+            generation = row.generation
+            document = tuple(row)[3:]
+            for token in set(document_tokens(document)):
+                postings[token].append(row.id)
+            for token in set(fuzzy_tokens(document)):
+                fuzzy_postings[token].append(row.id)
+            entries.extend(suggest_entries(document))
+            if row.categories:
+                for category_id in str(row.categories).split(","):
+                    members[int(category_id)].append(row.id)
+            count += 1
+
+        self.words.load(postings)
+        self.fuzzy.load(fuzzy_postings)
+        self.prefixes.load(entries)
+        self.categories.load(members)
+
+        with self._lock:
+            self.generation = generation
+            self._state = "ready"
+        # Les écritures validées avant ce point sont rattrapées ici, les suivantes par
+        # l'écrivain lui-même (l'index est prêt)
+        self.sync(db)
+
+        logger.info(
+            "Index du catalogue construit : %d livres, %d mots en %.2f s",
+            count, len(self.words), time.perf_counter() - start
+        )
+
+    def clear(self) -> None:
+        """
+        Vide l'index ; il n'est plus utilisé jusqu'à la prochaine construction.
+        """
+        with self._lock:
+            self._state = "empty"
+            self.generation = None
+            self._checked_at = 0.0
+            self.words.clear()
+            self.fuzzy.clear()
+            self.prefixes.clear()
+            self.categories.clear()
+
+    def sync(self, db: Session) -> bool:
+        """
+        Applique les modifications journalisées depuis la génération de l'index. Renvoie
+        False si l'index n'est pas prêt, ou s'il ne peut pas être rattrapé (entrées purgées
+        du journal avant d'avoir été appliquées).
+        """
+        with self._sync_lock:
+            if not self.ready:
+                return False
+            generation = self.generation
+            changes = db.query(catalog_change).filter(
+                catalog_change.c.generation > generation
+            ).order_by(catalog_change.c.generation).all()
+            # Les générations sont consécutives (un seul écrivain à la fois, AUTOINCREMENT)
+            if changes and changes[0].generation != generation + 1:
+                return False
+
+            for change in changes:
+                self._apply_change(change)
+            with self._lock:
+                if self._state != "ready":
+                    return False
+                if changes:
+                    self.generation = changes[-1].generation
+                self._checked_at = time.monotonic()
+            return True
+
+    def is_current(self, db: Session) -> bool:
+        """
+        Indique si l'index est prêt et à jour par rapport à la base ; au plus toutes les
+        SEARCH_INDEX_CHECK_INTERVAL secondes, rattrape les écritures des autres processus.
+        """
+        if not self.ready:
+            return False
+        if time.monotonic() - self._checked_at < settings.SEARCH_INDEX_CHECK_INTERVAL:
+            return True
+        return self.sync(db)
+
+    def rebuild(self, session_factory: Callable[[], Session]) -> None:
+        """
+        Lance la reconstruction de l'index en arrière-plan (sauf si elle est déjà en cours).
+        """
+        with self._lock:
+            if self._state == "building":
+                return
+            self._state = "building"
+        threading.Thread(target=build_catalog_index, args=(session_factory,), daemon=True).start()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        category_ids: Optional[List[int]] = None,
+        category_mode: str = "any"
+    ) -> Optional[array]:
+        """
+        IDs triés des livres contenant tous les mots de la requête (comme préfixes) et
+        appartenant à au moins une ("any") ou à toutes ("all") les catégories données,
+        ou None si l'index n'est pas prêt.
+        """
+        if not self.ready:
+            return None
+
+        postings = []
+        if query is not None:
+            postings.append(self.words.search(tokenize(query)))
+        if category_ids:
+            postings.append(bitmap_to_ids(self.categories.match(category_ids, category_mode)))
+        return intersect(postings)
+
+    def fuzzy_search(self, query: str, limit: int = 1000) -> Optional[List[int]]:
+        """
+        IDs des livres dont le titre ou l'auteur contient des mots proches de ceux de la
+        requête (fautes de frappe tolérées), du plus au moins similaire, ou None si
+        l'index n'est pas prêt.
+        """
+        if not self.ready:
+            return None
+        return [book_id for book_id, _ in self.fuzzy.search(tokenize(query), limit=limit)]
+
+    def suggest(self, prefix: str, limit: int = 10) -> Optional[List[Tuple[str, str]]]:
+        """
+        Complétions (champ, texte) des titres et auteurs commençant par `prefix`,
+        ou None si l'index n'est pas prêt.
+        """
+        if not self.ready:
+            return None
+        return self.prefixes.complete(prefix, limit=limit)
+
+    def _apply_change(self, change: Any) -> None:
+        old_document = tuple(getattr(change, f"old_{name}") for name in BOOK_INDEX_FIELDS)
+        new_document = tuple(getattr(change, f"new_{name}") for name in BOOK_INDEX_FIELDS)
+        if change.operation in ("update", "delete"):
+            self._remove(change.book_id, old_document)
+        if change.operation in ("insert", "update"):
+            self._add(change.book_id, new_document)
+        if change.operation == "delete":
+            self.categories.remove_book(change.book_id)
+        elif change.operation == "add_category":
+            self.categories.add(change.category_id, change.book_id)
+        elif change.operation == "remove_category":
+            self.categories.remove(change.category_id, change.book_id)
+
+    def _add(self, book_id: int, document: BookDocument) -> None:
+        self.words.add(book_id, document_tokens(document))
+        self.fuzzy.add(book_id, fuzzy_tokens(document))
+        for field, text in suggest_entries(document):
+            self.prefixes.add(field, text)
+
+    def _remove(self, book_id: int, document: BookDocument) -> None:
+        self.words.remove(book_id, document_tokens(document))
+        self.fuzzy.remove(book_id, fuzzy_tokens(document))
+        for field, text in suggest_entries(document):
+            self.prefixes.remove(field, text)
+
+
+catalog_index = CatalogIndex()
+
+
+def build_catalog_index(session_factory: Callable[[], Session]) -> None:
+    """
+    Construit l'index global du catalogue avec une session dédiée.
+    """
+    db = session_factory()
+    try:
+        catalog_index.build(db)
+    except Exception:
+        logger.exception("Échec de la construction de l'index du catalogue")
+        catalog_index.clear()
+    finally:
+        db.close()
+
+
+def use_catalog_index(db: Session) -> bool:
+    """
+    Indique si l'index global peut servir une recherche. S'il ne peut pas rattraper le
+    journal des modifications (retard supérieur à sa rétention), sa reconstruction est
+    lancée et la base prend le relais en attendant. Le journal n'est alimenté que sous
+    SQLite (triggers) : sur un autre SGBD, la base répond toujours.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return False
+    if catalog_index.is_current(db):
+        return True
+    if catalog_index.ready:
+        catalog_index.rebuild(SessionLocal)
+    return False
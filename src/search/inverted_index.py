@@ -0,0 +1,139 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Sequence
+import threading
+
+
+def intersect(postings: Sequence[Sequence[int]]) -> array:
+    """
+    Intersection de listes d'IDs triées, de la plus courte à la plus longue.
+
+    Chaque ID de la liste courante est recherché par dichotomie dans la suivante,
+    ce qui coûte O(n log m) au lieu de parcourir les longues listes en entier.
+    """
+    if not postings:
+        return array("I")
+
+    ordered = sorted(postings, key=len)
+    result = array("I", ordered[0])
+    for posting in ordered[1:]:
+        if not result:
+            break
+        matches = array("I")
+        low = 0
+        for doc_id in result:
+            low = bisect_left(posting, doc_id, low)
+            if low == len(posting):
+                break
+            if posting[low] == doc_id:
+                matches.append(doc_id)
+        result = matches
+    return result
+
+
+def union(postings: Sequence[Sequence[int]]) -> array:
+    """
+    Union de listes d'IDs triées.
+    """
+    if len(postings) == 1:
+        return array("I", postings[0])
+    return array("I", sorted(set().union(*postings)))
+
+
+class InvertedIndex:
+    """
+    Index inversé en mémoire : chaque mot est associé à la liste triée des IDs
+    des documents qui le contiennent, stockée dans un `array('I')` (4 octets par ID,
+    aucun objet Python par document).
+
+    Le vocabulaire est aussi conservé trié pour la recherche par préfixe.
+    """
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def load(self, postings: Dict[str, Iterable[int]]) -> None:
+        """
+        Remplace le contenu de l'index (construction initiale). Les IDs doivent être triés.
+        """
+        compact = {token: array("I", ids) for token, ids in postings.items()}
+        vocabulary = sorted(compact)
+        with self._lock:
+            self._postings = compact
+            self._vocabulary = vocabulary
+
+    def clear(self) -> None:
+        """
+        Vide l'index.
+        """
+        self.load({})
+
+    def add(self, doc_id: int, tokens: Iterable[str]) -> None:
+        """
+        Indexe un document.
+        """
+        with self._lock:
+            for token in set(tokens):
+                posting = self._postings.get(token)
+                if posting is None:
+                    self._postings[token] = array("I", [doc_id])
+                    insort(self._vocabulary, token)
+                    continue
+                position = bisect_left(posting, doc_id)
+                if position == len(posting) or posting[position] != doc_id:
+                    posting.insert(position, doc_id)
+
+    def remove(self, doc_id: int, tokens: Iterable[str]) -> None:
+        """
+        Retire un document de l'index (à partir des mots qu'il contenait).
+        """
+        with self._lock:
+            for token in set(tokens):
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                position = bisect_left(posting, doc_id)
+                if position < len(posting) and posting[position] == doc_id:
+                    del posting[position]
+                if not posting:
+                    del self._postings[token]
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def lookup(self, token: str, prefix: bool = False) -> array:
+        """
+        IDs des documents contenant le mot (ou un mot commençant par `token` si `prefix`).
+        """
+        with self._lock:
+            if not prefix:
+                return array("I", self._postings.get(token, ()))
+            start = bisect_left(self._vocabulary, token)
+            end = bisect_right(self._vocabulary, token + "\uffff", start)
+            postings = [self._postings[word] for word in self._vocabulary[start:end]]
+        if not postings:
+            return array("I")
+        return union(postings)
+
+    def search(self, tokens: Sequence[str], prefix: bool = True) -> array:
+        """
+        IDs triés des documents contenant tous les mots (recherchés comme préfixes par défaut).
+        """
+        if not tokens:
+            return array("I")
+        postings = []
+        for token in dict.fromkeys(tokens):
+            posting = self.lookup(token, prefix=prefix)
+            if not posting:
+                return array("I")
+            postings.append(posting)
+        return intersect(postings)
+
+    def memory_bytes(self) -> int:
+        """
+        Taille approximative des listes d'IDs, en octets.
+        """
+        with self._lock:
+            return sum(posting.itemsize * len(posting) for posting in self._postings.values())
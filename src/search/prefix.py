@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Tuple
+import heapq
+import threading
+
+from .text import normalize
+
+_SEPARATOR = "\x00"
+
+
+class PrefixIndex:
+    """
+    Index de complétion : tableau trié de clés "texte normalisé, champ, texte affiché".
+
+    Les complétions d'un préfixe sont les clés consécutives à partir de la position
+    trouvée par dichotomie. Chaque clé compte le nombre de livres qui la portent (ex: un
+    auteur de plusieurs livres) et les complétions sont classées par fréquence.
+
+    Pour que le coût d'une complétion ne dépende pas du nombre de clés portant le
+    préfixe, chaque préfixe couvrant plus de `scan_limit` clés garde la liste de ses
+    `top_size` meilleures clés, tenue à jour par `add` et `remove` : une complétion lit
+    cette liste, ou parcourt au plus `scan_limit` clés. La liste est recalculée depuis
+    le tableau quand les retraits la font passer sous `top_size // 2` clés.
+    """
+    def __init__(self, top_size: int = 100, scan_limit: int = 512):
+        self._keys: List[str] = []
+        self._counts: Dict[str, int] = {}
+        # Préfixe -> ses meilleures clés, dans l'ordre du classement
+        self._top: Dict[str, List[str]] = {}
+        self._top_size = top_size
+        self._scan_limit = max(scan_limit, top_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _key(field: str, text: str) -> str:
+        return _SEPARATOR.join((normalize(text).strip(), field, text))
+
+    def _rank(self, key: str) -> Tuple[int, str]:
+        return -self._counts[key], key
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        start = bisect_left(self._keys, prefix)
+        # Les clés portant le préfixe précèdent toutes `prefix` suivi du plus grand caractère
+        return start, bisect_right(self._keys, prefix + "\U0010ffff", lo=start)
+
+    def _best(self, keys: Iterable[str]) -> List[str]:
+        return heapq.nsmallest(self._top_size, keys, key=self._rank)
+
+    def _build_top(self, prefix: str, start: int, end: int) -> List[str]:
+        """
+        Meilleures clés de l'intervalle [start, end) des clés portant `prefix`, en
+        enregistrant celles de chaque préfixe plus long couvrant plus de `scan_limit` clés.
+        """
+        if end - start <= self._scan_limit:
+            return self._best(self._keys[start:end])
+
+        # Les clés dont le texte normalisé vaut exactement `prefix` viennent en tête
+        position = bisect_left(self._keys, prefix + "\x01", lo=start, hi=end)
+        candidates = self._keys[start:position]
+        while position < end:
+            child = self._keys[position][:len(prefix) + 1]
+            child_end = bisect_right(self._keys, child + "\U0010ffff", lo=position, hi=end)
+            candidates.extend(self._build_top(child, position, child_end))
+            position = child_end
+
+        top = self._best(candidates)
+        if prefix:
+            self._top[prefix] = top
+        return top
+
+    def _prefixes(self, key: str) -> Iterable[str]:
+        text = key.split(_SEPARATOR, 1)[0]
+        return (text[:length] for length in range(1, len(text) + 1))
+
+    def load(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """
+        Remplace le contenu de l'index à partir de couples (champ, texte), un par livre.
+        """
+        counts: Dict[str, int] = {}
+        for field, text in entries:
+            if text:
+                key = self._key(field, text)
+                counts[key] = counts.get(key, 0) + 1
+        index = PrefixIndex(self._top_size, self._scan_limit)
+        index._counts = counts
+        index._keys = sorted(counts)
+        index._build_top("", 0, len(index._keys))
+        with self._lock:
+            self._counts = index._counts
+            self._keys = index._keys
+            self._top = index._top
+
+    def clear(self) -> None:
+        """
+        Vide l'index.
+        """
+        self.load(())
+
+    def add(self, field: str, text: str) -> None:
+        """
+        Ajoute une occurrence de `text` pour le champ `field`.
+        """
+        if not text:
+            return
+        key = self._key(field, text)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            if count == 0:
+                insort(self._keys, key)
+
+            # La clé ne peut que monter dans le classement de ses préfixes
+            rank = self._rank(key)
+            for prefix in self._prefixes(key):
+                top = self._top.get(prefix)
+                if top is None:
+                    continue
+                if key in top:
+                    top.remove(key)
+                elif rank > self._rank(top[-1]):
+                    continue
+                insort(top, key, key=self._rank)
+                del top[self._top_size:]
+
+    def remove(self, field: str, text: str) -> None:
+        """
+        Retire une occurrence de `text` pour le champ `field`.
+        """
+        if not text:
+            return
+        key = self._key(field, text)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            if count == 0:
+                return
+
+            # La clé descend dans le classement : elle reste dans la liste d'un préfixe
+            # tant qu'elle précède la dernière clé de cette liste, sinon elle en sort
+            for prefix in self._prefixes(key):
+                top = self._top.get(prefix)
+                if top is not None and key in top:
+                    top.remove(key)
+            if count > 1:
+                self._counts[key] = count - 1
+            else:
+                del self._counts[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+            for prefix in self._prefixes(key):
+                top = self._top.get(prefix)
+                if top is None:
+                    continue
+                if count > 1 and top and self._rank(key) < self._rank(top[-1]):
+                    insort(top, key, key=self._rank)
+                if len(top) < self._top_size // 2:
+                    start, end = self._range(prefix)
+                    if end - start > self._scan_limit:
+                        self._top[prefix] = self._best(self._keys[start:end])
+                    else:
+                        del self._top[prefix]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Complétions (champ, texte) dont le texte normalisé commence par `prefix`, des plus
+        fréquentes aux moins fréquentes (puis par ordre alphabétique).
+        """
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+
+        with self._lock:
+            top = self._top.get(prefix)
+            if top is not None and limit <= len(top):
+                keys = top[:limit]
+            else:
+                start, end = self._range(prefix)
+                keys = heapq.nsmallest(limit, self._keys[start:end], key=self._rank)
+                if end - start > self._scan_limit and limit <= self._top_size:
+                    # Préfixe devenu fréquent depuis le chargement : sa liste est créée
+                    self._top[prefix] = self._best(self._keys[start:end])
+        results = []
+        for key in keys:
+            _, field, text = key.split(_SEPARATOR, 2)
+            results.append((field, text))
+        return results
@@ -0,0 +1,22 @@
+from typing import List
+import re
+import unicodedata
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Normalise un texte pour l'indexation : minuscules et accents supprimés ("Misérables" -> "miserables").
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte normalisé en mots.
+    """
+    if not text:
+        return []
+    return _WORD_PATTERN.findall(normalize(text))
@@ -0,0 +1,177 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+import threading
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Trigrammes d'un mot, complété par deux espaces au début et un à la fin
+    (comme pg_trgm) : "orwel" -> {"  o", " or", "orw", "rwe", "wel", "el "}.
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(shared: int, size_a: int, size_b: int) -> float:
+    """
+    Similarité de deux ensembles de trigrammes (indice de Jaccard).
+    """
+    return shared / (size_a + size_b - shared)
+
+
+def _contains(posting: Sequence[int], doc_id: int) -> bool:
+    position = bisect_left(posting, doc_id)
+    return position < len(posting) and posting[position] == doc_id
+
+
+class TrigramIndex:
+    """
+    Index de trigrammes pour la recherche approchée (tolérante aux fautes de frappe).
+
+    Le vocabulaire (mots distincts) est indexé par trigrammes ; chaque mot a la
+    liste triée des IDs des documents qui le contiennent. Une recherche trouve
+    d'abord les mots proches de chaque mot de la requête, puis les documents.
+    Le coût dépend de la taille du vocabulaire, pas du nombre de documents.
+    """
+    def __init__(self, threshold: float = 0.3, max_words: int = 20):
+        self.threshold = threshold
+        self.max_words = max_words
+        self._word_ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._trigram_counts = array("B")
+        self._documents: List[array] = []
+        self._trigrams: Dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def load(self, postings: Dict[str, Iterable[int]]) -> None:
+        """
+        Remplace le contenu de l'index à partir de {mot: IDs triés} (construction initiale).
+        """
+        with self._lock:
+            self._word_ids = {}
+            self._words = []
+            self._trigram_counts = array("B")
+            self._documents = []
+            self._trigrams = {}
+            for word, ids in postings.items():
+                self._word_id(word).extend(ids)
+
+    def clear(self) -> None:
+        """
+        Vide l'index.
+        """
+        self.load({})
+
+    def add(self, doc_id: int, tokens: Iterable[str]) -> None:
+        """
+        Indexe les mots d'un document.
+        """
+        with self._lock:
+            for token in set(tokens):
+                posting = self._word_id(token)
+                position = bisect_left(posting, doc_id)
+                if position == len(posting) or posting[position] != doc_id:
+                    posting.insert(position, doc_id)
+
+    def remove(self, doc_id: int, tokens: Iterable[str]) -> None:
+        """
+        Retire un document (les mots sans document restent dans le vocabulaire mais sont ignorés).
+        """
+        with self._lock:
+            for token in set(tokens):
+                word_id = self._word_ids.get(token)
+                if word_id is None:
+                    continue
+                posting = self._documents[word_id]
+                position = bisect_left(posting, doc_id)
+                if position < len(posting) and posting[position] == doc_id:
+                    del posting[position]
+
+    def similar_words(self, token: str) -> List[Tuple[float, str, array]]:
+        """
+        Mots du vocabulaire proches de `token`, du plus au moins similaire :
+        (similarité, mot, IDs des documents).
+        """
+        query_trigrams = trigrams(token)
+        with self._lock:
+            shared = Counter()
+            for trigram in query_trigrams:
+                shared.update(self._trigrams.get(trigram, ()))
+
+            matches = []
+            for word_id, count in shared.items():
+                score = similarity(count, len(query_trigrams), self._trigram_counts[word_id])
+                if score >= self.threshold and self._documents[word_id]:
+                    matches.append((score, self._words[word_id], array("I", self._documents[word_id])))
+
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches[:self.max_words]
+
+    def search(self, tokens: Sequence[str], limit: int = 1000) -> List[Tuple[int, float]]:
+        """
+        Documents dont chaque mot de la requête a un mot proche, classés par similarité
+        décroissante (somme sur les mots de la requête) : [(ID, score)].
+        """
+        matches = [self.similar_words(token) for token in dict.fromkeys(tokens)]
+        if not matches or not all(matches):
+            return []
+
+        if len(matches) == 1:
+            # Un seul mot : les documents sont parcourus par similarité décroissante
+            results: Dict[int, float] = {}
+            for score, _, posting in matches[0]:
+                for doc_id in posting:
+                    if doc_id not in results:
+                        results[doc_id] = score
+                if len(results) >= limit:
+                    break
+            ranked = sorted(results.items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+
+        # Plusieurs mots : candidats issus du mot le moins fréquent, vérifiés pour les autres
+        matches.sort(key=lambda words: sum(len(posting) for _, _, posting in words))
+        scores: Dict[int, float] = {}
+        for score, _, posting in reversed(matches[0]):
+            for doc_id in posting:
+                scores[doc_id] = score
+
+        for words in matches[1:]:
+            if sum(len(posting) for _, _, posting in words) <= len(scores) * len(words):
+                # Listes courtes : meilleure similarité de chaque document, en un parcours
+                best: Dict[int, float] = {}
+                for score, _, posting in reversed(words):
+                    for doc_id in posting:
+                        best[doc_id] = score
+                scores = {doc_id: total + best[doc_id] for doc_id, total in scores.items() if doc_id in best}
+                continue
+
+            # Listes longues : recherche dichotomique de chaque candidat
+            next_scores = {}
+            for doc_id, total in scores.items():
+                for score, _, posting in words:
+                    if _contains(posting, doc_id):
+                        next_scores[doc_id] = total + score
+                        break
+            scores = next_scores
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def _word_id(self, word: str) -> array:
+        # Appelé avec le verrou : identifiant du mot, créé au besoin ; renvoie sa liste de documents
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            word_trigrams = trigrams(word)
+            self._trigram_counts.append(min(len(word_trigrams), 255))
+            self._documents.append(array("I"))
+            for trigram in word_trigrams:
+                self._trigrams.setdefault(trigram, array("I")).append(word_id)
+        return self._documents[word_id]
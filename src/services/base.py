@@ -1,4 +1,4 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
@@ -25,11 +25,13 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return self.repository.get(id=id)
 
-    def get_multi(self, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    def get_multi(
+        self, *, skip: int = 0, limit: int = 100, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[ModelType]:
         """
         Récupère plusieurs objets avec pagination.
         """
-        return self.repository.get_multi(skip=skip, limit=limit)
+        return self.repository.get_multi(skip=skip, limit=limit, fields=fields)
 
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -1,10 +1,11 @@
-from typing import List, Optional, Any, Dict, Union
+from typing import List, Optional, Any, Dict, Tuple, Union
 from sqlalchemy.orm import Session
 
 from ..repositories.books import BookRepository
 from ..models.books import Book
 from ..models.categories import Category
-from ..api.schemas.books import BookCreate, BookUpdate
+from ..api.schemas.books import BookCreate, BookUpdate, BookSnapshot
+from ..search.catalog import catalog_index, use_catalog_index
 from .base import BaseService
 
 
@@ -16,7 +17,7 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
         super().__init__(repository)
         self.repository = repository
 
-    def get_by_isbn(self, *, isbn: str) -> Optional[Book]:
+    def get_by_isbn(self, *, isbn: str) -> Optional[BookSnapshot]:
         """
         Récupère un livre par son ISBN.
         """
@@ -34,6 +35,20 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
         """
         return self.repository.get_by_author(author=author)
 
+    def suggest(self, *, prefix: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Complétions (champ, texte) des titres et auteurs commençant par `prefix`.
+
+        Servies par l'index en mémoire du catalogue, ou par la base tant qu'il n'est pas prêt
+        ou à jour.
+        """
+        suggestions = None
+        if use_catalog_index(self.repository.db):
+            suggestions = catalog_index.suggest(prefix, limit=limit)
+        if suggestions is None:
+            suggestions = self.repository.get_suggestions(prefix=prefix, limit=limit)
+        return suggestions
+
     def create(self, *, obj_in: BookCreate) -> Book:
         """
         Crée un nouveau livre, en vérifiant que l'ISBN n'est pas déjà utilisé.
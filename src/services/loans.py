@@ -11,6 +11,9 @@ from ..models.users import User
 from ..api.schemas.loans import LoanCreate, LoanUpdate
 from .base import BaseService
 
+# Nombre maximal d'emprunts simultanés par utilisateur
+MAX_ACTIVE_LOANS = 5
+
 
 class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
     """
@@ -75,35 +78,22 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         if not book:
             raise ValueError(f"Livre avec l'ID {book_id} non trouvé")
 
-        # Vérifier que le livre est disponible
-        if book.quantity <= 0:
-            raise ValueError("Le livre n'est pas disponible pour l'emprunt")
-
         # Vérifier si l'utilisateur a déjà emprunté ce livre et ne l'a pas rendu
-        active_loans = self.loan_repository.get_active_loans()
-        for loan in active_loans:
-            if loan.user_id == user_id and loan.book_id == book_id:
-                raise ValueError("L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu")
-
-        # Vérifier le nombre d'emprunts actifs de l'utilisateur (limite à 5 par exemple)
-        user_active_loans = [loan for loan in active_loans if loan.user_id == user_id]
-        if len(user_active_loans) >= 5:
-            raise ValueError("L'utilisateur a atteint la limite d'emprunts simultanés (5)")
-
-        # Créer l'emprunt
-        loan_data = {
-            "user_id": user_id,
-            "book_id": book_id,
-            "loan_date": datetime.utcnow(),
-            "due_date": datetime.utcnow() + timedelta(days=loan_period_days),
-            "return_date": None
-        }
-
-        loan = self.loan_repository.create(obj_in=loan_data)
-
-        # Mettre à jour la quantité de livres disponibles
-        book.quantity -= 1
-        self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
+        if self.loan_repository.has_active_loan(user_id=user_id, book_id=book_id):
+            raise ValueError("L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu")
+
+        # Vérifier le nombre d'emprunts actifs de l'utilisateur
+        if self.loan_repository.count_active_loans_by_user(user_id=user_id) >= MAX_ACTIVE_LOANS:
+            raise ValueError(f"L'utilisateur a atteint la limite d'emprunts simultanés ({MAX_ACTIVE_LOANS})")
+
+        # Créer l'emprunt et décrémenter le stock (la disponibilité est vérifiée par l'UPDATE)
+        loan = self.loan_repository.checkout(
+            user_id=user_id,
+            book_id=book_id,
+            due_date=datetime.utcnow() + timedelta(days=loan_period_days)
+        )
+        if loan is None:
+            raise ValueError("Le livre n'est pas disponible pour l'emprunt")
 
         return loan
 
@@ -120,17 +110,111 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         if loan.return_date:
             raise ValueError("L'emprunt a déjà été retourné")
 
-        # Marquer l'emprunt comme retourné
-        loan_data = {"return_date": datetime.utcnow()}
-        loan = self.loan_repository.update(db_obj=loan, obj_in=loan_data)
+        # Marquer l'emprunt comme retourné et remettre l'exemplaire en stock
+        returned_loan = self.loan_repository.check_in(loan=loan)
+        if returned_loan is None:
+            raise ValueError("L'emprunt a déjà été retourné")
 
-        # Mettre à jour la quantité de livres disponibles
-        book = self.book_repository.get(id=loan.book_id)
-        if book:
-            book.quantity += 1
-            self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
+        return returned_loan
 
-        return loan
+    def create_loans(
+        self,
+        *,
+        user_id: int,
+        book_ids: List[int],
+        loan_period_days: int = 14
+    ) -> List[Dict[str, Any]]:
+        """
+        Crée les emprunts d'un lot de livres pour un utilisateur (borne de prêt).
+
+        Le lot est validé par des requêtes ensemblistes puis appliqué en une seule
+        transaction ; retourne un résultat (succès ou motif d'échec) par livre.
+        """
+        # Vérifier que l'utilisateur existe et est actif (vaut pour tout le lot)
+        user = self.user_repository.get(id=user_id)
+        if not user:
+            raise ValueError(f"Utilisateur avec l'ID {user_id} non trouvé")
+        if not user.is_active:
+            raise ValueError("L'utilisateur est inactif et ne peut pas emprunter de livres")
+
+        quantities = self.book_repository.get_quantities(ids=book_ids)
+        active_book_ids = self.loan_repository.get_active_book_ids_by_user(user_id=user_id)
+        remaining = MAX_ACTIVE_LOANS - len(active_book_ids)
+        active_book_ids = set(active_book_ids)
+
+        results = []
+        accepted = []
+        seen = set()
+        for book_id in book_ids:
+            if book_id in seen:
+                error = "Livre présent plusieurs fois dans le lot"
+            elif book_id not in quantities:
+                error = f"Livre avec l'ID {book_id} non trouvé"
+            elif book_id in active_book_ids:
+                error = "L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu"
+            elif quantities[book_id] <= 0:
+                error = "Le livre n'est pas disponible pour l'emprunt"
+            elif len(accepted) >= remaining:
+                error = f"L'utilisateur a atteint la limite d'emprunts simultanés ({MAX_ACTIVE_LOANS})"
+            else:
+                error = None
+                accepted.append(book_id)
+            seen.add(book_id)
+            results.append({"book_id": book_id, "success": error is None, "error": error})
+
+        loans = {}
+        if accepted:
+            loans = {
+                loan.book_id: loan
+                for loan in self.loan_repository.checkout_many(
+                    user_id=user_id,
+                    book_ids=accepted,
+                    due_date=datetime.utcnow() + timedelta(days=loan_period_days)
+                )
+            }
+
+        # Un livre validé peut avoir été emprunté entre-temps (dernier exemplaire)
+        for result in results:
+            if result["success"]:
+                result["loan"] = loans.get(result["book_id"])
+                if result["loan"] is None:
+                    result.update(success=False, error="Le livre n'est pas disponible pour l'emprunt")
+        return results
+
+    def return_loans(self, *, loan_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Marque un lot d'emprunts comme retournés en une seule transaction ; retourne un
+        résultat (succès ou motif d'échec) par emprunt.
+        """
+        loans = {loan.id: loan for loan in self.loan_repository.get_by_ids(ids=loan_ids)}
+
+        results = []
+        accepted = []
+        seen = set()
+        for loan_id in loan_ids:
+            if loan_id in seen:
+                error = "Emprunt présent plusieurs fois dans le lot"
+            elif loan_id not in loans:
+                error = f"Emprunt avec l'ID {loan_id} non trouvé"
+            elif loans[loan_id].return_date:
+                error = "L'emprunt a déjà été retourné"
+            else:
+                error = None
+                accepted.append(loan_id)
+            seen.add(loan_id)
+            results.append({"loan_id": loan_id, "success": error is None, "error": error})
+
+        returned = {}
+        if accepted:
+            returned = {loan.id: loan for loan in self.loan_repository.check_in_many(loan_ids=accepted)}
+
+        # Un emprunt validé peut avoir été retourné entre-temps par une autre requête
+        for result in results:
+            if result["success"]:
+                result["loan"] = returned.get(result["loan_id"])
+                if result["loan"] is None:
+                    result.update(success=False, error="L'emprunt a déjà été retourné")
+        return results
 
     def extend_loan(self, *, loan_id: int, extension_days: int = 7) -> Loan:
         """
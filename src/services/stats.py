@@ -1,11 +1,88 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Hashable, List, Set, Tuple
 from datetime import datetime, timedelta
+import logging
+import threading
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from ..config import settings
+from ..db.session import SessionLocal
 from ..models.books import Book
 from ..models.users import User
 from ..models.loans import Loan
+from ..repositories.loans import overdue_condition
+from ..utils.overdue import overdue_sweeper
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """
+    Instantanés de statistiques servis immédiatement (stale-while-revalidate).
+
+    Le premier appel calcule le résultat ; ensuite, le dernier résultat est
+    toujours renvoyé tel quel, et un recalcul est lancé en arrière-plan (avec
+    sa propre session) dès qu'il est plus ancien que `max_age` secondes.
+    """
+    def __init__(self, max_age: float, session_factory: Callable[[], Session]):
+        self.max_age = max_age
+        self.session_factory = session_factory
+        self._snapshots: Dict[Hashable, Tuple[Any, datetime]] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        compute: Callable[[Session], Any],
+        db: Session
+    ) -> Tuple[Any, datetime]:
+        """
+        Renvoie le dernier résultat calculé et sa date de calcul.
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return self._store(key, compute(db))
+
+        computed_at = snapshot[1]
+        if (datetime.utcnow() - computed_at).total_seconds() > self.max_age:
+            with self._lock:
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                threading.Thread(target=self._refresh, args=(key, compute), daemon=True).start()
+
+        return snapshot
+
+    def clear(self) -> None:
+        """
+        Supprime tous les instantanés.
+        """
+        with self._lock:
+            self._snapshots.clear()
+
+    def _store(self, key: Hashable, value: Any) -> Tuple[Any, datetime]:
+        snapshot = (value, datetime.utcnow())
+        with self._lock:
+            self._snapshots[key] = snapshot
+        return snapshot
+
+    def _refresh(self, key: Hashable, compute: Callable[[Session], Any]) -> None:
+        db = self.session_factory()
+        try:
+            self._store(key, compute(db))
+        except Exception:
+            logger.exception("Échec du recalcul de l'instantané %s", key)
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+stats_snapshots = SnapshotStore(
+    max_age=settings.STATS_SNAPSHOT_MAX_AGE,
+    session_factory=SessionLocal
+)
 
 
 class StatsService:
@@ -15,6 +92,31 @@ class StatsService:
     def __init__(self, db: Session):
         self.db = db
 
+    def get_snapshot(self, name: str, **kwargs) -> Tuple[Any, datetime]:
+        """
+        Renvoie le dernier résultat calculé d'une statistique (ex: "get_general_stats")
+        et sa date de calcul, sans attendre de recalcul.
+
+        Les paramètres sont bornés pour que le nombre d'instantanés le soit aussi : les
+        classements (`limit`) sont calculés une fois à la taille maximale puis tronqués.
+        """
+        limit = kwargs.pop("limit", None)
+        if limit is not None:
+            limit = max(1, min(limit, settings.STATS_MAX_LIMIT))
+            kwargs["limit"] = settings.STATS_MAX_LIMIT
+        if "months" in kwargs:
+            kwargs["months"] = max(1, min(kwargs["months"], settings.STATS_MAX_MONTHS))
+
+        key = (name, tuple(sorted(kwargs.items())))
+        result, computed_at = stats_snapshots.get(
+            key,
+            lambda db: getattr(StatsService(db), name)(**kwargs),
+            self.db
+        )
+        if limit is not None:
+            result = result[:limit]
+        return result, computed_at
+
     def get_general_stats(self) -> Dict[str, Any]:
         """
         Récupère des statistiques générales sur la bibliothèque.
@@ -25,10 +127,10 @@ class StatsService:
         active_users = self.db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
         total_loans = self.db.query(func.count(Loan.id)).scalar() or 0
         active_loans = self.db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0
-        overdue_loans = self.db.query(func.count(Loan.id)).filter(
-            Loan.return_date == None,
-            Loan.due_date < datetime.utcnow()
-        ).scalar() or 0
+        if overdue_sweeper.ready:
+            overdue_loans = overdue_sweeper.overdue_count
+        else:
+            overdue_loans = self.db.query(func.count(Loan.id)).filter(overdue_condition()).scalar() or 0
 
         return {
             "total_books": total_books,
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from ..repositories.users import UserRepository
 from ..models.users import User
-from ..api.schemas.users import UserCreate, UserUpdate
+from ..api.schemas.users import UserCreate, UserUpdate, UserSnapshot
 from ..utils.security import get_password_hash, verify_password
 from .base import BaseService
 
@@ -16,7 +16,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         super().__init__(repository)
         self.repository = repository
 
-    def get_by_email(self, *, email: str) -> Optional[User]:
+    def get_by_email(self, *, email: str) -> Optional[UserSnapshot]:
         """
         Récupère un utilisateur par son email.
         """
@@ -60,14 +60,16 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
 
         return super().update(db_obj=db_obj, obj_in=update_data)
 
-    def authenticate(self, *, email: str, password: str) -> Optional[User]:
+    def authenticate(self, *, email: str, password: str) -> Optional[UserSnapshot]:
         """
         Authentifie un utilisateur par email et mot de passe.
         """
         user = self.get_by_email(email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        # Le hash est lu en base : l'instantané mis en cache n'en contient pas
+        hashed_password = self.repository.get_hashed_password(id=user.id)
+        if not hashed_password or not verify_password(password, hashed_password):
             return None
         return user
 
@@ -1,68 +1,878 @@
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import threading
 import time
 import hashlib
 import json
+import math
+import random
+
+from ..config import settings
 
-# Cache en mémoire simple
-cache_store: Dict[str, Tuple[float, Any]] = {}
 DEFAULT_EXPIRY = 300  # 5 minutes
 
+# Sentinelle pour distinguer une absence du cache d'une valeur None
+_MISSING = object()
+
+# Une clé est une chaîne ou un tuple (nom qualifié de la fonction, *arguments)
+CacheKey = Hashable
+
+
+def _key_name(key: CacheKey) -> str:
+    return key[0] if isinstance(key, tuple) else key
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Estime l'occupation mémoire d'une valeur (en octets).
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 2:
+        return size
+
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _depth + 1)
+
+    return size
+
+
+class CacheStats:
+    """
+    Compteurs du cache par fonction décorée : succès, échecs, évictions,
+    expirations et temps de calcul économisé.
+    """
+    COUNTERS = ("hits", "misses", "evictions", "expirations", "computes", "compute_time", "saved_time")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, counter: str, amount: float = 1) -> None:
+        """
+        Incrémente un compteur pour une fonction.
+        """
+        with self._lock:
+            counters = self._counters.get(name)
+            if counters is None:
+                counters = self._counters[name] = dict.fromkeys(self.COUNTERS, 0)
+            counters[counter] += amount
+
+    def reset(self) -> None:
+        """
+        Remet tous les compteurs à zéro.
+        """
+        with self._lock:
+            self._counters.clear()
+
+    def report(self, backend: "CacheBackend") -> Dict[str, Dict[str, Any]]:
+        """
+        Rapport par fonction, complété par l'occupation actuelle du backend.
+        """
+        usage = backend.usage()
+        with self._lock:
+            counters = {name: dict(values) for name, values in self._counters.items()}
+
+        report = {}
+        for name in sorted(set(counters) | set(usage)):
+            values = counters.get(name) or dict.fromkeys(self.COUNTERS, 0)
+            entries, size = usage.get(name, (0, 0))
+            hits, misses, computes = values["hits"], values["misses"], values["computes"]
+            report[name] = {
+                "hits": int(hits),
+                "misses": int(misses),
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "evictions": int(values["evictions"]),
+                "expirations": int(values["expirations"]),
+                "entries": entries,
+                "memory_bytes": size,
+                "avg_compute_time": values["compute_time"] / computes if computes else 0.0,
+                "avg_time_saved": values["saved_time"] / hits if hits else 0.0,
+                "total_time_saved": values["saved_time"],
+            }
+        return report
+
+
+cache_stats = CacheStats()
+
+
+class CacheBackend:
+    """
+    Interface commune des backends de cache.
+    """
+    def get_entry(self, key: CacheKey) -> Optional[Tuple[Any, float, float]]:
+        """
+        Récupère une entrée non expirée sous la forme (valeur, date d'expiration, durée de calcul).
+        """
+        raise NotImplementedError
+
+    def get(self, key: CacheKey, default: Any = None) -> Any:
+        """
+        Récupère une valeur si elle est présente et n'a pas expiré.
+        """
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(
+        self,
+        key: CacheKey,
+        value: Any,
+        expiry: float = DEFAULT_EXPIRY,
+        tags: Iterable[str] = (),
+        delta: float = 0
+    ) -> None:
+        """
+        Stocke une valeur pour `expiry` secondes.
+
+        `delta` est la durée de calcul de la valeur, utilisée pour le rafraîchissement anticipé.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: CacheKey) -> None:
+        """
+        Supprime une entrée.
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        Supprime toutes les entrées dont la clé commence par le préfixe.
+        """
+        raise NotImplementedError
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """
+        Supprime toutes les entrées portant l'un des tags.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """
+        Vide le cache.
+        """
+        raise NotImplementedError
+
+    def sweep(self) -> None:
+        """
+        Purge les entrées expirées.
+        """
+        raise NotImplementedError
+
+    def usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Nombre d'entrées et taille estimée (en octets) par fonction.
+        """
+        raise NotImplementedError
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Cache en mémoire borné, avec éviction LRU et expiration TTL.
+
+    Les entrées expirées sont ignorées à la lecture puis purgées périodiquement.
+    Chaque entrée peut porter des tags (ex: "book:42") indexés en sens inverse,
+    ce qui permet d'invalider uniquement les entrées concernées par une écriture.
+    Toutes les opérations sont protégées par un verrou (threadpool de FastAPI).
+    """
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        # clé -> (date d'expiration, valeur, taille estimée, tags, durée de calcul)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any, int, Tuple[str, ...], float]]" = OrderedDict()
+        # tag -> clés des entrées portant ce tag
+        self._tags: Dict[str, Set[CacheKey]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._next_sweep = time.time() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """
+        Taille estimée (en octets) des valeurs en cache.
+        """
+        return self._size
+
+    def get_entry(self, key: CacheKey) -> Optional[Tuple[Any, float, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expiry_time = entry[0]
+            if expiry_time <= time.time():
+                self._delete(key)
+                cache_stats.record(_key_name(key), "expirations")
+                return None
+
+            # Marquer l'entrée comme la plus récemment utilisée
+            self._entries.move_to_end(key)
+            return entry[1], expiry_time, entry[4]
+
+    def set(
+        self,
+        key: CacheKey,
+        value: Any,
+        expiry: float = DEFAULT_EXPIRY,
+        tags: Iterable[str] = (),
+        delta: float = 0
+    ) -> None:
+        """
+        Stocke une valeur pour `expiry` secondes, en évinçant les entrées les moins récentes si besoin.
+        """
+        size = estimate_size(value)
+        now = time.time()
+        tags = tuple(tags)
+
+        with self._lock:
+            self._delete(key)
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (now + expiry, value, size, tags, delta)
+            self._size += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            if now >= self._next_sweep:
+                self._sweep(now)
+            self._evict()
+
+    def delete(self, key: CacheKey) -> None:
+        """
+        Supprime une entrée.
+        """
+        with self._lock:
+            self._delete(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        Supprime toutes les entrées dont la clé commence par le préfixe.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if _key_name(k).startswith(prefix)]:
+                self._delete(key)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        """
+        Supprime toutes les entrées portant l'un des tags.
+        """
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._delete(key)
+
+    def clear(self) -> None:
+        """
+        Vide le cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def sweep(self) -> None:
+        """
+        Purge les entrées expirées.
+        """
+        with self._lock:
+            self._sweep(time.time())
+
+    def usage(self) -> Dict[str, Tuple[int, int]]:
+        usage: Dict[str, Tuple[int, int]] = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                name = _key_name(key)
+                entries, size = usage.get(name, (0, 0))
+                usage[name] = (entries + 1, size + entry[2])
+        return usage
+
+    def _delete(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._forget(key, entry)
+
+    def _forget(self, key: CacheKey, entry: Tuple[float, Any, int, Tuple[str, ...], float]) -> None:
+        self._size -= entry[2]
+        for tag in entry[3]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _sweep(self, now: float) -> None:
+        for key in [k for k, entry in self._entries.items() if entry[0] <= now]:
+            self._delete(key)
+            cache_stats.record(_key_name(key), "expirations")
+        self._next_sweep = now + self.sweep_interval
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size > self.max_bytes
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._forget(key, entry)
+            cache_stats.record(_key_name(key), "evictions")
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache partagé entre les processus d'une même machine, stocké dans un fichier SQLite.
+
+    Les workers uvicorn partagent ainsi les entrées et les invalidations : une
+    écriture traitée par un worker invalide immédiatement le cache des autres.
+    Les valeurs sont sérialisées avec pickle.
+
+    Les dates d'accès (ordre LRU) sont gardées en mémoire et écrites par lots, lors
+    de la prochaine écriture ou dès que `access_batch_size` accès sont en attente.
+    L'occupation totale est tenue à jour par des triggers, ce qui permet à `set`
+    d'appliquer les limites sans parcourir la table.
+    """
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60,
+        access_batch_size: int = 256
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.access_batch_size = access_batch_size
+        self._local = threading.local()
+        self._accessed: Dict[str, float] = {}
+        self._accessed_lock = threading.Lock()
+        self._next_sweep = time.time() + sweep_interval
+
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "size INTEGER NOT NULL, accessed_at REAL NOT NULL, delta REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entry_accessed_at ON cache_entry (accessed_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_tag ("
+                "tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_tag_key ON cache_tag (key)")
+
+            # Occupation totale (une seule ligne), initialisée à partir des entrées existantes
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_usage ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_usage (id, entries, bytes) "
+                "SELECT 1, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_entry_insert AFTER INSERT ON cache_entry BEGIN "
+                "UPDATE cache_usage SET entries = entries + 1, bytes = bytes + new.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_entry_update AFTER UPDATE OF size ON cache_entry BEGIN "
+                "UPDATE cache_usage SET bytes = bytes + new.size - old.size; END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS cache_entry_delete AFTER DELETE ON cache_entry BEGIN "
+                "UPDATE cache_usage SET entries = entries - 1, bytes = bytes - old.size; END"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread (et par processus, après un fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _encode_key(key: CacheKey) -> str:
+        # Les clés tuple sont stockées sous la forme "nom:(arguments,)"
+        if isinstance(key, tuple):
+            return f"{key[0]}:{key[1:]!r}"
+        return key
+
+    @staticmethod
+    def _decode_name(key: str) -> str:
+        return key.split(":", 1)[0]
+
+    def get_entry(self, key: CacheKey) -> Optional[Tuple[Any, float, float]]:
+        key = self._encode_key(key)
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, delta FROM cache_entry WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        if row[1] <= now:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Supprimée seulement si elle n'a pas été remplacée entre-temps
+                deleted = conn.execute(
+                    "DELETE FROM cache_entry WHERE key = ? AND expires_at <= ?", (key, now)
+                ).rowcount
+                if deleted:
+                    conn.execute("DELETE FROM cache_tag WHERE key = ?", (key,))
+            cache_stats.record(self._decode_name(key), "expirations")
+            return None
+
+        with self._accessed_lock:
+            self._accessed[key] = now
+            flush = len(self._accessed) >= self.access_batch_size
+        if flush:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._flush_accessed(conn)
+        return pickle.loads(row[0]), row[1], row[2]
+
+    def set(
+        self,
+        key: CacheKey,
+        value: Any,
+        expiry: float = DEFAULT_EXPIRY,
+        tags: Iterable[str] = (),
+        delta: float = 0
+    ) -> None:
+        key = self._encode_key(key)
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            self.delete(key)
+            return
+
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._flush_accessed(conn)
+            conn.execute("DELETE FROM cache_tag WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT INTO cache_entry (key, value, expires_at, size, accessed_at, delta) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, expires_at = excluded.expires_at, size = excluded.size, "
+                "accessed_at = excluded.accessed_at, delta = excluded.delta",
+                (key, data, now + expiry, len(data), now, delta)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tag (tag, key) VALUES (?, ?)",
+                [(tag, key) for tag in tags]
+            )
+            evicted = self._evict(conn)
+        for evicted_key in evicted:
+            cache_stats.record(self._decode_name(evicted_key), "evictions")
+
+        if now >= self._next_sweep:
+            self.sweep()
+
+    def delete(self, key: CacheKey) -> None:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._delete_keys(conn, [self._encode_key(key)])
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            keys = [
+                row[0] for row in conn.execute(
+                    "SELECT key FROM cache_entry WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                )
+            ]
+            self._delete_keys(conn, keys)
+
+    def invalidate_tags(self, *tags: str) -> None:
+        if not tags:
+            return
+        placeholders = ", ".join("?" * len(tags))
+        # Lecture et suppression dans la même transaction : une entrée étiquetée
+        # entre-temps par un autre processus ne peut pas échapper à l'invalidation
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            keys = [
+                row[0] for row in conn.execute(
+                    f"SELECT DISTINCT key FROM cache_tag WHERE tag IN ({placeholders})", tags
+                )
+            ]
+            self._delete_keys(conn, keys)
+
+    def clear(self) -> None:
+        with self._accessed_lock:
+            self._accessed.clear()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entry")
+            conn.execute("DELETE FROM cache_tag")
+
+    def sweep(self) -> None:
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._flush_accessed(conn)
+            expired = [
+                row[0] for row in conn.execute(
+                    "SELECT key FROM cache_entry WHERE expires_at <= ?", (now,)
+                )
+            ]
+            self._delete_keys(conn, expired)
+            evicted = self._evict(conn)
+        for key in expired:
+            cache_stats.record(self._decode_name(key), "expirations")
+        for key in evicted:
+            cache_stats.record(self._decode_name(key), "evictions")
+        self._next_sweep = now + self.sweep_interval
+
+    def usage(self) -> Dict[str, Tuple[int, int]]:
+        usage: Dict[str, Tuple[int, int]] = {}
+        for key, size in self._connection().execute("SELECT key, size FROM cache_entry"):
+            name = self._decode_name(key)
+            entries, total = usage.get(name, (0, 0))
+            usage[name] = (entries + 1, total + size)
+        return usage
+
+    def _flush_accessed(self, conn: sqlite3.Connection) -> None:
+        # Appelée dans une transaction ouverte
+        with self._accessed_lock:
+            accessed, self._accessed = self._accessed, {}
+        if accessed:
+            conn.executemany(
+                "UPDATE cache_entry SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in accessed.items()]
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> List[str]:
+        # Éviction LRU au-delà des limites configurées, dans une transaction ouverte
+        count, size = conn.execute("SELECT entries, bytes FROM cache_usage").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return []
+
+        evicted: List[str] = []
+        for key, entry_size in conn.execute(
+            "SELECT key, size FROM cache_entry ORDER BY accessed_at"
+        ):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            evicted.append(key)
+            count -= 1
+            size -= entry_size
+        self._delete_keys(conn, evicted)
+        return evicted
+
+    @staticmethod
+    def _delete_keys(conn: sqlite3.Connection, keys: List[str]) -> None:
+        # Appelée dans une transaction ouverte
+        if not keys:
+            return
+        conn.executemany("DELETE FROM cache_entry WHERE key = ?", [(key,) for key in keys])
+        conn.executemany("DELETE FROM cache_tag WHERE key = ?", [(key,) for key in keys])
+
+
+def create_cache_backend(name: str) -> CacheBackend:
+    """
+    Instancie le backend de cache configuré ("memory" ou "sqlite").
+    """
+    if name == "memory":
+        return MemoryCacheBackend(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            sweep_interval=settings.CACHE_SWEEP_INTERVAL
+        )
+    if name == "sqlite":
+        return SQLiteCacheBackend(
+            settings.CACHE_SQLITE_PATH,
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            sweep_interval=settings.CACHE_SWEEP_INTERVAL
+        )
+    raise ValueError(f"Backend de cache inconnu : {name}")
+
+
+cache_backend = create_cache_backend(settings.CACHE_BACKEND)
+
 
 def cache_key(*args, **kwargs) -> str:
     """
-    Génère une clé de cache à partir des arguments.
+    Génère une clé de cache à partir d'arguments non hashables (sérialisation JSON).
     """
-    # key_dict = {"args": args, "kwargs": kwargs}
-    # key_str = json.dumps(key_dict, sort_keys=True)
-    # return hashlib.md5(key_str.encode()).hexdigest()
-    if args and hasattr(args[0], '__class__'):
-            args = args[1:]
-    
     try:
         key_dict = {"args": args, "kwargs": kwargs}
         key_str = json.dumps(key_dict, sort_keys=True, default=str)
     except TypeError:
         # Fallback de sécurité si jamais la sérialisation échoue
         key_str = str(args) + str(kwargs)
-    
+
     return hashlib.md5(key_str.encode()).hexdigest()
 
 
-def cache(expiry: int = DEFAULT_EXPIRY):
+class SingleFlight:
+    """
+    Regroupe les appels concurrents portant sur une même clé : un seul appelant
+    exécute le calcul, les autres attendent et reçoivent son résultat.
+    """
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[CacheKey, "SingleFlight._Call"] = {}
+
+    def in_flight(self, key: CacheKey) -> bool:
+        """
+        Indique si un calcul est en cours pour la clé.
+        """
+        return key in self._calls
+
+    def do(self, key: CacheKey, func: Callable[[], Any]) -> Any:
+        """
+        Exécute `func` ou attend le résultat du calcul déjà en cours pour la clé.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SingleFlight._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+_single_flight = SingleFlight()
+
+
+def _key_builder(
+    func: Callable,
+    key: Optional[Sequence[str]]
+) -> Callable[[tuple, dict], CacheKey]:
+    """
+    Prépare la construction des clés de cache d'une fonction : un tuple
+    (nom qualifié, *valeurs des arguments), sans sérialisation.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    parameters = inspect.signature(func).parameters
+    positional = [
+        param_name for param_name, param in parameters.items()
+        if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+    ]
+
+    if key is None:
+        # Toutes les valeurs des arguments, hors self/cls pour les méthodes
+        skip = 1 if positional and positional[0] in ("self", "cls") else 0
+
+        def build(args: tuple, kwargs: dict) -> CacheKey:
+            built = (name, args[skip:], tuple(sorted(kwargs.items()))) if kwargs else (name, args[skip:])
+            try:
+                hash(built)
+            except TypeError:
+                built = (name, cache_key(*args[skip:], **kwargs))
+            return built
+        return build
+
+    # Arguments déclarés explicitement : (nom, position, valeur par défaut)
+    specs = [
+        (
+            arg,
+            positional.index(arg) if arg in positional else None,
+            parameters[arg].default
+        )
+        for arg in key
+    ]
+
+    if len(specs) == 1:
+        arg, index, default = specs[0]
+
+        def build(args: tuple, kwargs: dict) -> CacheKey:
+            if arg in kwargs:
+                return (name, kwargs[arg])
+            if index is not None and index < len(args):
+                return (name, args[index])
+            return (name, default)
+        return build
+
+    def build(args: tuple, kwargs: dict) -> CacheKey:
+        values = [name]
+        for arg, index, default in specs:
+            if arg in kwargs:
+                values.append(kwargs[arg])
+            elif index is not None and index < len(args):
+                values.append(args[index])
+            else:
+                values.append(default)
+        return tuple(values)
+    return build
+
+
+def cache(
+    expiry: int = DEFAULT_EXPIRY,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    early_refresh: float = 0,
+    snapshot: Optional[Callable[[Any], Any]] = None,
+    key: Optional[Sequence[str]] = None,
+    negative_expiry: Optional[int] = None
+):
     """
     Décorateur pour mettre en cache le résultat d'une fonction.
+
+    `negative_expiry` définit une durée de vie distincte (en général plus courte)
+    pour les résultats None ("non trouvé") ; les tags permettent de les invalider
+    dès que la ligne correspondante est créée.
+
+    `key` liste les noms des arguments (hashables) qui identifient une entrée ;
+    par défaut, tous les arguments hors self/cls sont utilisés.
+
+    `tags` reçoit le résultat puis les arguments de l'appel et renvoie les tags
+    de l'entrée, utilisés par `invalidate_tags`.
+
+    `snapshot` convertit un résultat non nul en un instantané détaché (ex: un
+    schéma Pydantic) avant sa mise en cache ; la fonction décorée renvoie alors
+    toujours cet instantané, que la valeur vienne du cache ou non.
+
+    Les appels concurrents sur une même clé absente du cache ne déclenchent
+    qu'un seul calcul. Si `early_refresh` (beta) est positif, une entrée peut
+    être recalculée avant son expiration, avec une probabilité croissante à
+    l'approche de celle-ci (expiration anticipée probabiliste) : pendant ce
+    recalcul, les autres appelants continuent de recevoir l'ancienne valeur.
     """
     def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        build_key = _key_builder(func, key)
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             # Générer la clé de cache
-            key = f"{func.__module__}.{func.__name__}:{cache_key(*args, **kwargs)}"
+            entry_key = build_key(args, kwargs)
 
             # Vérifier si la valeur est dans le cache et n'a pas expiré
-            now = time.time()
-            if key in cache_store:
-                expiry_time, value = cache_store[key]
-                if expiry_time > now:
+            entry = cache_backend.get_entry(entry_key)
+            if entry is not None:
+                value, expiry_time, delta = entry
+                if (
+                    not early_refresh
+                    or _single_flight.in_flight(entry_key)
+                    or time.time() - delta * early_refresh * math.log(random.random() or 1e-12) < expiry_time
+                ):
+                    cache_stats.record(name, "hits")
+                    cache_stats.record(name, "saved_time", delta)
                     return value
 
-            # Exécuter la fonction et mettre en cache le résultat
-            result = func(*args, **kwargs)
-            cache_store[key] = (now + expiry, result)
+            cache_stats.record(name, "misses")
+
+            def compute() -> Any:
+                # Exécuter la fonction et mettre en cache le résultat
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                if snapshot is not None and result is not None:
+                    result = snapshot(result)
+                delta = time.perf_counter() - start
+                cache_stats.record(name, "computes")
+                cache_stats.record(name, "compute_time", delta)
 
-            return result
+                entry_tags = tags(result, *args, **kwargs) if tags else ()
+                entry_expiry = expiry if result is not None or negative_expiry is None else negative_expiry
+                cache_backend.set(entry_key, result, entry_expiry, tags=entry_tags, delta=delta)
+                return result
+
+            return _single_flight.do(entry_key, compute)
         return wrapper
     return decorator
 
 
-def invalidate_cache(prefix: str = None) -> None:
+def invalidate_cache(prefix: Optional[str] = None) -> None:
     """
     Invalide le cache.
     """
-    global cache_store
     if prefix:
         # Invalider uniquement les clés qui commencent par le préfixe
-        cache_store = {k: v for k, v in cache_store.items() if not k.startswith(prefix)}
+        cache_backend.delete_prefix(prefix)
     else:
         # Invalider tout le cache
-        cache_store = {}
\ No newline at end of file
+        cache_backend.clear()
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Statistiques du cache par fonction décorée.
+    """
+    return cache_stats.report(cache_backend)
+
+
+def cache_metrics_text(prefix: str = "library_cache") -> str:
+    """
+    Statistiques du cache au format texte Prometheus.
+    """
+    # (champ du rapport, nom de la métrique, type, description)
+    metrics = [
+        ("hits", "hits_total", "counter", "Nombre de succès du cache"),
+        ("misses", "misses_total", "counter", "Nombre d'échecs du cache"),
+        ("evictions", "evictions_total", "counter", "Nombre d'entrées évincées (LRU)"),
+        ("expirations", "expirations_total", "counter", "Nombre d'entrées expirées"),
+        ("entries", "entries", "gauge", "Nombre d'entrées en cache"),
+        ("memory_bytes", "memory_bytes", "gauge", "Taille estimée des entrées en cache (octets)"),
+        ("avg_compute_time", "compute_seconds_avg", "gauge", "Durée moyenne de calcul d'une entrée"),
+        ("total_time_saved", "saved_seconds_total", "counter", "Temps de calcul économisé par les succès"),
+    ]
+    report = get_cache_stats()
+
+    lines = []
+    for field, metric, metric_type, description in metrics:
+        metric_name = f"{prefix}_{metric}"
+        lines.append(f"# HELP {metric_name} {description}")
+        lines.append(f"# TYPE {metric_name} {metric_type}")
+        for function, values in report.items():
+            lines.append(f'{metric_name}{{function="{function}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def invalidate_tags(*tags: str) -> None:
+    """
+    Invalide les entrées du cache portant l'un des tags.
+    """
+    cache_backend.invalidate_tags(*tags)
@@ -0,0 +1,82 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Type, get_origin
+import csv
+import io
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def csv_columns(schema: Type[BaseModel]) -> List[str]:
+    """
+    Champs scalaires du schéma (les listes et objets imbriqués ne sont pas exportés en CSV).
+    """
+    columns = []
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        if get_origin(annotation) is list:
+            continue
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            continue
+        columns.append(name)
+    return columns
+
+
+def iter_ndjson(rows: Iterable[Any], schema: Type[BaseModel]) -> Iterator[str]:
+    """
+    Sérialise les lignes une par une en JSON délimité par des retours à la ligne.
+    """
+    for row in rows:
+        yield schema.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+
+
+def iter_csv(rows: Iterable[Any], schema: Type[BaseModel]) -> Iterator[str]:
+    """
+    Sérialise les lignes une par une en CSV, précédées d'une ligne d'en-tête.
+    """
+    columns = csv_columns(schema)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(schema.model_validate(row, from_attributes=True).model_dump(mode="json", include=set(columns)))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # En-tête seul si aucune ligne
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+    rows: Iterable[Any],
+    schema: Type[BaseModel],
+    format: str,
+    filename: str,
+    on_close: Optional[Callable[[], None]] = None
+) -> StreamingResponse:
+    """
+    Réponse streamée (NDJSON ou CSV) : chaque ligne est sérialisée et envoyée au fil de l'eau.
+
+    `on_close` est appelé à la fin du flux (ex: fermeture de la session).
+    """
+    serialize = iter_csv if format == "csv" else iter_ndjson
+
+    def body() -> Iterator[str]:
+        try:
+            yield from serialize(rows, schema)
+        finally:
+            if on_close is not None:
+                on_close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
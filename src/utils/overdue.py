@@ -0,0 +1,179 @@
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+import asyncio
+import heapq
+import logging
+import threading
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from ..models.loans import Loan
+from .cache import invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+# Tag de cache des listes d'emprunts (totaux paginés), invalidé par toute écriture d'emprunt
+LOANS_LIST_TAG = "loans:list"
+
+
+class OverdueSweeper:
+    """
+    Marque les emprunts en retard au fil de l'eau (colonne `is_overdue`).
+
+    Les emprunts actifs sont gardés dans un tas trié par date d'échéance : chaque passage
+    ne dépile que les échéances dépassées, sans parcourir la table. Les entrées périmées
+    (emprunt retourné ou prolongé) sont écartées par la condition de l'UPDATE. Le nombre
+    d'emprunts en retard est tenu à jour incrémentalement et recompté à chaque passage
+    (plusieurs processus peuvent modifier les emprunts).
+
+    Tant que le tas n'est pas chargé (`ready` faux), les requêtes sur les retards
+    calculent la condition sur les dates.
+    """
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._pending: List[Tuple[datetime, int]] = []
+        self._overdue_count = 0
+        self._state = "empty"  # "empty", "loading" ou "ready"
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._state == "ready"
+
+    @property
+    def overdue_count(self) -> int:
+        return self._overdue_count
+
+    def next_due(self) -> Optional[datetime]:
+        """
+        Prochaine échéance connue (None si aucun emprunt actif).
+        """
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def load(self, db: Session) -> None:
+        """
+        Charge les échéances des emprunts actifs pas encore marqués en retard.
+
+        Les emprunts créés pendant le chargement sont ajoutés ensuite.
+        """
+        with self._lock:
+            self._state = "loading"
+            self._pending = []
+
+        heap = db.query(Loan.due_date, Loan.id).filter(
+            Loan.return_date == None,
+            Loan.is_overdue == False
+        ).all()
+        heap = [tuple(row) for row in heap]
+        overdue_count = db.query(func.count(Loan.id)).filter(Loan.is_overdue == True).scalar() or 0
+
+        with self._lock:
+            heap.extend(self._pending)
+            heapq.heapify(heap)
+            self._heap = heap
+            self._pending = []
+            self._overdue_count = overdue_count
+            self._state = "ready"
+
+    def clear(self) -> None:
+        """
+        Vide le tas (les requêtes reviennent au calcul sur les dates).
+        """
+        with self._lock:
+            self._heap = []
+            self._pending = []
+            self._overdue_count = 0
+            self._state = "empty"
+
+    def sweep(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Marque en retard les emprunts dont l'échéance est dépassée ; retourne leur nombre.
+        """
+        now = now or datetime.utcnow()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                due.append(heapq.heappop(self._heap)[1])
+
+        flagged = 0
+        if due:
+            flagged = db.execute(
+                update(Loan)
+                .where(
+                    Loan.id.in_(due),
+                    Loan.return_date == None,
+                    Loan.is_overdue == False,
+                    Loan.due_date < now
+                )
+                .values(is_overdue=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if flagged:
+                invalidate_tags(LOANS_LIST_TAG)
+
+        overdue_count = db.query(func.count(Loan.id)).filter(Loan.is_overdue == True).scalar() or 0
+        with self._lock:
+            self._overdue_count = overdue_count
+        return flagged
+
+    def schedule(self, loans: Sequence[Tuple[int, datetime]]) -> None:
+        """
+        Ajoute les échéances (id, date d'échéance) d'emprunts créés ou prolongés.
+        """
+        with self._lock:
+            if self._state == "loading":
+                self._pending.extend((due_date, loan_id) for loan_id, due_date in loans)
+            elif self._state == "ready":
+                for loan_id, due_date in loans:
+                    heapq.heappush(self._heap, (due_date, loan_id))
+
+    def returned(self, overdue: int) -> None:
+        """
+        Décompte les emprunts en retard qui viennent d'être retournés ou supprimés.
+        """
+        if not self.ready or not overdue:
+            return
+        with self._lock:
+            self._overdue_count = max(self._overdue_count - overdue, 0)
+
+
+overdue_sweeper = OverdueSweeper()
+
+
+async def run_overdue_sweeper(session_factory: Callable[[], Session], interval: float) -> None:
+    """
+    Tâche de fond : charge le tas puis marque les retards à chaque échéance
+    (au plus tard toutes les `interval` secondes).
+    """
+    def load() -> None:
+        with session_factory() as db:
+            overdue_sweeper.load(db)
+
+    def sweep() -> None:
+        with session_factory() as db:
+            overdue_sweeper.sweep(db)
+
+    try:
+        await asyncio.to_thread(load)
+    except Exception:
+        logger.exception("Échec du chargement des échéances des emprunts")
+        overdue_sweeper.clear()
+        return
+
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(sweep)
+            except Exception:
+                logger.exception("Échec du marquage des emprunts en retard")
+
+            delay = interval
+            next_due = overdue_sweeper.next_due()
+            if next_due is not None:
+                delay = min(interval, max((next_due - datetime.utcnow()).total_seconds(), 0) + 0.01)
+            await asyncio.sleep(delay)
+    finally:
+        overdue_sweeper.clear()
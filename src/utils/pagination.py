@@ -1,8 +1,17 @@
-from typing import Generic, TypeVar, List, Optional, Dict, Any
+from typing import Generic, TypeVar, List, Optional, Dict, Any, Callable, Iterable, Sequence, Tuple
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import base64
+import json
 from pydantic import BaseModel
+from sqlalchemy import and_, inspect, or_
 from sqlalchemy.orm import Query
+from sqlalchemy.types import DateTime
 from fastapi import Query as QueryParam
 
+from ..config import settings
+from .cache import cache_backend
+
 T = TypeVar('T')
 
 
@@ -12,52 +21,272 @@ class PaginationParams:
         skip: int = 0,
         limit: int = 100,
         sort_by: Optional[str] = None,
-        sort_desc: bool = False
+        sort_desc: bool = False,
+        mode: str = "offset",
+        cursor: Optional[str] = None,
+        with_total: str = "exact"
     ):
         self.skip = skip
         self.limit = limit
         self.sort_by = sort_by
         self.sort_desc = sort_desc
+        # "offset" : skip/limit ; "cursor" : pagination par clé (keyset) à partir de `cursor`
+        self.mode = "cursor" if cursor else mode
+        self.cursor = cursor
+        # "exact" : COUNT(*) ; "cached" : COUNT(*) mis en cache ; "estimated" : comptage plafonné ; "none" : pas de total
+        self.with_total = with_total
+
+
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    label: Optional[str] = None
+    count: int
 
 
 class Page(BaseModel, Generic[T]):
     items: List[T]
-    total: int
-    page: int
+    total: Optional[int] = None
+    # Vrai si `total` est un minorant (plus de `total` éléments)
+    total_capped: bool = False
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    # Nombre de résultats par valeur de chaque facette (ex: {"language": [...]})
+    facets: Optional[Dict[str, List[FacetCount]]] = None
 
     class Config:
         arbitrary_types_allowed = True
 
 
-def paginate(query: Query, params: PaginationParams, schema) -> Page:
+def encode_cursor(value: Any, id: int) -> str:
+    """
+    Encode la dernière clé de tri et l'ID d'une page en un curseur opaque.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    data = json.dumps([value, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, column) -> Tuple[Any, int]:
+    """
+    Décode un curseur en (valeur de la clé de tri, ID).
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(data)
+        if value is not None and column is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(id)
+    except (ValueError, TypeError):
+        raise ValueError("Curseur de pagination invalide")
+
+
+def count_total(query: Query, params: PaginationParams, count_tags: Iterable[str] = ()) -> Tuple[Optional[int], bool]:
+    """
+    Compte les éléments d'une requête selon `params.with_total`.
+
+    Retourne (total, plafonné) ; le total vaut None en mode "none".
+    """
+    if params.with_total == "none":
+        return None, False
+
+    if params.with_total == "estimated":
+        # Compter au plus N+1 lignes : au-delà, on sait seulement qu'il y en a "plus de N"
+        cap = settings.PAGINATION_ESTIMATED_TOTAL_CAP
+        total = query.order_by(None).limit(cap + 1).count()
+        if total > cap:
+            return cap, True
+        return total, False
+
+    if params.with_total == "cached":
+        statement = query.order_by(None).statement.compile()
+        # Les paramètres IN (listes) sont convertis en tuples pour que la clé soit hachable
+        bound = tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in sorted(statement.params.items())
+        )
+        key = (f"{__name__}.count_total", str(statement), bound)
+        total = cache_backend.get(key)
+        if total is None:
+            total = query.count()
+            cache_backend.set(key, total, expiry=settings.PAGINATION_COUNT_EXPIRY, tags=count_tags)
+        return total, False
+
+    return query.count(), False
+
+
+def _page_count(total: Optional[int], limit: int) -> Optional[int]:
+    if total is None:
+        return None
+    return (total + limit - 1) // limit if limit > 0 else 1
+
+
+def _sort_column(schema, sort_by: Optional[str]):
+    if not sort_by:
+        return schema.id
+    column = inspect(schema).columns.get(sort_by)
+    if column is None:
+        raise ValueError(f"Tri impossible sur le champ '{sort_by}'")
+    if column.nullable and not column.primary_key:
+        raise ValueError(f"La pagination par curseur ne permet pas de trier sur le champ facultatif '{sort_by}'")
+    return getattr(schema, sort_by)
+
+
+def paginate_keyset(
+    query: Query,
+    params: PaginationParams,
+    schema,
+    count_tags: Iterable[str] = ()
+) -> Page:
+    """
+    Pagine une requête SQLAlchemy par clé (keyset) : la page suivante est
+    sélectionnée par un filtre sur (clé de tri, id) plutôt que par OFFSET, ce
+    qui garde un coût constant quelle que soit la profondeur de la page.
+    """
+    total, total_capped = count_total(query, params, count_tags)
+
+    column = _sort_column(schema, params.sort_by)
+    id_column = schema.id
+    sort_on_id = column is id_column
+
+    if params.cursor:
+        value, last_id = decode_cursor(params.cursor, column)
+        if sort_on_id:
+            query = query.filter(id_column < last_id if params.sort_desc else id_column > last_id)
+        elif params.sort_desc:
+            query = query.filter(or_(column < value, and_(column == value, id_column < last_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, id_column > last_id)))
+
+    if params.sort_desc:
+        order = [column.desc()] if sort_on_id else [column.desc(), id_column.desc()]
+    else:
+        order = [column] if sort_on_id else [column, id_column]
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = query.order_by(None).order_by(*order).limit(params.limit + 1).all()
+    items = rows[:params.limit]
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+
+    return Page(
+        items=items,
+        total=total,
+        total_capped=total_capped,
+        page=None,
+        size=params.limit,
+        pages=_page_count(total, params.limit),
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor
+    )
+
+
+def paginate(
+    query: Query,
+    params: PaginationParams,
+    schema,
+    count_tags: Iterable[str] = ()
+) -> Page:
     """
     Pagine une requête SQLAlchemy.
+
+    `count_tags` sont les tags d'invalidation du total en mode "cached".
     """
+    if params.mode == "cursor":
+        return paginate_keyset(query, params, schema, count_tags)
+
     # Compter le nombre total d'éléments
-    total = query.count()
+    total, total_capped = count_total(query, params, count_tags)
 
     # Appliquer le tri si spécifié
     if params.sort_by:
         if hasattr(schema, params.sort_by):
             column = getattr(schema, params.sort_by)
+            # Le tri demandé remplace l'ordre par défaut de la requête (ex: pertinence)
             if params.sort_desc:
-                query = query.order_by(column.desc())
+                query = query.order_by(None).order_by(column.desc())
             else:
-                query = query.order_by(column)
+                query = query.order_by(None).order_by(column)
 
-    # Appliquer la pagination
-    items = query.offset(params.skip).limit(params.limit).all()
+    # Appliquer la pagination (une ligne de plus pour savoir s'il existe une page suivante)
+    rows = query.offset(params.skip).limit(params.limit + 1).all()
+    items = rows[:params.limit]
 
-    # Calculer le nombre de pages
-    pages = (total + params.limit - 1) // params.limit if params.limit > 0 else 1
+    # Calculer le numéro de page
     page = (params.skip // params.limit) + 1 if params.limit > 0 else 1
 
     return Page(
         items=items,
         total=total,
+        total_capped=total_capped,
         page=page,
         size=params.limit,
-        pages=pages
-    )
\ No newline at end of file
+        pages=_page_count(total, params.limit),
+        has_more=len(rows) > params.limit
+    )
+
+
+def paginate_ids(
+    ids: Sequence[int],
+    params: PaginationParams,
+    fetch: Callable[[List[int]], List[Any]],
+    ranked: bool = False
+) -> Page:
+    """
+    Pagine une liste triée d'IDs déjà calculée (ex: résultat d'un index en mémoire) :
+    seuls les éléments de la page sont chargés, par `fetch(ids_de_la_page)`.
+
+    Le tri se fait uniquement par ID ; le curseur est compatible avec `paginate_keyset`.
+    Avec `ranked`, les IDs sont déjà classés (par pertinence) et seule la pagination
+    par offset est possible.
+    """
+    if params.sort_by not in (None, "id"):
+        raise ValueError(f"Tri impossible sur le champ '{params.sort_by}'")
+    if ranked and params.mode == "cursor":
+        raise ValueError("La pagination par curseur n'est pas disponible pour des résultats classés par pertinence")
+
+    total = len(ids)
+    limit = params.limit
+
+    if params.mode == "cursor":
+        if params.sort_desc:
+            end = total
+            if params.cursor:
+                end = bisect_left(ids, decode_cursor(params.cursor, None)[1])
+            start = max(end - limit, 0)
+            page_ids = list(reversed(ids[start:end]))
+            has_more = start > 0
+        else:
+            start = bisect_right(ids, decode_cursor(params.cursor, None)[1]) if params.cursor else 0
+            page_ids = list(ids[start:start + limit])
+            has_more = start + limit < total
+        next_cursor = encode_cursor(page_ids[-1], page_ids[-1]) if has_more and page_ids else None
+        page = None
+    else:
+        if params.sort_desc:
+            end = max(total - params.skip, 0)
+            page_ids = list(reversed(ids[max(end - limit, 0):end]))
+        else:
+            page_ids = list(ids[params.skip:params.skip + limit])
+        has_more = params.skip + limit < total
+        next_cursor = None
+        page = (params.skip // limit) + 1 if limit > 0 else 1
+
+    if params.with_total == "none":
+        total = None
+
+    return Page(
+        items=fetch(page_ids) if page_ids else [],
+        total=total,
+        page=page,
+        size=limit,
+        pages=_page_count(total, limit),
+        has_more=has_more,
+        next_cursor=next_cursor
+    )
@@ -0,0 +1,77 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Valide un paramètre `fields` (ex: "title,author") par rapport aux champs du schéma.
+
+    Retourne None si aucune projection n'est demandée ; l'ID est toujours inclus.
+    """
+    if not fields:
+        return None
+
+    names = ["id"]
+    for name in (part.strip() for part in fields.split(",")):
+        if not name or name in names:
+            continue
+        if name not in schema.model_fields:
+            raise ValueError(f"Champ inconnu : '{name}'")
+        names.append(name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=256)
+def projection_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Modèle de réponse réduit aux champs demandés (construit une seule fois par projection).
+    """
+    definitions = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Projection",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+
+def projection_options(model, fields: Optional[Tuple[str, ...]]) -> List[Any]:
+    """
+    Options de chargement SQLAlchemy limitant les colonnes lues aux champs demandés.
+    """
+    if fields is None:
+        return []
+
+    mapper = inspect(model)
+    columns = [getattr(model, name) for name in fields if name in mapper.columns]
+    options = [load_only(*columns)]
+    options += [selectinload(getattr(model, name)) for name in fields if name in mapper.relationships]
+    return options
+
+
+def projected_response(
+    content: Any,
+    schema: Type[BaseModel],
+    fields: Tuple[str, ...],
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Sérialise une liste ou une page (`items`) avec le modèle réduit, sans passer par le
+    modèle de réponse complet de la route.
+    """
+    model = projection_model(schema, fields)
+
+    if isinstance(content, list):
+        body = TypeAdapter(List[model]).dump_json([model.model_validate(item, from_attributes=True) for item in content])
+    else:
+        content.items = [model.model_validate(item, from_attributes=True) for item in content.items]
+        body = content.model_dump_json()
+
+    return Response(content=body, media_type="application/json", headers=headers)
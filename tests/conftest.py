@@ -5,7 +5,18 @@ from sqlalchemy.pool import StaticPool
 
 from src.models.base import Base
 from src.db.session import get_db
+from src.models.users import User
+from src.api.dependencies import get_current_active_user, get_current_admin_user
 from src.main import app
+from src.utils.cache import invalidate_cache
+from src.services.stats import stats_snapshots
+from src.search.catalog import catalog_index
+from src.utils.overdue import overdue_sweeper
+from src.config import settings
+
+# L'index de recherche est construit par les tests à partir de la base de test
+settings.SEARCH_INDEX_ON_STARTUP = False
+settings.OVERDUE_SWEEPER_ON_STARTUP = False
 
 
 @pytest.fixture(scope="session")
@@ -22,6 +33,23 @@ def engine():
     return engine
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Vide le cache, les instantanés de statistiques, l'index de recherche et les échéances
+    des emprunts entre les tests (les transactions des tests sont annulées).
+    """
+    invalidate_cache()
+    stats_snapshots.clear()
+    catalog_index.clear()
+    overdue_sweeper.clear()
+    yield
+    invalidate_cache()
+    stats_snapshots.clear()
+    catalog_index.clear()
+    overdue_sweeper.clear()
+
+
 @pytest.fixture(scope="function")
 def db_session(engine):
     """
@@ -55,4 +83,24 @@ def client(db_session):
     with TestClient(app) as client:
         yield client
 
-    app.dependency_overrides = {}
\ No newline at end of file
+    app.dependency_overrides = {}
+
+
+@pytest.fixture(scope="function")
+def admin_client(client, db_session):
+    """
+    Client de test authentifié en tant qu'administrateur.
+    """
+    admin = User(
+        email="admin-test@example.com",
+        hashed_password="fakehashedpassword",
+        full_name="Admin Test",
+        is_active=True,
+        is_admin=True
+    )
+    db_session.add(admin)
+    db_session.commit()
+
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    yield client
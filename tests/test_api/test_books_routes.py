@@ -0,0 +1,469 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.repositories.books import BookRepository
+
+
+def create_books(db_session: Session, count: int = 3):
+    repository = BookRepository(Book, db_session)
+    return [
+        repository.create(obj_in={
+            "title": f"API Book {i}",
+            "author": f"API Author {i}",
+            "isbn": f"{9000000000000 + i}",
+            "publication_year": 2000 + i,
+            "quantity": 1
+        })
+        for i in range(count)
+    ]
+
+
+def test_read_books_conditional_get(admin_client, db_session: Session):
+    """
+    Teste l'ETag de la liste des livres et la réponse 304.
+    """
+    books = create_books(db_session)
+
+    response = admin_client.get("/api/v1/books/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    # Collection validée par ETag seulement
+    assert "Last-Modified" not in response.headers
+
+    # Version du catalogue en cache : la requête conditionnelle ne lit pas la table book
+    statements = []
+    engine = db_session.get_bind().engine
+    count_statement = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = admin_client.get("/api/v1/books/", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert not [statement for statement in statements if "FROM book" in statement]
+
+    # Une autre page a un autre ETag
+    response = admin_client.get("/api/v1/books/?limit=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    # Une modification invalide l'ETag
+    BookRepository(Book, db_session).update(db_obj=books[0], obj_in={"quantity": 5})
+    response = admin_client.get("/api/v1/books/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # Une suppression change l'ETag même si la date de dernière modification est inchangée
+    etag = response.headers["ETag"]
+    BookRepository(Book, db_session).remove(id=books[1].id)
+    response = admin_client.get("/api/v1/books/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = admin_client.get("/api/v1/books/", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert response.status_code == 200
+
+
+def test_read_book_conditional_get(admin_client, db_session: Session):
+    """
+    Teste l'ETag et Last-Modified d'un livre.
+    """
+    book = create_books(db_session, count=1)[0]
+
+    response = admin_client.get(f"/api/v1/books/{book.id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+
+    response = admin_client.get(f"/api/v1/books/{book.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = admin_client.get(f"/api/v1/books/{book.id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = admin_client.get("/api/v1/books/999999", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+
+def test_read_books_cursor_pagination(admin_client, db_session: Session):
+    """
+    Teste la pagination par curseur, croissante et décroissante.
+    """
+    create_books(db_session, count=5)
+
+    titles = []
+    cursor = None
+    while True:
+        url = "/api/v1/books/?pagination=cursor&limit=2&sort_by=title&sort_desc=true"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        titles += [book["title"] for book in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [f"API Book {i}" for i in reversed(range(5))]
+
+    # Un curseur invalide ou un tri sur un champ facultatif est refusé
+    response = admin_client.get("/api/v1/books/?cursor=invalide")
+    assert response.status_code == 400
+    response = admin_client.get("/api/v1/books/search/?pagination=cursor&sort_by=publisher")
+    assert response.status_code == 400
+
+
+def test_read_books_with_total_modes(admin_client, db_session: Session):
+    """
+    Teste les modes de calcul du total (exact, cached, estimated, none).
+    """
+    create_books(db_session, count=3)
+
+    data = admin_client.get("/api/v1/books/?limit=2&with_total=none").json()
+    assert data["total"] is None and data["pages"] is None
+    assert data["has_more"] is True
+    assert len(data["items"]) == 2
+
+    data = admin_client.get("/api/v1/books/?limit=2&with_total=cached").json()
+    assert data["total"] == 3 and data["pages"] == 2
+
+    # Le total mis en cache est invalidé par une écriture
+    BookRepository(Book, db_session).create(obj_in={
+        "title": "API Book 3",
+        "author": "API Author 3",
+        "isbn": "9000000000003",
+        "publication_year": 2003,
+        "quantity": 1
+    })
+    data = admin_client.get("/api/v1/books/?limit=2&with_total=cached").json()
+    assert data["total"] == 4
+
+    data = admin_client.get("/api/v1/books/?skip=2&limit=2&with_total=exact").json()
+    assert data["total"] == 4 and data["has_more"] is False
+
+
+def test_read_books_estimated_total(admin_client, db_session: Session, monkeypatch):
+    """
+    Teste le total estimé par comptage plafonné.
+    """
+    from src.config import settings
+
+    create_books(db_session, count=4)
+    monkeypatch.setattr(settings, "PAGINATION_ESTIMATED_TOTAL_CAP", 2)
+
+    data = admin_client.get("/api/v1/books/?limit=1&with_total=estimated").json()
+    assert data["total"] == 2
+    assert data["total_capped"] is True
+
+
+def test_read_books_fields_projection(admin_client, db_session: Session):
+    """
+    Teste la projection des colonnes avec `fields`.
+    """
+    create_books(db_session, count=2)
+
+    response = admin_client.get("/api/v1/books/?fields=title,author")
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    data = response.json()
+    assert data["total"] == 2
+    assert data["items"][0] == {"id": data["items"][0]["id"], "title": "API Book 0", "author": "API Author 0"}
+
+    response = admin_client.get("/api/v1/books/search/?query=Book&fields=title,categories")
+    assert set(response.json()["items"][0]) == {"id", "title", "categories"}
+
+    response = admin_client.get("/api/v1/books/?fields=title,secret")
+    assert response.status_code == 400
+
+
+def test_export_books(admin_client, db_session: Session):
+    """
+    Teste l'export NDJSON et CSV du catalogue, complet et incrémental.
+    """
+    import json
+    from datetime import datetime, timedelta
+
+    create_books(db_session, count=3)
+
+    response = admin_client.get("/api/v1/books/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [book["title"] for book in lines] == ["API Book 0", "API Book 1", "API Book 2"]
+    assert lines[0]["categories"] == []
+
+    response = admin_client.get("/api/v1/books/export?format=csv")
+    rows = response.text.splitlines()
+    assert rows[0].startswith("title,author,isbn")
+    assert len(rows) == 4
+
+    since = (datetime.utcnow() + timedelta(minutes=1)).isoformat()
+    response = admin_client.get(f"/api/v1/books/export?format=csv&updated_since={since}")
+    assert len(response.text.splitlines()) == 1
+
+
+def test_search_books_with_catalog_index(admin_client, db_session: Session):
+    """
+    Teste la recherche servie par l'index en mémoire (pagination des IDs).
+    """
+    from src.search import catalog_index
+
+    books = create_books(db_session, count=5)
+    catalog_index.build(db_session)
+
+    data = admin_client.get("/api/v1/books/search/?query=api%20book&limit=2&skip=2&sort_by=id").json()
+    assert data["total"] == 5
+    assert [book["id"] for book in data["items"]] == [books[2].id, books[3].id]
+
+    data = admin_client.get("/api/v1/books/search/?query=book&limit=2&pagination=cursor&sort_desc=true").json()
+    assert [book["id"] for book in data["items"]] == [books[4].id, books[3].id]
+    data = admin_client.get(f"/api/v1/books/search/?query=book&limit=2&sort_desc=true&cursor={data['next_cursor']}").json()
+    assert [book["id"] for book in data["items"]] == [books[2].id, books[1].id]
+    assert data["has_more"] is True
+
+
+def test_search_books_index_matches_database(admin_client, db_session: Session, monkeypatch):
+    """
+    Teste que l'index en mémoire ne change pas les résultats : ISBN, classement par
+    pertinence et écritures faites par un autre processus.
+    """
+    from sqlalchemy import delete, insert, update
+    from src.config import settings
+    from src.models.books import catalog_change
+    from src.models.users import User
+    from src.search import catalog_index
+
+    repository = BookRepository(Book, db_session)
+    description_hit = repository.create(obj_in={
+        "title": "Voyages",
+        "author": "Author",
+        "isbn": "9300000000001",
+        "publication_year": 2001,
+        "quantity": 1,
+        "description": "Un roman sur Dune"
+    })
+    title_hit = repository.create(obj_in={
+        "title": "Dune",
+        "author": "Frank Herbert",
+        "isbn": "9300000000002",
+        "publication_year": 1965,
+        "quantity": 1
+    })
+    catalog_index.build(db_session)
+
+    def search(params: str):
+        data = admin_client.get(f"/api/v1/books/search/?{params}").json()
+        return [book["id"] for book in data["items"]]
+
+    assert search("query=9300000000002") == [title_hit.id]
+    assert search("query=dune") == [title_hit.id, description_hit.id]
+    assert search("query=dune&sort_by=id") == [description_hit.id, title_hit.id]
+
+    # Livre ajouté par un autre processus : l'index rattrape le journal, sans reconstruction
+    rebuilds = []
+    monkeypatch.setattr(settings, "SEARCH_INDEX_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(catalog_index, "rebuild", lambda session_factory: rebuilds.append(session_factory))
+    db_session.execute(insert(Book).values(
+        title="Dune Messiah", author="Frank Herbert", isbn="9300000000003", publication_year=1969, quantity=1
+    ))
+    db_session.commit()
+    assert len(search("query=dune&sort_by=id")) == 3
+    assert list(catalog_index.search("messiah")) == [title_hit.id + 1]
+    assert rebuilds == []
+
+    # Les emprunts (changements de stock) ne touchent pas l'index
+    generation = catalog_index.generation
+    user = db_session.query(User).filter(User.email == "admin-test@example.com").one()
+    assert admin_client.post(f"/api/v1/loans/?user_id={user.id}&book_id={title_hit.id}").status_code == 201
+    assert catalog_index.is_current(db_session)
+    assert catalog_index.generation == generation
+
+    # Journal purgé avant d'avoir été rattrapé : reconstruction, la base répond en attendant
+    db_session.execute(update(Book).where(Book.id == description_hit.id).values(title="Voyages sur Dune"))
+    db_session.execute(update(Book).where(Book.id == description_hit.id).values(author="Autre auteur"))
+    db_session.execute(delete(catalog_change).where(catalog_change.c.generation == generation + 1))
+    db_session.commit()
+    assert len(search("query=dune&sort_by=id")) == 3
+    assert len(rebuilds) == 1
+
+
+def test_search_books_fuzzy(admin_client, db_session: Session):
+    """
+    Teste la recherche approchée (`fuzzy=true`).
+    """
+    from src.search import catalog_index
+
+    repository = BookRepository(Book, db_session)
+    hobbit = repository.create(obj_in={
+        "title": "The Hobbit",
+        "author": "J.R.R. Tolkien",
+        "isbn": "9200000000001",
+        "publication_year": 1937,
+        "quantity": 1
+    })
+    repository.create(obj_in={
+        "title": "1984",
+        "author": "George Orwell",
+        "isbn": "9200000000002",
+        "publication_year": 1949,
+        "quantity": 1
+    })
+    catalog_index.build(db_session)
+
+    data = admin_client.get("/api/v1/books/search/?query=Tolkein&fuzzy=true").json()
+    assert [book["id"] for book in data["items"]] == [hobbit.id]
+
+    # Les autres filtres s'appliquent aux candidats
+    data = admin_client.get("/api/v1/books/search/?query=Tolkein&fuzzy=true&publication_year=1949").json()
+    assert data["items"] == []
+
+    response = admin_client.get("/api/v1/books/search/?query=Orwel&fuzzy=true&pagination=cursor")
+    assert response.status_code == 400
+
+    # Sans index, la base ne sait pas faire de recherche approchée : pas de repli silencieux
+    catalog_index.clear()
+    response = admin_client.get("/api/v1/books/search/?query=Tolkein&fuzzy=true")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_suggest_books(admin_client, db_session: Session):
+    """
+    Teste l'autocomplétion, depuis la base puis depuis l'index en mémoire.
+    """
+    from src.search import catalog_index
+
+    create_books(db_session, count=2)
+    expected = [
+        {"field": "author", "text": "API Author 0"},
+        {"field": "author", "text": "API Author 1"},
+        {"field": "title", "text": "API Book 0"}
+    ]
+
+    response = admin_client.get("/api/v1/books/suggest?prefix=api&limit=3")
+    assert response.status_code == 200
+    assert response.json() == expected
+
+    catalog_index.build(db_session)
+    assert admin_client.get("/api/v1/books/suggest?prefix=api&limit=3").json() == expected
+    assert admin_client.get("/api/v1/books/suggest?prefix=api%20b").json() == [
+        {"field": "title", "text": "API Book 0"},
+        {"field": "title", "text": "API Book 1"}
+    ]
+
+
+def test_suggest_books_by_frequency(admin_client, db_session: Session):
+    """
+    Teste le classement des complétions par fréquence et la recherche littérale des jokers
+    de LIKE, depuis la base puis depuis l'index en mémoire.
+    """
+    from src.search import catalog_index
+
+    db_session.add_all([
+        Book(title=f"Zeta {i}", author="Zeta Popular" if i else "Zeta_Rare", isbn=f"{9500000000000 + i}", publication_year=2000)
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    expected = [{"field": "author", "text": "Zeta Popular"}]
+    assert admin_client.get("/api/v1/books/suggest?prefix=zeta&limit=1").json() == expected
+    assert admin_client.get("/api/v1/books/suggest?prefix=zeta_").json() == [{"field": "author", "text": "Zeta_Rare"}]
+    assert admin_client.get("/api/v1/books/suggest?prefix=%25eta").json() == []
+
+    catalog_index.build(db_session)
+    assert admin_client.get("/api/v1/books/suggest?prefix=zeta&limit=1").json() == expected
+
+
+def test_search_books_facets(admin_client, db_session: Session):
+    """
+    Teste les comptes par facette renvoyés avec une page de résultats.
+    """
+    from src.models.categories import Category
+
+    repository = BookRepository(Book, db_session)
+    books = create_books(db_session, count=3)
+    repository.update(db_obj=books[0], obj_in={"language": "fr", "publication_year": 1995})
+    repository.update(db_obj=books[1], obj_in={"language": "fr"})
+    roman = Category(name="Roman Facette")
+    db_session.add(roman)
+    db_session.commit()
+    repository.add_category(book_id=books[0].id, category_id=roman.id)
+    repository.add_category(book_id=books[2].id, category_id=roman.id)
+
+    data = admin_client.get("/api/v1/books/search/?query=book&facets=true&limit=1").json()
+    assert len(data["items"]) == 1
+    assert data["facets"]["category"] == [{"value": str(roman.id), "label": "Roman Facette", "count": 2}]
+    assert data["facets"]["language"] == [
+        {"value": "fr", "label": None, "count": 2},
+        {"value": None, "label": None, "count": 1}
+    ]
+    assert data["facets"]["decade"] == [
+        {"value": "2000", "label": None, "count": 2},
+        {"value": "1990", "label": None, "count": 1}
+    ]
+
+    # Les facettes portent sur les résultats filtrés
+    data = admin_client.get("/api/v1/books/search/?facets=true&publication_year=1995").json()
+    assert data["facets"]["category"][0]["count"] == 1
+
+    data = admin_client.get("/api/v1/books/search/?query=book").json()
+    assert data["facets"] is None
+
+
+def test_search_books_multiple_categories(admin_client, db_session: Session):
+    """
+    Teste le filtre sur plusieurs catégories (any/all), en base puis avec l'index en mémoire.
+    """
+    from src.models.categories import Category
+    from src.search import catalog_index
+
+    repository = BookRepository(Book, db_session)
+    books = create_books(db_session, count=3)
+    roman, histoire = Category(name="Roman Multi"), Category(name="Histoire Multi")
+    db_session.add_all([roman, histoire])
+    db_session.commit()
+    repository.add_category(book_id=books[0].id, category_id=roman.id)
+    repository.add_category(book_id=books[0].id, category_id=histoire.id)
+    repository.add_category(book_id=books[1].id, category_id=histoire.id)
+
+    def search(params: str):
+        data = admin_client.get(f"/api/v1/books/search/?{params}").json()
+        return [book["id"] for book in data["items"]]
+
+    any_url = f"category_id={roman.id}&category_id={histoire.id}"
+    all_url = any_url + "&category_mode=all"
+    for _ in range(2):
+        assert search(any_url) == [books[0].id, books[1].id]
+        assert search(all_url) == [books[0].id]
+        assert search(all_url + "&query=book") == [books[0].id]
+        catalog_index.build(db_session)
+
+    repository.remove_category(book_id=books[0].id, category_id=roman.id)
+    assert search(all_url) == []
+    assert search(f"category_id={histoire.id}") == [books[0].id, books[1].id]
+
+
+def test_search_books_cached_total_with_categories(admin_client, db_session: Session):
+    """
+    Teste le total mis en cache d'une recherche filtrée par catégories (paramètres IN).
+    """
+    from src.models.categories import Category
+
+    repository = BookRepository(Book, db_session)
+    books = create_books(db_session, count=3)
+    roman, histoire = Category(name="Roman Cache"), Category(name="Histoire Cache")
+    db_session.add_all([roman, histoire])
+    db_session.commit()
+    repository.add_category(book_id=books[0].id, category_id=roman.id)
+    repository.add_category(book_id=books[1].id, category_id=histoire.id)
+
+    url = f"/api/v1/books/search/?category_id={roman.id}&category_id={histoire.id}&author=API&with_total=cached"
+    for _ in range(2):
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+    # Le total mis en cache est invalidé par un changement de catégorie
+    repository.add_category(book_id=books[2].id, category_id=roman.id)
+    assert admin_client.get(url).json()["total"] == 3
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.utils.overdue import overdue_sweeper
+
+
+def create_loans(db_session: Session, count: int = 2):
+    user = db_session.query(User).filter(User.email == "admin-test@example.com").first()
+    book = Book(
+        title="Loan Book",
+        author="Loan Author",
+        isbn="9100000000000",
+        publication_year=2000,
+        quantity=count
+    )
+    db_session.add(book)
+    db_session.commit()
+
+    now = datetime.utcnow()
+    loans = [
+        Loan(user_id=user.id, book_id=book.id, loan_date=now, due_date=now + timedelta(days=14 + i))
+        for i in range(count)
+    ]
+    db_session.add_all(loans)
+    db_session.commit()
+    return user, book, loans
+
+
+def test_read_loans_fields_projection(admin_client, db_session: Session):
+    """
+    Teste la projection des colonnes des listes d'emprunts.
+    """
+    user, book, loans = create_loans(db_session)
+
+    response = admin_client.get(f"/api/v1/loans/book/{book.id}?fields=due_date")
+    assert response.status_code == 200
+    data = response.json()["items"]
+    assert len(data) == 2
+    assert set(data[0]) == {"id", "due_date"}
+
+    response = admin_client.get("/api/v1/loans/active/?fields=user_id,book_id")
+    assert response.json()["items"][0] == {"id": loans[0].id, "user_id": user.id, "book_id": book.id}
+
+    # Sans projection, la réponse est complète
+    response = admin_client.get("/api/v1/loans/")
+    assert "extended" in response.json()["items"][0]
+
+    response = admin_client.get("/api/v1/loans/?fields=password")
+    assert response.status_code == 400
+
+
+def test_export_loans(admin_client, db_session: Session):
+    """
+    Teste l'export NDJSON des emprunts.
+    """
+    create_loans(db_session, count=3)
+
+    response = admin_client.get("/api/v1/loans/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+
+
+def test_bulk_checkout_and_return(admin_client, db_session: Session):
+    """
+    Teste l'emprunt puis le retour d'un lot de livres, avec un résultat par élément.
+    """
+    user = db_session.query(User).filter(User.email == "admin-test@example.com").first()
+    books = [
+        Book(title=f"Bulk Book {i}", author="Author", isbn=f"{9200000000000 + i}", publication_year=2000, quantity=1 - i // 2)
+        for i in range(3)
+    ]
+    db_session.add_all(books)
+    db_session.commit()
+    available, other, unavailable = books
+
+    response = admin_client.post("/api/v1/loans/bulk", json={
+        "user_id": user.id,
+        "book_ids": [available.id, other.id, available.id, unavailable.id, 999999]
+    })
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["success"] for result in results] == [True, True, False, False, False]
+    assert "plusieurs fois" in results[2]["error"]
+    assert "pas disponible" in results[3]["error"]
+    assert "non trouvé" in results[4]["error"]
+    assert results[0]["loan"]["book_id"] == available.id
+
+    db_session.refresh(available)
+    db_session.refresh(unavailable)
+    assert (available.quantity, unavailable.quantity) == (0, 0)
+
+    loan_ids = [results[0]["loan"]["id"], results[1]["loan"]["id"]]
+    response = admin_client.post("/api/v1/loans/bulk-return", json={"loan_ids": loan_ids + [loan_ids[0], 999999]})
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["success"] for result in results] == [True, True, False, False]
+    assert results[0]["loan"]["return_date"] is not None
+
+    db_session.refresh(available)
+    assert available.quantity == 1
+
+    # Déjà retournés
+    response = admin_client.post("/api/v1/loans/bulk-return", json={"loan_ids": loan_ids})
+    assert not any(result["success"] for result in response.json())
+
+    response = admin_client.post("/api/v1/loans/bulk", json={"user_id": 999999, "book_ids": [available.id]})
+    assert response.status_code == 400
+
+
+def test_read_loans_pagination_and_include(admin_client, db_session: Session):
+    """
+    Teste la pagination par clé des listes d'emprunts et l'inclusion des relations par jointure.
+    """
+    user, book, loans = create_loans(db_session, count=5)
+
+    response = admin_client.get("/api/v1/loans/active/?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["id"] for item in page["items"]] == [loans[0].id, loans[1].id]
+    assert page["total"] == 5
+    assert page["items"][0]["user"] is None
+
+    ids = []
+    cursor = None
+    while True:
+        url = f"/api/v1/loans/user/{user.id}?limit=2&sort_by=due_date&sort_desc=true"
+        page = admin_client.get(url + (f"&cursor={cursor}" if cursor else "")).json()
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == [loan.id for loan in reversed(loans)]
+
+    # Relations chargées par jointure : le nombre de requêtes ne dépend pas de la page
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args[2])
+
+    # Le client partage la session du test : oublier les emprunts déjà chargés sans relations
+    db_session.expire_all()
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = admin_client.get("/api/v1/loans/?include=user,book&with_total=none")
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    items = response.json()["items"]
+    assert len(items) == 5
+    assert items[0]["user"]["email"] == user.email
+    assert items[0]["book"]["isbn"] == book.isbn
+    loan_statements = [statement for statement in statements if "FROM loan" in statement]
+    assert len(loan_statements) == 1
+
+    db_session.expire_all()
+    response = admin_client.get("/api/v1/loans/?include=user&fields=due_date")
+    assert set(response.json()["items"][0]) == {"id", "due_date", "user"}
+
+    assert admin_client.get("/api/v1/loans/?include=author").status_code == 400
+    assert admin_client.get("/api/v1/loans/?sort_by=return_date").status_code == 400
+
+
+def test_read_loans_cached_total_invalidation(admin_client, db_session: Session):
+    """
+    Teste l'invalidation du total mis en cache des listes d'emprunts par les écritures.
+    """
+    user, book, loans = create_loans(db_session, count=2)
+    db_session.add(Book(title="Cached Book", author="Author", isbn="9100000000001", publication_year=2000, quantity=1))
+    db_session.commit()
+    other = db_session.query(Book).filter(Book.isbn == "9100000000001").one()
+
+    url = "/api/v1/loans/active/?with_total=cached"
+    assert admin_client.get(url).json()["total"] == 2
+
+    response = admin_client.post(f"/api/v1/loans/?user_id={user.id}&book_id={other.id}")
+    assert response.status_code == 201
+    assert admin_client.get(url).json()["total"] == 3
+
+    assert admin_client.post(f"/api/v1/loans/{loans[0].id}/return").status_code == 200
+    assert admin_client.get(url).json()["total"] == 2
+
+    # Emprunt passé en retard par le balayage
+    overdue_url = "/api/v1/loans/overdue/?with_total=cached"
+    assert admin_client.get(overdue_url).json()["total"] == 0
+    overdue_sweeper.load(db_session)
+    overdue_sweeper.sweep(db_session, now=datetime.utcnow() + timedelta(days=30))
+    assert admin_client.get(overdue_url).json()["total"] == 2
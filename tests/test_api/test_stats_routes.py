@@ -0,0 +1,65 @@
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.utils.cache import cache_stats
+
+
+def test_cache_statistics(admin_client, db_session: Session):
+    """
+    Teste l'exposition des statistiques du cache (JSON et Prometheus).
+    """
+    cache_stats.reset()
+    repository = BookRepository(Book, db_session)
+    repository.create(obj_in={
+        "title": "Stats Book",
+        "author": "Stats Author",
+        "isbn": "8888888888888",
+        "publication_year": 2020,
+        "quantity": 1
+    })
+    repository.get_by_isbn(isbn="8888888888888")
+    repository.get_by_isbn(isbn="8888888888888")
+
+    response = admin_client.get("/api/v1/stats/cache")
+    assert response.status_code == 200
+    stats = response.json()["src.repositories.books.BookRepository.get_by_isbn"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["memory_bytes"] > 0
+
+    response = admin_client.get("/api/v1/stats/cache/metrics")
+    assert response.status_code == 200
+    assert (
+        'library_cache_hits_total{function="src.repositories.books.BookRepository.get_by_isbn"} 1'
+        in response.text
+    )
+
+
+def test_general_stats_snapshot_headers(admin_client):
+    """
+    Teste que les statistiques exposent la date de leur instantané.
+    """
+    response = admin_client.get("/api/v1/stats/general")
+    assert response.status_code == 200
+    assert response.headers["X-Snapshot-Timestamp"].endswith("Z")
+    assert response.headers["Age"] == "0"
+
+    again = admin_client.get("/api/v1/stats/general")
+    assert again.headers["X-Snapshot-Timestamp"] == response.headers["X-Snapshot-Timestamp"]
+
+
+def test_ranking_stats_share_one_snapshot(admin_client):
+    """
+    Teste que les classements sont servis par un seul instantané, tronqué à `limit`.
+    """
+    from src.services.stats import stats_snapshots
+
+    first = admin_client.get("/api/v1/stats/most-borrowed-books?limit=3")
+    second = admin_client.get("/api/v1/stats/most-borrowed-books?limit=7")
+    assert first.status_code == second.status_code == 200
+    assert len(stats_snapshots._snapshots) == 1
+
+    assert admin_client.get("/api/v1/stats/most-active-users?limit=1000").status_code == 422
+    assert admin_client.get("/api/v1/stats/monthly-loans?months=0").status_code == 422
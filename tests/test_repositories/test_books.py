@@ -2,6 +2,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from src.models.books import Book
+from src.api.schemas.books import BookSnapshot
 from src.models.categories import Category
 from src.repositories.books import BookRepository
 from src.repositories.categories import CategoryRepository
@@ -54,6 +55,54 @@ def test_get_book_by_isbn(db_session: Session):
     assert book.isbn == "9876543210123"
 
 
+def test_get_book_by_isbn_cache_invalidation(db_session: Session):
+    """
+    Teste que la mise à jour d'un livre invalide son entrée en cache.
+    """
+    repository = BookRepository(Book, db_session)
+
+    book = repository.create(obj_in={
+        "title": "Cached Book",
+        "author": "Cache Author",
+        "isbn": "5555555555555",
+        "publication_year": 2022,
+        "quantity": 1
+    })
+    assert repository.get_by_isbn(isbn="5555555555555") is not None
+
+    repository.update(db_obj=book, obj_in={"isbn": "6666666666666"})
+
+    assert repository.get_by_isbn(isbn="5555555555555") is None
+    assert repository.get_by_isbn(isbn="6666666666666").id == book.id
+
+
+def test_get_book_by_isbn_returns_snapshot(db_session: Session):
+    """
+    Teste que get_by_isbn renvoie un instantané détaché de la session, avec ses catégories.
+    """
+    book_repository = BookRepository(Book, db_session)
+    category_repository = CategoryRepository(Category, db_session)
+
+    category = category_repository.create(obj_in={"name": "Snapshot"})
+    book = book_repository.create(obj_in={
+        "title": "Snapshot Book",
+        "author": "Snapshot Author",
+        "isbn": "7777777777777",
+        "publication_year": 2021,
+        "quantity": 2
+    })
+    book_repository.add_category(book_id=book.id, category_id=category.id)
+
+    snapshot = book_repository.get_by_isbn(isbn="7777777777777")
+    db_session.close()
+
+    assert isinstance(snapshot, BookSnapshot)
+    assert snapshot.id == book.id
+    assert [c.name for c in snapshot.categories] == ["Snapshot"]
+    # Une nouvelle lecture est servie par le cache, sans accès à la session
+    assert book_repository.get_by_isbn(isbn="7777777777777") is snapshot
+
+
 def test_search_books(db_session: Session):
     """
     Teste la recherche de livres.
@@ -144,4 +193,67 @@ def test_book_categories(db_session: Session):
     # Vérifier que la catégorie a été supprimée
     book_with_categories = book_repository.get_with_categories(id=book.id)
     assert len(book_with_categories.categories) == 1
-    assert book_with_categories.categories[0].name == "Python"
\ No newline at end of file
+    assert book_with_categories.categories[0].name == "Python"
+
+
+def test_full_text_search(db_session: Session):
+    """
+    Teste la recherche plein texte : préfixes, accents, pertinence et synchronisation de l'index.
+    """
+    repository = BookRepository(Book, db_session)
+    miserables = repository.create(obj_in={
+        "title": "Les Misérables",
+        "author": "Victor Hugo",
+        "isbn": "4444444444444",
+        "publication_year": 1862,
+        "quantity": 1
+    })
+    repository.create(obj_in={
+        "title": "Notre-Dame de Paris",
+        "author": "Victor Hugo",
+        "isbn": "5555555555555",
+        "publication_year": 1831,
+        "description": "Un roman de Victor Hugo, moins connu que Les Misérables",
+        "quantity": 1
+    })
+
+    # Recherche par préfixe, sans accents ; le titre pèse plus que la description
+    books = repository.search(query="miserable")
+    assert [book.title for book in books] == ["Les Misérables", "Notre-Dame de Paris"]
+
+    assert [book.title for book in repository.get_by_title(title="paris")] == ["Notre-Dame de Paris"]
+    assert len(repository.get_by_author(author="hugo")) == 2
+    assert repository.search(query="%") == []
+
+    # L'index suit les mises à jour et suppressions
+    repository.update(db_obj=miserables, obj_in={"title": "Quatrevingt-treize"})
+    assert [book.title for book in repository.search(query="quatrevingt")] == ["Quatrevingt-treize"]
+    repository.remove(id=miserables.id)
+    assert repository.search(query="quatrevingt") == []
+
+
+def test_stream_uses_updated_at_index(db_session: Session):
+    """
+    Teste que l'export incrémental parcourt l'index (updated_at, id), sans tri en mémoire.
+    """
+    from datetime import datetime
+    from sqlalchemy import event
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        list(BookRepository(Book, db_session).stream(updated_since=datetime(2000, 1, 1)))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = next((s, p) for s, p in statements if "FROM book" in s)
+    plan = " ".join(
+        row[-1] for row in db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    )
+    assert "idx_book_updated_at_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,29 @@
+from src.search import CategoryBitmaps
+from src.search.bitmap import bitmap_from_ids, bitmap_to_ids
+
+
+def test_bitmap_conversion():
+    """
+    Teste la conversion entre listes d'IDs et bitmaps (creux et denses).
+    """
+    for ids in ([], [0], [3, 9, 1000], list(range(0, 5000, 2))):
+        assert list(bitmap_to_ids(bitmap_from_ids(ids))) == ids
+
+
+def test_category_bitmaps_any_all():
+    """
+    Teste les combinaisons de catégories et la maintenance des bitmaps.
+    """
+    bitmaps = CategoryBitmaps()
+    bitmaps.load({1: [10, 11, 12], 2: [11, 12, 13]})
+    bitmaps.add(3, 12)
+
+    assert list(bitmap_to_ids(bitmaps.match([1, 2], "any"))) == [10, 11, 12, 13]
+    assert list(bitmap_to_ids(bitmaps.match([1, 2], "all"))) == [11, 12]
+    assert list(bitmap_to_ids(bitmaps.match([1, 2, 3], "all"))) == [12]
+    assert bitmaps.match([4], "any") == 0
+
+    bitmaps.remove(1, 11)
+    assert list(bitmap_to_ids(bitmaps.match([1, 2], "all"))) == [12]
+    bitmaps.remove_book(12)
+    assert list(bitmap_to_ids(bitmaps.match([1, 2, 3], "any"))) == [10, 11, 13]
@@ -0,0 +1,136 @@
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.search import CatalogIndex, InvertedIndex, catalog_index, tokenize
+
+
+def test_tokenize():
+    """
+    Teste la normalisation des mots (minuscules, accents supprimés).
+    """
+    assert tokenize("Les Misérables, d'Hugo") == ["les", "miserables", "d", "hugo"]
+    assert tokenize(None) == []
+
+
+def test_inverted_index_add_remove_search():
+    """
+    Teste l'indexation, la recherche par préfixe et la suppression.
+    """
+    index = InvertedIndex()
+    index.add(3, ["harry", "potter"])
+    index.add(1, ["harry", "hole"])
+    index.add(2, ["potter", "pottery"])
+
+    assert list(index.search(["harry"])) == [1, 3]
+    assert list(index.search(["pott"])) == [2, 3]
+    assert list(index.search(["harry", "pott"])) == [3]
+    assert list(index.search(["pott"], prefix=False)) == []
+    assert list(index.search(["unknown", "harry"])) == []
+
+    index.remove(3, ["harry", "potter"])
+    assert list(index.search(["harry"])) == [1]
+    assert list(index.search(["potter"], prefix=False)) == [2]
+
+    index.remove(1, ["harry", "hole"])
+    assert len(index) == 2
+    assert list(index.search(["h"])) == []
+
+
+def test_catalog_index_build_and_incremental_updates(db_session: Session):
+    """
+    Teste la construction depuis la base puis la mise à jour par BookRepository.
+    """
+    repository = BookRepository(Book, db_session)
+    first = repository.create(obj_in={
+        "title": "Le Seigneur des Anneaux",
+        "author": "J.R.R. Tolkien",
+        "isbn": "6666666666666",
+        "publication_year": 1954,
+        "quantity": 1
+    })
+
+    # Les écritures avant la construction ne sont pas indexées
+    assert catalog_index.search("tolkien") is None
+
+    catalog_index.build(db_session)
+    assert list(catalog_index.search("tolkien")) == [first.id]
+
+    second = repository.create(obj_in={
+        "title": "Le Hobbit",
+        "author": "J.R.R. Tolkien",
+        "isbn": "7777777777777",
+        "publication_year": 1937,
+        "quantity": 1
+    })
+    assert list(catalog_index.search("tolk")) == [first.id, second.id]
+
+    repository.update(db_obj=second, obj_in={"title": "Bilbo le Hobbit"})
+    assert list(catalog_index.search("bilbo hobbit")) == [second.id]
+
+    repository.remove(id=first.id)
+    assert list(catalog_index.search("tolkien")) == [second.id]
+    assert list(catalog_index.search("anneaux")) == []
+
+
+def test_catalog_index_catches_up_writes_during_build(db_session: Session):
+    """
+    Teste que les écritures validées pendant la construction sont rattrapées depuis le journal.
+    """
+    repository = BookRepository(Book, db_session)
+    load = catalog_index.words.load
+
+    def load_with_concurrent_write(postings):
+        # Écriture concurrente pendant la construction : l'index n'est pas encore prêt
+        repository.create(obj_in={
+            "title": "Dune",
+            "author": "Frank Herbert",
+            "isbn": "8888888888888",
+            "publication_year": 1965,
+            "quantity": 1
+        })
+        assert catalog_index.search("dune") is None
+        load(postings)
+
+    catalog_index.words.load = load_with_concurrent_write
+    try:
+        catalog_index.build(db_session)
+    finally:
+        del catalog_index.words.load
+    dune = repository.get_by_isbn(isbn="8888888888888")
+    assert list(catalog_index.search("dune")) == [dune.id]
+    assert catalog_index.suggest("dune") == [("title", "Dune")]
+
+
+def test_catalog_index_ignores_stock_changes(db_session: Session):
+    """
+    Teste que seules les modifications des champs indexés et des catégories sont journalisées.
+    """
+    from src.models.books import catalog_change
+    from src.models.categories import Category
+
+    repository = BookRepository(Book, db_session)
+    book = repository.create(obj_in={
+        "title": "Fondation",
+        "author": "Isaac Asimov",
+        "isbn": "9999999999990",
+        "publication_year": 1951,
+        "quantity": 1
+    })
+    category = Category(name="Science-fiction")
+    db_session.add(category)
+    db_session.commit()
+    catalog_index.build(db_session)
+    generation = catalog_index.generation
+
+    repository.update(db_obj=book, obj_in={"quantity": 3})
+    assert catalog_index.generation == generation
+
+    repository.add_category(book_id=book.id, category_id=category.id)
+    repository.update(db_obj=book, obj_in={"title": "Fondation et Empire"})
+    assert catalog_index.generation == generation + 2
+    assert list(catalog_index.search("empire", category_ids=[category.id])) == [book.id]
+    operations = [change.operation for change in db_session.query(catalog_change).filter(
+        catalog_change.c.generation > generation
+    )]
+    assert operations == ["add_category", "update"]
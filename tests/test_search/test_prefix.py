@@ -0,0 +1,91 @@
+from src.search import PrefixIndex
+
+
+def test_prefix_index_complete():
+    """
+    Teste les complétions par préfixe (sans accents ni majuscules) et leur maintenance.
+    """
+    index = PrefixIndex()
+    index.load([
+        ("title", "Les Misérables"),
+        ("author", "Victor Hugo"),
+        ("title", "Le Petit Prince"),
+        ("author", "Victor Hugo"),
+        ("author", None)
+    ])
+
+    assert index.complete("les mis") == [("title", "Les Misérables")]
+    assert index.complete("le") == [("title", "Le Petit Prince"), ("title", "Les Misérables")]
+    assert index.complete("le", limit=1) == [("title", "Le Petit Prince")]
+    assert index.complete("VICTOR") == [("author", "Victor Hugo")]
+    assert index.complete("  ") == []
+
+    # "Victor Hugo" est porté par deux livres
+    index.remove("author", "Victor Hugo")
+    assert index.complete("vic") == [("author", "Victor Hugo")]
+    index.remove("author", "Victor Hugo")
+    assert index.complete("vic") == []
+
+    index.add("author", "Victoria Hislop")
+    assert index.complete("vic") == [("author", "Victoria Hislop")]
+
+
+def test_prefix_index_complete_by_frequency():
+    """
+    Teste le classement des complétions par nombre de livres, puis par ordre alphabétique.
+    """
+    index = PrefixIndex()
+    index.load([
+        ("author", "Alexandre Dumas"),
+        ("author", "Agatha Christie"),
+        ("author", "Agatha Christie"),
+        ("title", "Alice au pays des merveilles"),
+        ("author", "Albert Camus"),
+        ("author", "Albert Camus"),
+        ("author", "Albert Camus")
+    ])
+
+    assert index.complete("a", limit=2) == [("author", "Albert Camus"), ("author", "Agatha Christie")]
+    assert index.complete("al") == [
+        ("author", "Albert Camus"),
+        ("author", "Alexandre Dumas"),
+        ("title", "Alice au pays des merveilles")
+    ]
+
+    index.add("title", "Alice au pays des merveilles")
+    index.add("title", "Alice au pays des merveilles")
+    index.add("title", "Alice au pays des merveilles")
+    assert index.complete("al", limit=1) == [("title", "Alice au pays des merveilles")]
+
+
+def test_prefix_index_top_lists_match_scan():
+    """
+    Teste que les listes des préfixes fréquents suivent les ajouts et retraits : les
+    complétions restent celles d'un parcours complet des clés.
+    """
+    import random
+
+    rng = random.Random(7)
+    texts = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 5))) for _ in range(150)]
+    index = PrefixIndex(top_size=4, scan_limit=8)
+    books = [("title", rng.choice(texts)) for _ in range(300)]
+    index.load(books)
+
+    def expected(prefix, limit):
+        counts = {}
+        for field, text in books:
+            if text.startswith(prefix):
+                counts[(field, text)] = counts.get((field, text), 0) + 1
+        ranked = sorted(counts, key=lambda entry: (-counts[entry], entry[1]))
+        return ranked[:limit]
+
+    for step in range(600):
+        if step % 3 == 0 and books:
+            index.remove(*books.pop(rng.randrange(len(books))))
+        else:
+            books.append(("title", rng.choice(texts)))
+            index.add(*books[-1])
+        prefix = "".join(rng.choice("abc") for _ in range(rng.randint(1, 3)))
+        limit = rng.randint(1, 4)
+        assert index.complete(prefix, limit=limit) == expected(prefix, limit)
+    assert index._top
@@ -0,0 +1,41 @@
+from src.search import TrigramIndex
+from src.search.trigram import trigrams
+
+
+def test_trigrams():
+    """
+    Teste le découpage en trigrammes.
+    """
+    assert trigrams("orwel") == {"  o", " or", "orw", "rwe", "wel", "el "}
+
+
+def test_trigram_index_typos():
+    """
+    Teste la tolérance aux fautes de frappe et le classement par similarité.
+    """
+    index = TrigramIndex()
+    index.add(1, ["george", "orwell", "1984"])
+    index.add(2, ["tolkien", "hobbit"])
+    index.add(3, ["tolstoi", "guerre", "paix"])
+
+    assert [doc_id for doc_id, _ in index.search(["orwel"])] == [1]
+    assert [doc_id for doc_id, _ in index.search(["tolkein"])] == [2]
+    assert [doc_id for doc_id, _ in index.search(["tolkein", "hobit"])] == [2]
+    assert index.search(["tolkein", "orwel"]) == []
+    assert index.search(["xyz"]) == []
+
+    index.remove(2, ["tolkien", "hobbit"])
+    assert index.search(["tolkein"]) == []
+
+
+def test_trigram_index_ranking():
+    """
+    Teste que le mot le plus proche est classé en premier.
+    """
+    index = TrigramIndex()
+    index.add(1, ["martin"])
+    index.add(2, ["marti"])
+
+    results = index.search(["martin"])
+    assert [doc_id for doc_id, _ in results] == [1, 2]
+    assert results[0][1] == 1.0
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+
+
+def create_service(db_session: Session) -> LoanService:
+    return LoanService(
+        LoanRepository(Loan, db_session),
+        BookRepository(Book, db_session),
+        UserRepository(User, db_session)
+    )
+
+
+def create_user_and_books(db_session: Session, count: int = 1, quantity: int = 2):
+    user = User(email="checkout@example.com", hashed_password="fakehashedpassword", full_name="Checkout User")
+    books = [
+        Book(title=f"Checkout Book {i}", author="Author", isbn=f"{9300000000000 + i}", publication_year=2000, quantity=quantity)
+        for i in range(count)
+    ]
+    db_session.add_all([user, *books])
+    db_session.commit()
+    return user, books
+
+
+def add_loan(db_session: Session, user: User, book: Book, returned: bool = False) -> Loan:
+    now = datetime.utcnow()
+    loan = Loan(
+        user_id=user.id,
+        book_id=book.id,
+        loan_date=now,
+        due_date=now + timedelta(days=14),
+        return_date=now if returned else None
+    )
+    db_session.add(loan)
+    db_session.commit()
+    return loan
+
+
+def test_create_loan_eligibility(db_session: Session):
+    """
+    Teste les règles d'éligibilité : emprunt en double et limite d'emprunts simultanés.
+    """
+    service = create_service(db_session)
+    repository = service.loan_repository
+    user, books = create_user_and_books(db_session, count=6)
+
+    add_loan(db_session, user, books[0])
+    assert repository.has_active_loan(user_id=user.id, book_id=books[0].id)
+    with pytest.raises(ValueError, match="déjà emprunté"):
+        service.create_loan(user_id=user.id, book_id=books[0].id)
+
+    for book in books[1:5]:
+        add_loan(db_session, user, book)
+    add_loan(db_session, user, books[5], returned=True)
+
+    # Un emprunt retourné ne compte pas
+    assert repository.count_active_loans_by_user(user_id=user.id) == 5
+    assert not repository.has_active_loan(user_id=user.id, book_id=books[5].id)
+    with pytest.raises(ValueError, match="limite"):
+        service.create_loan(user_id=user.id, book_id=books[5].id)
+
+
+def test_checkout_and_return_update_stock(db_session: Session):
+    """
+    Teste l'emprunt du dernier exemplaire puis son retour (stock décrémenté puis rétabli).
+    """
+    service = create_service(db_session)
+    user, (book,) = create_user_and_books(db_session, quantity=1)
+    other = User(email="other@example.com", hashed_password="fakehashedpassword", full_name="Other User")
+    db_session.add(other)
+    db_session.commit()
+
+    loan = service.create_loan(user_id=user.id, book_id=book.id)
+    assert loan.id is not None
+    assert loan.return_date is None
+    db_session.refresh(book)
+    assert book.quantity == 0
+
+    # Plus aucun exemplaire : l'UPDATE conditionnel échoue
+    with pytest.raises(ValueError, match="pas disponible"):
+        service.create_loan(user_id=other.id, book_id=book.id)
+    assert db_session.query(Loan).count() == 1
+
+    returned = service.return_loan(loan_id=loan.id)
+    assert returned.return_date is not None
+    db_session.refresh(book)
+    assert book.quantity == 1
+
+    with pytest.raises(ValueError, match="déjà été retourné"):
+        service.return_loan(loan_id=loan.id)
+    db_session.refresh(book)
+    assert book.quantity == 1
@@ -0,0 +1,53 @@
+import time
+
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.services.stats import SnapshotStore, StatsService
+
+
+class _UnclosableSession:
+    """
+    Enveloppe la session de test pour que le recalcul en arrière-plan ne la ferme pas.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def close(self):
+        pass
+
+
+def test_snapshot_store_stale_while_revalidate(db_session: Session):
+    """
+    Teste que l'instantané est renvoyé immédiatement puis recalculé en arrière-plan.
+    """
+    store = SnapshotStore(max_age=0, session_factory=lambda: _UnclosableSession(db_session))
+    compute = lambda db: StatsService(db).get_general_stats()
+
+    stats, computed_at = store.get("general", compute, db_session)
+    assert stats["unique_books"] == 0
+
+    BookRepository(Book, db_session).create(obj_in={
+        "title": "Snapshot Stats",
+        "author": "Stats Author",
+        "isbn": "4444444444444",
+        "publication_year": 2020,
+        "quantity": 2
+    })
+
+    # L'ancien instantané est renvoyé sans attendre le recalcul
+    stale, stale_at = store.get("general", compute, db_session)
+    assert stale["unique_books"] == 0
+    assert stale_at == computed_at
+
+    for _ in range(100):
+        fresh, fresh_at = store.get("general", compute, db_session)
+        if fresh["unique_books"] == 1:
+            break
+        time.sleep(0.01)
+    assert fresh["unique_books"] == 1
+    assert fresh_at > computed_at
@@ -56,6 +56,9 @@ def test_authenticate_user(db_session: Session):
     authenticated_user = service.authenticate(email="auth@example.com", password="wrongpassword")
     assert authenticated_user is None
 
+    # L'instantané mis en cache ne contient pas le hash du mot de passe
+    assert not hasattr(service.get_by_email(email="auth@example.com"), "hashed_password")
+
     # Authentification échouée - email inexistant
     authenticated_user = service.authenticate(email="nonexistent@example.com", password="password123")
     assert authenticated_user is None
@@ -124,6 +127,26 @@ def test_get_by_email(db_session: Session):
     assert retrieved_user is None
 
 
+def test_get_by_email_negative_cache_invalidated_on_create(db_session: Session):
+    """
+    Teste qu'un email inconnu mis en cache est invalidé à la création de l'utilisateur.
+    """
+    repository = UserRepository(User, db_session)
+    service = UserService(repository)
+
+    assert service.get_by_email(email="late@example.com") is None
+
+    user = service.create(obj_in=UserCreate(
+        email="late@example.com",
+        password="password123",
+        full_name="Late User"
+    ))
+
+    retrieved_user = service.get_by_email(email="late@example.com")
+    assert retrieved_user is not None
+    assert retrieved_user.id == user.id
+
+
 def test_create_user_email_already_used(db_session: Session):
     """
     Teste la création d'un utilisateur avec un email déjà utilisé.
@@ -0,0 +1,283 @@
+import threading
+import time
+
+from src.utils.cache import (
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    cache,
+    cache_backend,
+    invalidate_cache,
+    invalidate_tags
+)
+
+
+def test_cache_backend_lru_eviction():
+    """
+    Teste l'éviction LRU lorsque le nombre maximal d'entrées est atteint.
+    """
+    engine = MemoryCacheBackend(max_entries=2)
+    engine.set("a", 1)
+    engine.set("b", 2)
+
+    # "a" devient la plus récemment utilisée
+    assert engine.get("a") == 1
+    engine.set("c", 3)
+
+    assert len(engine) == 2
+    assert engine.get("b") is None
+    assert engine.get("a") == 1
+    assert engine.get("c") == 3
+
+
+def test_cache_backend_byte_budget():
+    """
+    Teste l'éviction lorsque le budget mémoire est dépassé.
+    """
+    engine = MemoryCacheBackend(max_bytes=1000)
+    engine.set("small", "x")
+    engine.set("big", "x" * 920)
+
+    assert engine.size <= 1000
+    assert engine.get("small") is None
+    assert engine.get("big") is not None
+
+    # Une valeur plus grande que le budget n'est jamais stockée
+    engine.set("huge", "x" * 2000)
+    assert engine.get("huge") is None
+
+
+def test_cache_backend_expiry_and_sweep():
+    """
+    Teste l'expiration des entrées et la purge périodique.
+    """
+    engine = MemoryCacheBackend(sweep_interval=0)
+    engine.set("short", 1, expiry=0.01)
+    engine.set("long", 2, expiry=60)
+    time.sleep(0.02)
+
+    assert engine.get("short") is None
+
+    engine.set("expired", 3, expiry=0)
+    engine.set("other", 4, expiry=60)
+    # La purge périodique a supprimé l'entrée expirée sans lecture
+    assert len(engine) == 2
+    assert engine.get("long") == 2
+
+
+def test_cache_backend_tags():
+    """
+    Teste l'invalidation par tags.
+    """
+    engine = MemoryCacheBackend()
+    engine.set("isbn-1", "book 1", tags=["book:1", "isbn:1"])
+    engine.set("isbn-2", "book 2", tags=["book:2", "isbn:2"])
+    engine.set("list", ["book 1", "book 2"], tags=["books:list"])
+
+    engine.invalidate_tags("book:1", "books:list")
+
+    assert engine.get("isbn-1") is None
+    assert engine.get("list") is None
+    assert engine.get("isbn-2") == "book 2"
+
+    # Les entrées évincées ou supprimées disparaissent de l'index inverse
+    engine.delete("isbn-2")
+    assert engine._tags == {}
+
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    """
+    Teste le partage des entrées et des invalidations entre deux processus (deux instances).
+    """
+    path = str(tmp_path / "cache.db")
+    worker_1 = SQLiteCacheBackend(path)
+    worker_2 = SQLiteCacheBackend(path)
+
+    worker_1.set("isbn-1", {"title": "Book 1"}, tags=["book:1"])
+    worker_1.set("isbn-2", None, tags=["book:2"])
+    assert worker_2.get("isbn-1") == {"title": "Book 1"}
+    assert "isbn-2" in worker_2
+
+    worker_2.invalidate_tags("book:1")
+    assert worker_1.get("isbn-1") is None
+    assert "isbn-2" in worker_1
+
+    worker_1.set("expired", 1, expiry=0)
+    assert worker_2.get("expired") is None
+
+
+def test_sqlite_backend_lru_eviction(tmp_path):
+    """
+    Teste l'éviction LRU du backend SQLite dès l'écriture, sans attendre la purge.
+    """
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2, max_bytes=100)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+    # Limite en octets : les entrées les moins récemment lues sont évincées
+    backend.set("large", "x" * 85)
+    assert "large" in backend
+    assert backend.get("a") is None and backend.get("c") is None
+
+    # L'occupation totale suit les remplacements et les suppressions
+    backend.set("large", "y")
+    backend.delete("large")
+    assert backend._connection().execute(
+        "SELECT entries, bytes FROM cache_usage"
+    ).fetchone() == (0, 0)
+
+
+def test_cache_decorator():
+    """
+    Teste le décorateur de cache et l'invalidation par préfixe.
+    """
+    calls = []
+
+    @cache(expiry=60)
+    def compute(*, value: int) -> int:
+        calls.append(value)
+        return value * 2
+
+    invalidate_cache()
+    assert compute(value=2) == 4
+    assert compute(value=2) == 4
+    assert calls == [2]
+
+    invalidate_cache(compute.__module__)
+    assert compute(value=2) == 4
+    assert calls == [2, 2]
+    assert len(cache_backend) == 1
+
+
+def test_cache_decorator_tags():
+    """
+    Teste les tags calculés par le décorateur.
+    """
+    calls = []
+
+    @cache(expiry=60, tags=lambda result, *, value: [f"value:{value}"])
+    def compute(*, value: int) -> int:
+        calls.append(value)
+        return value * 2
+
+    compute(value=1)
+    compute(value=2)
+    invalidate_tags("value:1")
+    compute(value=1)
+    compute(value=2)
+
+    assert calls == [1, 2, 1]
+
+
+def test_cache_decorator_single_flight():
+    """
+    Teste qu'un seul calcul est exécuté pour des appels concurrents sur une même clé.
+    """
+    calls = []
+    release = threading.Event()
+
+    @cache(expiry=60)
+    def slow(*, value: int) -> int:
+        calls.append(value)
+        release.wait(1)
+        return value * 2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(slow(value=3)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [3]
+    assert results == [6] * 5
+
+
+def test_cache_decorator_early_refresh():
+    """
+    Teste le recalcul anticipé d'une entrée proche de son expiration.
+    """
+    calls = []
+
+    @cache(expiry=60, early_refresh=1e9)
+    def compute(*, value: int) -> int:
+        calls.append(value)
+        time.sleep(0.001)
+        return value
+
+    compute(value=1)
+    compute(value=1)
+
+    # Avec un beta très élevé, l'entrée est toujours considérée comme proche de l'expiration
+    assert calls == [1, 1]
+
+
+def test_cache_decorator_declared_key():
+    """
+    Teste les clés construites à partir des arguments déclarés.
+    """
+    calls = []
+
+    class Repository:
+        def __init__(self, name: str):
+            self.name = name
+
+        @cache(expiry=60, key=("isbn",))
+        def get_by_isbn(self, *, isbn: str) -> str:
+            calls.append((self.name, isbn))
+            return isbn
+
+        @cache(expiry=60)
+        def search(self, query: str, *, limit: int = 10) -> list:
+            calls.append((self.name, query, limit))
+            return [query] * limit
+
+    first, second = Repository("first"), Repository("second")
+
+    # La clé ne dépend pas de l'instance (self)
+    first.get_by_isbn(isbn="1")
+    second.get_by_isbn(isbn="1")
+    second.get_by_isbn(isbn="2")
+    assert calls == [("first", "1"), ("second", "2")]
+
+    calls.clear()
+    first.search("python", limit=2)
+    second.search("python", limit=2)
+    first.search("python", limit=3)
+    assert calls == [("first", "python", 2), ("first", "python", 3)]
+
+
+def test_cache_decorator_negative_expiry():
+    """
+    Teste la durée de vie distincte des résultats None et leur invalidation par tags.
+    """
+    rows = {}
+
+    @cache(
+        expiry=60,
+        negative_expiry=0,
+        tags=lambda result, *, name: [f"name:{name}"],
+        key=("name",)
+    )
+    def lookup(*, name: str):
+        return rows.get(name)
+
+    assert lookup(name="a") is None
+    rows["a"] = 1
+    # Le résultat négatif a déjà expiré
+    assert lookup(name="a") == 1
+
+    rows["a"] = 2
+    assert lookup(name="a") == 1
+    invalidate_tags("name:a")
+    assert lookup(name="a") == 2
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+from src.services.stats import StatsService
+from src.utils.overdue import overdue_sweeper
+
+
+def test_overdue_sweeper(db_session: Session):
+    """
+    Teste le marquage des emprunts en retard, le compteur et les requêtes qui en dépendent.
+    """
+    user = User(email="sweeper@example.com", hashed_password="fakehashedpassword", full_name="Sweeper User")
+    books = [
+        Book(title=f"Sweeper Book {i}", author="Author", isbn=f"{9400000000000 + i}", publication_year=2000, quantity=2)
+        for i in range(4)
+    ]
+    db_session.add_all([user, *books])
+    db_session.commit()
+
+    now = datetime.utcnow()
+    loans = [
+        Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=30), due_date=now + timedelta(days=days))
+        for book, days in zip(books[:3], (-2, 1, 5))
+    ]
+    db_session.add_all(loans)
+    db_session.commit()
+    overdue, soon, later = loans
+
+    repository = LoanRepository(Loan, db_session)
+    # Avant chargement : calcul sur les dates
+    assert [loan.id for loan in repository.get_overdue_loans()] == [overdue.id]
+
+    overdue_sweeper.load(db_session)
+    assert overdue_sweeper.next_due() == overdue.due_date
+    assert overdue_sweeper.sweep(db_session, now=now) == 1
+    assert overdue_sweeper.overdue_count == 1
+    assert overdue_sweeper.next_due() == soon.due_date
+    db_session.refresh(overdue)
+    assert overdue.is_overdue
+
+    # Un nouvel emprunt est suivi dès sa création ; un emprunt retourné est ignoré
+    service = LoanService(repository, BookRepository(Book, db_session), UserRepository(User, db_session))
+    created = service.create_loan(user_id=user.id, book_id=books[3].id, loan_period_days=3)
+    service.return_loan(loan_id=soon.id)
+    assert overdue_sweeper.sweep(db_session, now=now + timedelta(days=4)) == 1
+    assert [loan.id for loan in repository.get_overdue_loans()] == [overdue.id, created.id]
+    assert repository.get_loans_stats()["overdue_loans"] == 2
+    assert StatsService(db_session).get_general_stats()["overdue_loans"] == 2
+
+    # Le retour d'un emprunt en retard le retire du compteur
+    service.return_loan(loan_id=overdue.id)
+    assert overdue_sweeper.overdue_count == 1
+    db_session.refresh(overdue)
+    assert not overdue.is_overdue
+    assert [loan.id for loan in repository.query_loans(status="overdue")] == [created.id]
+
+    assert overdue_sweeper.sweep(db_session, now=now + timedelta(days=6)) == 1
+    assert overdue_sweeper.next_due() is None